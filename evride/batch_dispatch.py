@@ -0,0 +1,50 @@
+import numpy as np
+
+
+# Cost of leaving a rider unmatched in a window; far above any sum of real
+# scores, so the solver matches as many riders as it can before it
+# minimizes their total score
+UNMATCHED_COST = 1e9
+
+
+def assign(candidates):
+    """Minimum-cost assignment of riders to drivers for one dispatch window
+
+    candidates[i] lists (score, driver_id) edges for rider i, e.g. its k
+    best-scoring drivers. The graph stays sparse: each rider also gets a
+    private dummy driver at UNMATCHED_COST, so a full matching always
+    exists and the sparse Hungarian-style solver (LAPJVsp) runs on
+    k + 1 edges per rider instead of a dense riders x drivers matrix.
+    Returns the assigned driver_id, or None, per rider.
+    """
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+
+    n = len(candidates)
+    if n == 0:
+        return []
+    column_of = {}
+    driver_ids = []
+    rows, cols, costs = [], [], []
+    for i, edges in enumerate(candidates):
+        for score, driver_id in edges:
+            if not np.isfinite(score):
+                continue
+            j = column_of.get(driver_id)
+            if j is None:
+                j = column_of[driver_id] = len(driver_ids)
+                driver_ids.append(driver_id)
+            rows.append(i)
+            cols.append(j)
+            # Shifted by 1 so no edge weight is zero (zero means no edge)
+            costs.append(score + 1.0)
+    n_drivers = len(driver_ids)
+    if n_drivers == 0:
+        return [None] * n
+
+    rows.extend(range(n))
+    cols.extend(range(n_drivers, n_drivers + n))
+    costs.extend([UNMATCHED_COST] * n)
+    graph = csr_matrix((costs, (rows, cols)), shape=(n, n_drivers + n))
+    _, matched = min_weight_full_bipartite_matching(graph)
+    return [driver_ids[j] if j < n_drivers else None for j in matched.tolist()]
@@ -0,0 +1,1141 @@
+"""Serving-path benchmarks for the EV ride API
+
+Run from a directory containing models/ (normally evride/):
+    python benchmark.py event-loop
+    python benchmark.py model-load
+    python benchmark.py cold-start
+    python benchmark.py location-fanout
+    python benchmark.py telemetry
+    python benchmark.py reservation
+    python benchmark.py dispatch-replay
+    python benchmark.py ride-store
+    python benchmark.py dataset-load
+    python benchmark.py dataset-cache
+    python benchmark.py summary-stats
+    python benchmark.py retrain
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+
+def print_section(title):
+    print("\n" + "=" * 70)
+    print(f"  {title}")
+    print("=" * 70)
+
+
+def latency_summary(samples_ms):
+    values = np.asarray(samples_ms, dtype=np.float64)
+    return (f"n={len(values)}  p50={np.percentile(values, 50):.2f} ms  "
+            f"p99={np.percentile(values, 99):.2f} ms  max={values.max():.2f} ms")
+
+
+def quote_payload(n, rng):
+    quotes = []
+    for _ in range(n):
+        lat, lon = 28.55 + rng.random() * 0.15, 77.10 + rng.random() * 0.20
+        quotes.append({
+            "pickup": {"latitude": lat, "longitude": lon},
+            "dropoff": {"latitude": lat + rng.random() * 0.1, "longitude": lon + rng.random() * 0.1},
+            "vehicle_type": "sedan"
+        })
+    return {"quotes": quotes}
+
+
+# Event loop responsiveness under quote load
+
+class ServerProcess:
+    """uvicorn serving main_integrated in a subprocess, models read from cwd"""
+
+    def __init__(self, port, env=None, module="main_integrated:app"):
+        self.port = port
+        self.env = env or {}
+        self.module = module
+        self.proc = None
+        self.base_url = f"http://127.0.0.1:{port}"
+
+    def __enter__(self):
+        import os
+        import subprocess
+        import sys
+
+        env = dict(os.environ, **self.env)
+        here = os.path.dirname(os.path.abspath(__file__))
+        env["PYTHONPATH"] = here + os.pathsep + env.get("PYTHONPATH", "")
+        self.started = time.perf_counter()
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", self.module, "--port", str(self.port),
+             "--log-level", "warning"],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        return self
+
+    def wait_until(self, path="/", timeout=60.0, interval=0.02):
+        """Poll path until it answers 200; returns seconds since launch"""
+        import httpx
+
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            try:
+                if httpx.get(self.base_url + path, timeout=1.0).status_code == 200:
+                    return time.perf_counter() - self.started
+            except httpx.HTTPError:
+                pass
+            time.sleep(interval)
+        raise RuntimeError(f"Server did not answer {path} within {timeout}s")
+
+    def __exit__(self, *exc):
+        self.proc.terminate()
+        self.proc.wait(timeout=10)
+
+
+async def _event_loop_run(base_url, duration, load_clients, batch_size):
+    import httpx
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0) as client:
+        ride = await client.post("/ride/request", json={
+            "user_id": "BENCH",
+            "pickup": {"latitude": 28.6139, "longitude": 77.2090},
+            "dropoff": {"latitude": 28.6500, "longitude": 77.2300}
+        })
+        ride_id = ride.json()["ride_id"]
+        await client.post(f"/ride/complete/{ride_id}")
+
+        stop = time.perf_counter() + duration
+        quotes_done = 0
+
+        async def quote_load(seed):
+            nonlocal quotes_done
+            payload = quote_payload(batch_size, np.random.default_rng(seed))
+            while time.perf_counter() < stop:
+                await client.post("/ride/quote/batch", json=payload)
+                quotes_done += batch_size
+
+        async def probe():
+            samples = []
+            while time.perf_counter() < stop:
+                started = time.perf_counter()
+                await client.get(f"/ride/{ride_id}")
+                samples.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(0.005)
+            return samples
+
+        results = await asyncio.gather(probe(), *[quote_load(i) for i in range(load_clients)])
+
+    return results[0], quotes_done
+
+
+def bench_event_loop(args):
+    """p99 latency of GET /ride/{ride_id} while quote batches are being priced"""
+    print_section("EVENT LOOP RESPONSIVENESS (GET /ride/{ride_id} under quote load)")
+    print(f"   {args.clients} quote clients x {args.batch} quotes/request, {args.duration}s per mode")
+
+    modes = [args.executor] if args.executor else ["inline", "thread", "process"]
+    for mode in modes:
+        with ServerProcess(args.port, env={"EVRIDE_EXECUTOR": mode}) as server:
+            server.wait_until("/")
+            samples, quotes = asyncio.run(_event_loop_run(
+                server.base_url, args.duration, args.clients, args.batch
+            ))
+        print(f"   {mode:8s} {latency_summary(samples)}  quotes/s={quotes / args.duration:,.0f}")
+
+
+# Model artifact load time and per-worker memory
+
+def _proc_status_kb(field):
+    """Field from /proc/self/status in kB (Linux only)"""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def model_load_child(args):
+    """Load one artifact format, predict, and print timings as JSON"""
+    import json
+    import os
+    import sys
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    rss_before = _proc_status_kb("RssAnon")
+    started = time.perf_counter()
+    if args.format == "pickle":
+        import joblib
+
+        fare_data = joblib.load("models/fare_model_enhanced.pkl")
+        load_s = time.perf_counter() - started
+        model, scaler = fare_data["model"], fare_data["scaler"]
+        X = np.random.default_rng(0).normal(size=(256, model.n_features_in_))
+        model.predict(scaler.transform(X))
+    else:
+        from forest_evaluator import FlatForest
+
+        forest, _ = FlatForest.load("models/fare_model_enhanced.flat", mmap=True)
+        load_s = time.perf_counter() - started
+        X = np.random.default_rng(0).normal(size=(256, forest.n_features))
+        forest.predict(X)
+
+    print(json.dumps({
+        "load_ms": load_s * 1000,
+        "rss_anon_mb": (_proc_status_kb("RssAnon") - rss_before) / 1024,
+        "rss_file_mb": _proc_status_kb("RssFile") / 1024
+    }))
+
+
+def bench_model_load(args):
+    """Cold load time and resident memory per worker: pickle vs mmap bundle"""
+    import json
+    import subprocess
+    import sys
+
+    print_section("MODEL LOAD TIME & MEMORY PER WORKER")
+    print("   rss_anon = private memory added by the model, rss_file = shared page cache mapped")
+    for fmt in ("pickle", "bundle"):
+        results = []
+        procs = [
+            subprocess.Popen([sys.executable, "-W", "ignore", __file__, "model-load-child", fmt],
+                             stdout=subprocess.PIPE, text=True)
+            for _ in range(args.workers)
+        ]
+        for proc in procs:
+            out, _ = proc.communicate()
+            results.append(json.loads(out.strip().splitlines()[-1]))
+
+        load_ms = np.mean([r["load_ms"] for r in results])
+        anon = np.mean([r["rss_anon_mb"] for r in results])
+        shared = np.mean([r["rss_file_mb"] for r in results])
+        print(f"   {fmt:7s} workers={args.workers}  load={load_ms:8.1f} ms  "
+              f"rss_anon={anon:7.1f} MB/worker  rss_file={shared:6.1f} MB/worker  "
+              f"private total={anon * args.workers:7.1f} MB")
+
+
+# Cold start: process launch to first served quote
+
+def bench_cold_start(args):
+    """Launch-to-bind, launch-to-ready and launch-to-first-quote, per server module"""
+    import httpx
+
+    print_section("COLD START (process launch -> first successful quote)")
+    ride = {
+        "user_id": "BENCH",
+        "pickup": {"latitude": 28.6139, "longitude": 77.2090},
+        "dropoff": {"latitude": 28.6500, "longitude": 77.2300}
+    }
+    for module in args.modules:
+        runs = []
+        for _ in range(args.runs):
+            with ServerProcess(args.port, module=f"{module}:app") as server:
+                bind_s = server.wait_until("/healthz", interval=0.005)
+                ready_s = server.wait_until("/readyz", interval=0.005)
+                response = httpx.post(server.base_url + "/ride/request", json=ride, timeout=30.0)
+                quote_s = time.perf_counter() - server.started
+                if response.status_code != 200:
+                    raise RuntimeError(f"{module}: quote failed with {response.status_code}")
+                phases = httpx.get(server.base_url + "/readyz").json()["startup"]["phases_ms"]
+            runs.append((bind_s, ready_s, quote_s, phases))
+
+        bind_s, ready_s, quote_s = (np.median([r[i] for r in runs]) * 1000 for i in range(3))
+        print(f"   {module:16s} runs={args.runs}  bind={bind_s:7.0f} ms  ready={ready_s:7.0f} ms  "
+              f"first quote={quote_s:7.0f} ms  (medians)")
+        phases = "  ".join(f"{name}={ms:.0f}" for name, ms in runs[-1][3].items())
+        print(f"   {'':16s} phases (ms, last run): {phases}")
+
+
+# Driver location fan-out to websocket subscribers
+
+class SimulatedSocket:
+    """Stand-in for a websocket: counts sends, optionally stalls forever
+
+    A send is redundant when the position moved less than min_move_m since
+    the last one this socket received.
+    """
+
+    def __init__(self, min_move_m, stalls=False):
+        self.min_move_m = min_move_m
+        self.stalls = stalls
+        self.sends = 0
+        self.redundant = 0
+        self.last = None
+
+    async def send_text(self, text):
+        import json
+
+        from location_hub import moved_m
+
+        if self.stalls:
+            await asyncio.Event().wait()
+        self.sends += 1
+        position = json.loads(text)
+        position = (position["latitude"], position["longitude"])
+        if self.last is not None and moved_m(*self.last, *position) < self.min_move_m:
+            self.redundant += 1
+        self.last = position
+
+    async def wait_closed(self):
+        await asyncio.Event().wait()
+
+
+async def _location_fanout_run(mode, args):
+    import json
+
+    from location_hub import LocationHub
+
+    rng = np.random.default_rng(0)
+    lat = 28.55 + rng.random(args.drivers) * 0.15
+    lon = 77.10 + rng.random(args.drivers) * 0.20
+    sockets = [SimulatedSocket(args.min_move_m, stalls=i < args.subscribers * args.slow_fraction)
+               for i in range(args.subscribers)]
+    watched = rng.integers(0, args.drivers, args.subscribers)
+    hub = LocationHub(args.min_move_m, send_timeout=1.0)
+
+    async def legacy(socket, driver):
+        # The old per-connection loop: re-read and resend every 2 s
+        while True:
+            await socket.send_text(json.dumps({"latitude": float(lat[driver]),
+                                               "longitude": float(lon[driver])}))
+            await asyncio.sleep(2)
+
+    if mode == "polling":
+        tasks = [asyncio.ensure_future(legacy(s, d)) for s, d in zip(sockets, watched)]
+    else:
+        tasks = [asyncio.ensure_future(hub.stream(hub.subscribe(d, lat[d], lon[d]),
+                                                  s.send_text, s.wait_closed))
+                 for s, d in zip(sockets, watched)]
+    await asyncio.sleep(0)
+
+    # Every driver reports once per report interval, spread over 10 ticks a
+    # second; a share of reports are GPS jitter of a few metres from a
+    # parked or queued car
+    ticks = int(args.report_interval * 10)
+    started_cpu, started = time.process_time(), time.perf_counter()
+    for tick in range(int(args.duration * 10)):
+        for driver in range(tick % ticks, args.drivers, ticks):
+            step = 0.00002 if rng.random() < args.stationary else 0.0003
+            lat[driver] += rng.normal() * step
+            lon[driver] += rng.normal() * step
+            if mode == "hub":
+                hub.publish(driver, lat[driver], lon[driver])
+        await asyncio.sleep(0.1)
+    cpu_s, wall_s = time.process_time() - started_cpu, time.perf_counter() - started
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    sends = sum(s.sends for s in sockets)
+    redundant = sum(s.redundant for s in sockets)
+    return cpu_s, wall_s, sends, redundant, hub.stats()
+
+
+def bench_location_fanout(args):
+    """CPU and send rate for /ws/driver: per-connection polling vs the LocationHub"""
+    print_section("DRIVER LOCATION FAN-OUT (simulated websocket subscribers)")
+    print(f"   {args.subscribers:,} subscribers over {args.drivers:,} drivers, each driver reports "
+          f"every {args.report_interval:g}s ({args.stationary:.0%} jitter), "
+          f"{args.slow_fraction:.1%} stalled sockets, {args.duration:g}s")
+    for mode in ("polling", "hub"):
+        cpu_s, wall_s, sends, redundant, stats = asyncio.run(_location_fanout_run(mode, args))
+        line = (f"   {mode:8s} cpu={cpu_s:6.2f} s ({cpu_s / wall_s:5.1%} of a core)  "
+                f"sends/s={sends / wall_s:9,.0f}  redundant={redundant / max(sends, 1):5.1%}")
+        if mode == "hub":
+            line += (f"  published={stats['published']:,} suppressed={stats['suppressed']:,} "
+                     f"coalesced={stats['coalesced']:,} dropped={stats['dropped_slow']:,}")
+        print(line)
+
+
+# Driver telemetry ingestion
+
+def _proc_cpu_s(pid):
+    """user + system CPU seconds of a process (Linux only)"""
+    import os
+
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def telemetry_batches(n_batches, batch_size, driver_ids, rng, start_ts=1.0):
+    """Batches of moving-driver reports with increasing timestamps; ~2% arrive late"""
+    batches = []
+    lat = 28.55 + rng.random(len(driver_ids)) * 0.15
+    lon = 77.10 + rng.random(len(driver_ids)) * 0.20
+    ts = start_ts
+    for _ in range(n_batches):
+        picks = rng.integers(0, len(driver_ids), batch_size)
+        lat[picks] += rng.normal(size=batch_size) * 0.0002
+        lon[picks] += rng.normal(size=batch_size) * 0.0002
+        late = rng.random(batch_size) < 0.02
+        records = []
+        for i, driver in enumerate(picks.tolist()):
+            ts += 0.001
+            records.append({"driver_id": driver_ids[driver], "lat": float(lat[driver]),
+                            "lon": float(lon[driver]), "battery": 80.0,
+                            "ts": ts - 30.0 if late[i] else ts})
+        batches.append(records)
+    return batches
+
+
+def bench_telemetry_core(args):
+    import main_integrated as server
+
+    rng = np.random.default_rng(0)
+    driver_ids = [f"T{i:06d}" for i in range(args.drivers)]
+    for i, driver_id in enumerate(driver_ids):
+        server.fleet.upsert(driver_id, name=driver_id, lat=28.55 + rng.random() * 0.15,
+                            lon=77.10 + rng.random() * 0.20, battery=80.0,
+                            vehicle_type=("sedan", "suv", "hatchback")[i % 3], rating=4.5)
+        server.index_driver(driver_id)
+    batches = [[server.TelemetryRecord(**r) for r in batch]
+               for batch in telemetry_batches(args.batches, args.batch, driver_ids, rng)]
+    updates = args.batches * args.batch
+
+    def per_record(batch):
+        # What one POST per report would do, minus the HTTP overhead
+        for r in batch:
+            row = server.fleet.row_of(r.driver_id)
+            if row is None or r.ts <= server.fleet.ts[row]:
+                continue
+            server.fleet.ts[row] = r.ts
+            server.fleet.battery[row] = r.battery
+            server.move_driver(r.driver_id, r.lat, r.lon)
+
+    half = len(batches) // 2
+    for name, apply, work in (("per-record", per_record, batches[:half]),
+                              ("bulk", server.ingest_telemetry, batches[half:])):
+        started = time.process_time()
+        for batch in work:
+            apply(batch)
+        cpu_s = time.process_time() - started
+        print(f"   {name:10s} {len(work) * args.batch / cpu_s:12,.0f} updates/s per core "
+              f"(apply only, records already parsed)")
+    print(f"   {updates:,} reports over {args.drivers:,} drivers, batches of {args.batch}")
+
+
+async def _telemetry_http_run(base_url, batches, clients, bulk):
+    import httpx
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0) as client:
+        queue = list(batches)
+
+        async def worker():
+            while queue:
+                records = queue.pop()
+                if bulk:
+                    response = await client.post("/drivers/telemetry/bulk",
+                                                 json={"records": records})
+                else:
+                    r = records[0]
+                    response = await client.post(f"/drivers/{r['driver_id']}/location",
+                                                 json={"latitude": r["lat"], "longitude": r["lon"]})
+                response.raise_for_status()
+
+        await asyncio.gather(*[worker() for _ in range(clients)])
+
+
+def bench_telemetry_http(args):
+    rng = np.random.default_rng(1)
+    driver_ids = [f"D00{i}" for i in range(1, 6)]  # Only the sample fleet is served
+    runs = (
+        ("HTTP single", telemetry_batches(args.http_batches * 10, 1, driver_ids, rng), False),
+        ("HTTP bulk", telemetry_batches(args.http_batches, args.batch, driver_ids, rng), True),
+    )
+    for name, batches, bulk in runs:
+        with ServerProcess(args.port) as server:
+            server.wait_until("/readyz")
+            cpu_before = _proc_cpu_s(server.proc.pid)
+            started = time.perf_counter()
+            asyncio.run(_telemetry_http_run(server.base_url, batches, args.clients, bulk))
+            wall_s = time.perf_counter() - started
+            cpu_s = _proc_cpu_s(server.proc.pid) - cpu_before
+        updates = sum(len(batch) for batch in batches)
+        print(f"   {name:11s} {updates / cpu_s:11,.0f} updates/s per server core, "
+              f"{updates / wall_s:9,.0f} updates/s wall ({args.clients} clients, "
+              f"{len(batches[0])} per request, parse + apply)")
+
+
+def bench_telemetry(args):
+    """Driver telemetry ingestion throughput in updates per second per core"""
+    print_section("DRIVER TELEMETRY INGESTION")
+    bench_telemetry_core(args)
+    bench_telemetry_http(args)
+
+
+# Concurrent driver claims
+
+class CountingLock:
+    """threading.Lock that counts acquisitions which had to wait"""
+
+    def __init__(self):
+        import threading
+
+        self.lock = threading.Lock()
+        self.contended = 0
+
+    def acquire(self):
+        if not self.lock.acquire(blocking=False):
+            self.lock.acquire()
+            self.contended += 1
+        return True
+
+    def release(self):
+        self.lock.release()
+
+
+def _reservation_run(cells, drivers_per_cell, threads, stripes, locked=True):
+    """Claim drivers from many threads
+
+    Returns (seconds, matches, doubles, contended locks, claims, lost races).
+    """
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    from driver_reservation import DriverReservations
+    from fleet_store import FleetStore
+    from main_integrated import model_manager
+    from spatial_index import DriverSpatialIndex
+
+    class UnlockedReservations(DriverReservations):
+        """Check-then-set without a lock, to show the stress test catches races"""
+
+        def claim(self, driver_id):
+            row = self.fleet.rows[driver_id]
+            if not self.fleet.available[row]:
+                return False
+            time.sleep(0)  # Let another thread in between the check and the set
+            self.fleet.available[row] = False
+            return True
+
+    rng = np.random.default_rng(cells)
+    fleet, index = FleetStore(), DriverSpatialIndex()
+    reservations = (DriverReservations if locked else UnlockedReservations)(fleet, stripes)
+    reservations.locks = [CountingLock() for _ in range(stripes)]
+    # Hot cells spread over the city, a few cells apart so they rarely share candidates
+    origins = [(28.40 + 0.05 * (c // 8), 77.00 + 0.05 * (c % 8)) for c in range(cells)]
+    for c, (lat, lon) in enumerate(origins):
+        for d in range(drivers_per_cell):
+            driver_id = f"C{c}D{d}"
+            dlat, dlon = lat + rng.random() * 0.009, lon + rng.random() * 0.009
+            fleet.upsert(driver_id, name=driver_id, lat=dlat, lon=dlon, battery=90.0,
+                         vehicle_type="sedan", rating=4.5)
+            index.update(driver_id, dlat, dlon, "sedan")
+            reservations.place(driver_id, index.cell_of(dlat, dlon))
+
+    n_requests = int(cells * drivers_per_cell * 0.8)
+    pickups = [(lat + rng.random() * 0.009, lon + rng.random() * 0.009)
+               for lat, lon in (origins[int(c)] for c in rng.integers(0, cells, n_requests))]
+    assigned = []
+    lock = threading.Lock()
+
+    def request(pickup):
+        row, _ = model_manager.claim_nearest_driver(pickup[0], pickup[1], index, fleet,
+                                                    reservations)
+        if row is not None:
+            with lock:
+                assigned.append(fleet.driver_ids[row])
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(request, pickups))
+    elapsed = time.perf_counter() - started
+
+    doubles = len(assigned) - len(set(assigned))
+    contended = sum(lock.contended for lock in reservations.locks)
+    return (elapsed, len(assigned), doubles, contended, sum(reservations.claimed),
+            sum(reservations.conflicts))
+
+
+def bench_reservation(args):
+    """Zero double-assignments under concurrent matching, and lock contention by cell count"""
+    import sys
+
+    print_section("CONCURRENT DRIVER CLAIMS (striped compare-and-set)")
+    sys.setswitchinterval(args.switch_interval)  # Force frequent thread switches
+    print(f"   {args.threads} threads, {args.drivers_per_cell} drivers per hot cell, "
+          f"80% of drivers requested, thread switch interval {args.switch_interval * 1e6:g} us")
+
+    elapsed, matches, doubles, _, _, _ = _reservation_run(16, args.drivers_per_cell, args.threads,
+                                                       64, locked=False)
+    print(f"   unlocked check-then-set control: {matches:,} matches, {doubles:,} double-assigned")
+
+    for cells in args.cells:
+        line = f"   cells={cells:3d}"
+        for stripes in (1, args.stripes):
+            elapsed, matches, doubles, contended, claims, lost = _reservation_run(
+                cells, args.drivers_per_cell, args.threads, stripes
+            )
+            line += (f"  | stripes={stripes:3d}: {matches / elapsed:6,.0f} matches/s  "
+                     f"doubles={doubles}  lost races={lost:3d}  "
+                     f"contended={contended / max(claims, 1):6.2%}")
+        print(line)
+
+
+# Greedy vs windowed batch dispatch, replayed from the ride dataset
+
+def replay_traffic(path, rate, trip_scale, rng):
+    """Ride arrivals derived from the ride CSV
+
+    Rows arrive in file order as a Poisson process whose rate follows each
+    row's demand_factor. Each city in the data maps to a pickup hotspot in
+    the service area and trips end near a random hotspot, so the fleet stays
+    in town; a trip keeps its row's duration, scaled by trip_scale to
+    compress the replay. Returns a list of
+    (arrival_s, pickup_lat, pickup_lon, dropoff_lat, dropoff_lon, busy_s).
+    """
+    import csv
+
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    demand = np.array([float(r["demand_factor"]) for r in rows])
+    gaps = rng.exponential(1.0 / (rate * demand / demand.mean()))
+    cities = sorted({r["city"] for r in rows})
+    hotspots = [(28.50 + 0.04 * (i % 4), 77.05 + 0.06 * (i // 4)) for i in range(len(cities))]
+    hotspot_of = dict(zip(cities, hotspots))
+
+    trips, t = [], 0.0
+    for r, gap in zip(rows, gaps):
+        t += gap
+        lat0, lon0 = hotspot_of[r["city"]]
+        lat1, lon1 = hotspots[rng.integers(len(hotspots))]
+        busy = float(r["duration_minutes"]) * 60 * trip_scale
+        trips.append((t, lat0 + rng.normal() * 0.015, lon0 + rng.normal() * 0.015,
+                      lat1 + rng.normal() * 0.015, lon1 + rng.normal() * 0.015, busy))
+    return trips
+
+
+def _dispatch_replay_run(trips, args, window_s):
+    """Replay trips through greedy (window_s=0) or windowed dispatch; returns metrics"""
+    import heapq
+
+    from driver_reservation import DriverReservations
+    from fleet_store import FleetStore
+    from main_integrated import model_manager
+    from spatial_index import DriverSpatialIndex
+
+    rng = np.random.default_rng(7)
+    fleet, index = FleetStore(), DriverSpatialIndex()
+    reservations = DriverReservations(fleet)
+
+    def sync(driver_id):
+        row = fleet.row_of(driver_id)
+        reservations.place(driver_id, index.cell_of(fleet.lat[row], fleet.lon[row]))
+        index.update(driver_id, fleet.lat[row], fleet.lon[row], "sedan", fleet.available[row])
+
+    for i in range(args.drivers):
+        driver_id = f"R{i:05d}"
+        fleet.upsert(driver_id, name=driver_id, lat=28.48 + rng.random() * 0.18,
+                     lon=77.03 + rng.random() * 0.16, battery=float(rng.uniform(40, 100)),
+                     vehicle_type="sedan", rating=4.5)
+        sync(driver_id)
+
+    releases = []  # (time, driver_id, lat, lon)
+    pickup_km, waits_s, solve_ms, unmatched = [], [], [], 0
+
+    def release_until(t):
+        while releases and releases[0][0] <= t:
+            _, driver_id, lat, lon = heapq.heappop(releases)
+            fleet.move(driver_id, lat, lon)
+            reservations.release(driver_id)
+            sync(driver_id)
+
+    def settle(now, batch, results):
+        nonlocal unmatched
+        for trip, (row, km) in zip(batch, results):
+            if row is None:
+                unmatched += 1
+                continue
+            driver_id = fleet.driver_ids[row]
+            sync(driver_id)
+            pickup_km.append(km)
+            waits_s.append(now - trip[0])
+            drive_s = km / args.speed_kmh * 3600 * args.trip_scale
+            heapq.heappush(releases, (now + drive_s + trip[5], driver_id, trip[3], trip[4]))
+
+    if window_s == 0:
+        for trip in trips:
+            release_until(trip[0])
+            started = time.perf_counter()
+            result = model_manager.claim_nearest_driver(trip[1], trip[2], index, fleet,
+                                                        reservations)
+            solve_ms.append((time.perf_counter() - started) * 1000)
+            settle(trip[0], [trip], [result])
+    else:
+        i = 0
+        window_end = window_s
+        while i < len(trips):
+            batch = []
+            while i < len(trips) and trips[i][0] < window_end:
+                batch.append(trips[i])
+                i += 1
+            release_until(window_end)
+            if batch:
+                started = time.perf_counter()
+                results = model_manager.assign_window([(t[1], t[2], None) for t in batch],
+                                                      index, fleet, reservations)
+                solve_ms.append((time.perf_counter() - started) * 1000)
+                settle(window_end, batch, results)
+            window_end += window_s
+
+    km = np.asarray(pickup_km)
+    return {
+        "matched": len(km), "unmatched": unmatched,
+        "mean_km": km.mean(), "p90_km": np.percentile(km, 90),
+        "total_km": km.sum(), "mean_wait_s": float(np.mean(waits_s)),
+        "solve_ms": solve_ms
+    }
+
+
+def bench_dispatch_replay(args):
+    """Mean pickup distance and solver time: greedy vs windowed assignment"""
+    import os
+
+    print_section("DISPATCH REPLAY (greedy vs windowed assignment)")
+    here = os.path.dirname(os.path.abspath(__file__))
+    trips = replay_traffic(os.path.join(here, "your_ride_data.csv"), args.rate, args.trip_scale,
+                           np.random.default_rng(0))
+    print(f"   {len(trips):,} requests from your_ride_data.csv at ~{args.rate:g}/s, "
+          f"{args.drivers} drivers, trip time x{args.trip_scale:g}")
+    for window_s in [0.0] + args.windows:
+        m = _dispatch_replay_run(trips, args, window_s)
+        name = "greedy" if window_s == 0 else f"window {window_s:g}s"
+        per = "per request" if window_s == 0 else "per window"
+        solve = np.asarray(m["solve_ms"])
+        print(f"   {name:11s} matched={m['matched']:5,d} unmatched={m['unmatched']:4,d}  "
+              f"pickup mean={m['mean_km']:5.2f} km p90={m['p90_km']:5.2f} km  "
+              f"added wait={m['mean_wait_s']:4.2f} s  solver {per}: "
+              f"p50={np.percentile(solve, 50):6.2f} ms p99={np.percentile(solve, 99):6.2f} ms")
+
+
+# Durable ride store throughput
+
+async def _ride_store_run(rides_db, n_rides, concurrency):
+    """Full ride lifecycles (create, accept, complete), each change flushed before the next"""
+    queue = list(range(n_rides))
+
+    async def client():
+        while queue:
+            i = queue.pop()
+            ride_id = f"BENCH_{i}"
+            rides_db.add({
+                "ride_id": ride_id, "user_id": f"U{i % 1000}", "driver_id": f"D{i % 5000}",
+                "pickup": {"latitude": 28.61, "longitude": 77.21},
+                "dropoff": {"latitude": 28.65, "longitude": 77.23},
+                "fare": 250.0, "base_fare": 200.0, "surge_multiplier": 1.25, "distance": 6.2,
+                "duration": 18.0, "demand_factor": 1.1, "traffic_level": "medium",
+                "status": "pending", "created_at": "2026-01-01T08:00:00"
+            })
+            await rides_db.flush()
+            rides_db.transition(ride_id, "accepted", accepted_at="2026-01-01T08:00:05")
+            await rides_db.flush()
+            rides_db.transition(ride_id, "completed", completed_at="2026-01-01T08:20:00")
+            await rides_db.flush()
+
+    started = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    await rides_db.close()
+    return elapsed
+
+
+def bench_ride_store(args):
+    """Sustained rides/s with the in-memory store vs the group-committed log"""
+    import shutil
+    import tempfile
+
+    from ride_log import open_ride_repository
+
+    print_section("RIDE STORE THROUGHPUT (create + accept + complete, each flushed)")
+    directory = args.dir or tempfile.mkdtemp(prefix="evride-rides-")
+    print(f"   log directory: {directory}")
+    try:
+        for concurrency in args.concurrency:
+            n_rides = args.rides if concurrency > 1 else max(1, args.rides // 20)
+            line = f"   concurrency={concurrency:4d}"
+            for store in ("memory", "log"):
+                path = f"{directory}/c{concurrency}"
+                rides_db = open_ride_repository(store, path, args.snapshot_every)
+                elapsed = asyncio.run(_ride_store_run(rides_db, n_rides, concurrency))
+                line += f"  {store}: {n_rides / elapsed:9,.0f} rides/s"
+                if store == "log":
+                    stats = rides_db.store_stats()
+                    line += (f" ({stats['mean_batch']:6.1f} events/fsync, "
+                             f"{stats['batches'] / n_rides:4.2f} fsyncs/ride)")
+            print(line)
+
+        path = f"{directory}/c{max(args.concurrency)}"
+        started = time.perf_counter()
+        recovered = open_ride_repository("log", path, args.snapshot_every)
+        recovery_s = time.perf_counter() - started
+        recovered.verify()
+        print(f"   recovery: {len(recovered):,} rides from {recovered.recovered:,} snapshot rides and events "
+              f"in {recovery_s * 1000:.0f} ms")
+        asyncio.run(recovered.close())
+    finally:
+        if not args.dir:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+# Training data loading: whole-file read_csv vs chunked compact stream
+
+def dataset_load_child(args):
+    """Load the CSV one way and print rows/s and peak RSS as JSON"""
+    import contextlib
+    import io
+    import json
+    import os
+    import sys
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from chunked_dataset import load_shards
+    from dataset_integration import EVRideDatasetLoader
+
+    rss_before = _proc_status_kb("VmRSS")
+    loader = EVRideDatasetLoader(args.path)
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if args.mode == "eager":
+            loader.load_data()
+            df = loader.preprocess_data()
+        elif args.mode == "chunked":
+            df = loader.load_data_chunked(args.chunksize)
+        else:
+            meta = loader.spill_chunked(args.spill_dir, args.chunksize)
+    elapsed = time.perf_counter() - started
+    peak_mb = (_proc_status_kb("VmHWM") - rss_before) / 1024
+    if args.mode == "spill":
+        df = load_shards(args.spill_dir)  # Only to report the size of the result
+    print(json.dumps({
+        "seconds": elapsed,
+        "rows": len(df),
+        "peak_mb": peak_mb,
+        "frame_mb": df.memory_usage(deep=True).sum() / 1024**2
+    }))
+
+
+def bench_dataset_load(args):
+    """Peak RSS and rows/s: load_data + preprocess_data vs the chunked loader"""
+    import json
+    import os
+    import shutil
+    import subprocess
+    import sys
+    import tempfile
+
+    print_section("TRAINING DATA LOAD: PEAK RSS & ROWS/S")
+    directory = tempfile.mkdtemp(prefix="evride-dataset-")
+    try:
+        path = os.path.join(directory, "rides.csv")
+        size_mb = tile_csv(args.csv, args.rows, path)
+        print(f"   input: {args.rows:,}+ rows tiled from {args.csv}, {size_mb:.0f} MB CSV")
+
+        for mode in ("eager", "chunked", "spill"):
+            out = subprocess.run(
+                [sys.executable, "-W", "ignore", __file__, "dataset-load-child", mode, path,
+                 "--chunksize", str(args.chunksize), "--spill-dir",
+                 os.path.join(directory, "shards")],
+                stdout=subprocess.PIPE, text=True, check=True
+            ).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            print(f"   {mode:8s} {r['rows'] / r['seconds']:10,.0f} rows/s  "
+                  f"peak RSS +{r['peak_mb']:7.1f} MB  result frame {r['frame_mb']:7.1f} MB"
+                  f"{'  (on disk)' if mode == 'spill' else ''}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def tile_csv(sample_path, rows, path):
+    """Write sample_path repeated to at least `rows` data rows; returns the size in MB"""
+    import os
+
+    import pandas as pd
+
+    sample = pd.read_csv(sample_path)
+    with open(path, "w") as f:
+        sample.head(0).to_csv(f, index=False)
+        body = sample.to_csv(index=False, header=False)
+        for _ in range(-(-rows // len(sample))):
+            f.write(body)
+    return os.path.getsize(path) / 1024**2
+
+
+def bench_dataset_cache(args):
+    """Time to a training-ready frame: prepare from CSV vs a prepared-dataset cache hit"""
+    import contextlib
+    import io
+    import os
+    import shutil
+    import tempfile
+
+    from dataset_cache import DatasetCache, cache_key, file_digest
+    from dataset_integration import EVRideDatasetLoader
+
+    print_section("PREPARED DATASET CACHE: CSV -> TRAINING-READY FRAME")
+    directory = tempfile.mkdtemp(prefix="evride-dataset-")
+    try:
+        path = os.path.join(directory, "rides.csv")
+        size_mb = tile_csv(args.csv, args.rows, path)
+        print(f"   input: {args.rows:,}+ rows tiled from {args.csv}, {size_mb:.0f} MB CSV")
+        started = time.perf_counter()
+        file_digest(path)
+        print(f"   content hash: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+        for chunked in (False, True):
+            cache = DatasetCache(os.path.join(directory, "cache"))
+            loader = EVRideDatasetLoader(path)
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                if chunked:
+                    loader.load_data_chunked(args.chunksize)
+                else:
+                    loader.load_data()
+                    loader.preprocess_data()
+                loader.encode_categorical()
+            prepare_s = time.perf_counter() - started
+            with contextlib.redirect_stdout(io.StringIO()):
+                loader.save_cached(cache, chunked)
+            save_s = time.perf_counter() - started - prepare_s
+
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                df = EVRideDatasetLoader(path).load_cached(cache, chunked)
+            hit_s = time.perf_counter() - started
+            entry = cache.path(cache_key(path, loader.cleaning_config(chunked)))
+            entry_mb = sum(os.path.getsize(os.path.join(entry, f))
+                           for f in os.listdir(entry)) / 1024**2
+            print(f"   {'chunked' if chunked else 'eager':8s} prepare {prepare_s:6.2f} s  "
+                  f"+ write cache {save_s:5.2f} s  |  cache hit {hit_s:5.2f} s "
+                  f"({len(df):,} rows, {entry_mb:.0f} MB on disk)")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+# Dataset summary: pandas passes vs one mergeable pass
+
+def quantile_rank_error(values, estimate, q):
+    """How far (as a fraction of rows) estimate's rank is from q; 0 when estimate is a valid q-quantile"""
+    low = np.searchsorted(values, estimate, "left") / len(values)
+    high = np.searchsorted(values, estimate, "right") / len(values)
+    return 0.0 if low <= q <= high else min(abs(low - q), abs(high - q))
+
+
+def bench_summary_stats(args):
+    """get_summary figures: describe/value_counts/per-column passes vs one DatasetSummary pass"""
+    import contextlib
+    import io
+
+    import pandas as pd
+
+    from dataset_integration import SUMMARY_CATEGORICALS, EVRideDatasetLoader
+    from summary_stats import DESCRIBE_QUANTILES, summarize_frame
+
+    print_section("DATASET SUMMARY: PANDAS PASSES VS ONE MERGEABLE PASS")
+    loader = EVRideDatasetLoader(args.csv)
+    with contextlib.redirect_stdout(io.StringIO()):
+        loader.load_data()
+        loader.preprocess_data()
+        loader.encode_categorical()
+    df = pd.concat([loader.df] * max(1, args.rows // len(loader.df)), ignore_index=True)
+    print(f"   {len(df):,} rows × {len(df.columns)} columns")
+
+    started = time.perf_counter()
+    reference = df.describe()
+    top = {col: df[col].value_counts().head(5) for col in SUMMARY_CATEGORICALS}
+    fare = df["fare_amount_inr"]
+    fare.mean(), fare.median(), fare.min(), fare.max(), fare.std()
+    df["distance_km"].mean(), df["distance_km"].sum()
+    df["duration_minutes"].mean(), df["duration_minutes"].sum()
+    pandas_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    summary = summarize_frame(df, args.chunk_rows, SUMMARY_CATEGORICALS)
+    summary_s = time.perf_counter() - started
+
+    parts = np.array_split(np.arange(len(df)), args.workers)
+    merged = summarize_frame(df.iloc[parts[0]], args.chunk_rows, SUMMARY_CATEGORICALS)
+    for part in parts[1:]:
+        merged.merge(summarize_frame(df.iloc[part], args.chunk_rows, SUMMARY_CATEGORICALS))
+
+    for label, result in (("one pass", summary), (f"{args.workers} merged", merged)):
+        described = result.describe()
+        moments = ["count", "mean", "std", "min", "max"]
+        rel = ((described.loc[moments] - reference.loc[moments]).abs()
+               / reference.loc[moments].abs().clip(lower=1e-12)).max().max()
+        rank_error = 0.0
+        for col in reference.columns:
+            values = np.sort(df[col].to_numpy(dtype=np.float64))
+            for q in DESCRIBE_QUANTILES:
+                rank_error = max(rank_error, quantile_rank_error(
+                    values, described.loc[f"{q * 100:g}%", col], q))
+        top_exact = all(dict(result.top[col].most_common(5)) == top[col].to_dict()
+                        for col in SUMMARY_CATEGORICALS)
+        print(f"   {label:10s} moments max rel err {rel:.1e}  "
+              f"quartile max rank err {rank_error * 100:.2f}%  top-5 exact: {top_exact}")
+    print(f"   pandas passes {pandas_s * 1000:7.0f} ms   one pass {summary_s * 1000:7.0f} ms")
+
+
+# Incremental retraining: warm-started trees on new rows vs a full refit
+
+def bench_retrain(args):
+    """Fit time and MAE on shifted fares: grow_forest on new rows vs refitting history + new"""
+    import contextlib
+    import io
+    import pickle
+
+    from dataset_integration import EnhancedFarePredictor, EVRideDatasetLoader
+    from incremental_training import grow_forest
+
+    print_section("INCREMENTAL RETRAIN: WARM-STARTED TREES VS FULL REFIT")
+    loader = EVRideDatasetLoader(args.csv)
+    predictor = EnhancedFarePredictor()
+    with contextlib.redirect_stdout(io.StringIO()):
+        loader.load_data()
+        loader.preprocess_data()
+        loader.encode_categorical()
+        X, y = predictor.prepare_features(loader.df)
+    X, y = X.to_numpy(dtype=np.float64), y.to_numpy(dtype=np.float64)
+    rng = np.random.default_rng(0)
+    # Recent rides are priced args.drift times higher than the history
+    holdout = rng.integers(len(X), size=2000)
+    X_recent, y_recent = X[holdout], y[holdout] * args.drift
+    print(f"   rows sampled from {args.csv}; new rides' fares x{args.drift}, "
+          f"+{args.trees} trees per update")
+
+    for history in args.history:
+        rows = rng.integers(len(X), size=history)
+        base = EnhancedFarePredictor()
+        base.feature_columns = predictor.feature_columns
+        started = time.perf_counter()
+        base.model.fit(base.scaler.fit_transform(X[rows]), y[rows])
+        print(f"\n   history {history:,} rows: initial fit {time.perf_counter() - started:6.2f} s, "
+              f"MAE on recent {np.abs(base.model.predict(base.scaler.transform(X_recent)) - y_recent).mean():7.2f}")
+        for new in args.new:
+            fresh = rng.integers(len(X), size=new)
+            X_new, y_new = X[fresh], y[fresh] * args.drift
+
+            model = pickle.loads(pickle.dumps(base.model))
+            started = time.perf_counter()
+            grow_forest(model, base.scaler, X_new, y_new, args.trees,
+                        max_trees=len(model.estimators_))  # Age out as many as added
+            grow_s = time.perf_counter() - started
+            grow_mae = np.abs(model.predict(base.scaler.transform(X_recent)) - y_recent).mean()
+
+            full = EnhancedFarePredictor()
+            started = time.perf_counter()
+            full.model.fit(full.scaler.fit_transform(np.vstack([X[rows], X_new])),
+                           np.concatenate([y[rows], y_new]))
+            full_s = time.perf_counter() - started
+            full_mae = np.abs(full.model.predict(full.scaler.transform(X_recent)) - y_recent).mean()
+            print(f"     +{new:6,} new   incremental {grow_s:6.2f} s  MAE {grow_mae:7.2f}  |  "
+                  f"full refit {full_s:6.2f} s  MAE {full_mae:7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EV ride serving benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("event-loop", help="Cheap endpoint latency under concurrent quote load")
+    p.add_argument("--executor", choices=["inline", "thread", "process"], default=None)
+    p.add_argument("--duration", type=float, default=5.0)
+    p.add_argument("--clients", type=int, default=8)
+    p.add_argument("--batch", type=int, default=50)
+    p.add_argument("--port", type=int, default=8765)
+    p.set_defaults(func=bench_event_loop)
+
+    p = sub.add_parser("model-load", help="Load time and RSS per worker, pickle vs mmap bundle")
+    p.add_argument("--workers", type=int, default=4)
+    p.set_defaults(func=bench_model_load)
+
+    p = sub.add_parser("cold-start", help="Time from process launch to bind, ready and first quote")
+    p.add_argument("--modules", nargs="+", default=["main_integrated", "main_enhanced"])
+    p.add_argument("--runs", type=int, default=3)
+    p.add_argument("--port", type=int, default=8766)
+    p.set_defaults(func=bench_cold_start)
+
+    p = sub.add_parser("location-fanout", help="CPU and send rate of /ws/driver location pushes")
+    p.add_argument("--subscribers", type=int, default=10000)
+    p.add_argument("--drivers", type=int, default=1000)
+    p.add_argument("--duration", type=float, default=10.0)
+    p.add_argument("--report-interval", type=float, default=1.0)
+    p.add_argument("--stationary", type=float, default=0.4)
+    p.add_argument("--slow-fraction", type=float, default=0.01)
+    p.add_argument("--min-move-m", type=float, default=10.0)
+    p.set_defaults(func=bench_location_fanout)
+
+    p = sub.add_parser("telemetry", help="Bulk telemetry ingestion throughput, updates/s per core")
+    p.add_argument("--drivers", type=int, default=50000)
+    p.add_argument("--batches", type=int, default=200)
+    p.add_argument("--batch", type=int, default=1000)
+    p.add_argument("--http-batches", type=int, default=200)
+    p.add_argument("--clients", type=int, default=4)
+    p.add_argument("--port", type=int, default=8767)
+    p.set_defaults(func=bench_telemetry)
+
+    p = sub.add_parser("reservation", help="Concurrent claim stress test: double assignments, contention")
+    p.add_argument("--threads", type=int, default=8)
+    p.add_argument("--cells", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    p.add_argument("--drivers-per-cell", type=int, default=200)
+    p.add_argument("--stripes", type=int, default=64)
+    p.add_argument("--switch-interval", type=float, default=1e-5)
+    p.set_defaults(func=bench_reservation)
+
+    p = sub.add_parser("dispatch-replay", help="Pickup distance and solver time, greedy vs batch")
+    p.add_argument("--drivers", type=int, default=3000)
+    p.add_argument("--rate", type=float, default=10.0, help="Mean ride requests per second")
+    p.add_argument("--trip-scale", type=float, default=0.1)
+    p.add_argument("--speed-kmh", type=float, default=25.0)
+    p.add_argument("--windows", type=float, nargs="+", default=[1.0, 2.0])
+    p.set_defaults(func=bench_dispatch_replay)
+
+    p = sub.add_parser("ride-store", help="Rides/s with durability on vs the in-memory store")
+    p.add_argument("--rides", type=int, default=20000)
+    p.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 128])
+    p.add_argument("--snapshot-every", type=int, default=10000)
+    p.add_argument("--dir", default=None, help="Log directory (default: a temp dir)")
+    p.set_defaults(func=bench_ride_store)
+
+    p = sub.add_parser("dataset-load", help="Peak RSS and rows/s, whole-file vs chunked CSV load")
+    p.add_argument("--csv", default="your_ride_data.csv", help="Sample tiled into the test file")
+    p.add_argument("--rows", type=int, default=1_000_000)
+    p.add_argument("--chunksize", type=int, default=100_000)
+    p.set_defaults(func=bench_dataset_load)
+
+    p = sub.add_parser("dataset-cache", help="Prepare-from-CSV vs prepared-dataset cache hit")
+    p.add_argument("--csv", default="your_ride_data.csv", help="Sample tiled into the test file")
+    p.add_argument("--rows", type=int, default=1_000_000)
+    p.add_argument("--chunksize", type=int, default=100_000)
+    p.set_defaults(func=bench_dataset_cache)
+
+    p = sub.add_parser("summary-stats", help="get_summary figures: pandas passes vs one pass")
+    p.add_argument("--csv", default="your_ride_data.csv", help="Sample tiled into the frame")
+    p.add_argument("--rows", type=int, default=1_000_000)
+    p.add_argument("--chunk-rows", type=int, default=100_000)
+    p.add_argument("--workers", type=int, default=4, help="Partial summaries to merge")
+    p.set_defaults(func=bench_summary_stats)
+
+    p = sub.add_parser("retrain", help="Incremental warm-start retrain vs full refit, time and MAE")
+    p.add_argument("--csv", default="your_ride_data.csv", help="Rows sampled for history and new rides")
+    p.add_argument("--history", type=int, nargs="+", default=[20_000, 80_000])
+    p.add_argument("--new", type=int, nargs="+", default=[1_000, 5_000])
+    p.add_argument("--trees", type=int, default=20, help="Trees added per update")
+    p.add_argument("--drift", type=float, default=1.1, help="Fare multiplier on new rides")
+    p.set_defaults(func=bench_retrain)
+
+    p = sub.add_parser("dataset-load-child")
+    p.add_argument("mode", choices=["eager", "chunked", "spill"])
+    p.add_argument("path")
+    p.add_argument("--chunksize", type=int, default=100_000)
+    p.add_argument("--spill-dir")
+    p.set_defaults(func=dataset_load_child)
+
+    p = sub.add_parser("model-load-child")
+    p.add_argument("format", choices=["pickle", "bundle"])
+    p.set_defaults(func=model_load_child)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
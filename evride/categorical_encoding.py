@@ -0,0 +1,119 @@
+import threading
+from collections import Counter
+
+import numpy as np
+
+
+# Request-side spellings that differ from the dataset labels (after normalize)
+ALIASES = {
+    'vehicle_type': {'hatchback': 'compact'},
+    'time_of_day': {
+        'morning': 'morning_peak',
+        'evening': 'evening_peak',
+        'afternoon': 'day_time',
+        'day': 'day_time',
+    },
+    'weather_condition': {'sunny': 'clear'},
+}
+
+# Distinct unseen values remembered per category (counts are always kept)
+MAX_TRACKED_UNSEEN = 100
+
+
+def normalize(value):
+    """Case/spacing-insensitive form of a categorical value"""
+    return str(value).strip().lower().replace(' ', '_').replace('-', '_')
+
+
+def label_classes(label_encoders):
+    """Plain {category: [labels]} from fitted LabelEncoders, safe to store as JSON"""
+    return {
+        category: [str(label) for label in encoder.classes_]
+        for category, encoder in label_encoders.items()
+    }
+
+
+class CompiledEncoders:
+    """Fitted LabelEncoders compiled into plain dict lookups
+
+    "sedan", "Sedan" and " SEDAN " all map to the same code, request-side
+    aliases such as "evening" resolve to dataset labels like "Evening_Peak",
+    and anything still unknown gets fallback_code and is counted instead of
+    raising. Encoding runs on executor threads, so the unseen counters are
+    only touched under a lock.
+    """
+
+    def __init__(self, label_encoders=None, fallback_code=0):
+        self.fallback_code = fallback_code
+        self.maps = {}
+        self.unseen_total = Counter()
+        self.unseen_values = {}
+        self._unseen_lock = threading.Lock()
+        self._compile({
+            category: encoder.classes_ for category, encoder in (label_encoders or {}).items()
+        })
+
+    @classmethod
+    def from_classes(cls, classes, fallback_code=0):
+        """Build from {category: [labels in code order]}, e.g. label_classes()"""
+        encoders = cls(fallback_code=fallback_code)
+        encoders._compile(classes)
+        return encoders
+
+    def _compile(self, classes):
+        for category, labels in classes.items():
+            mapping = {normalize(label): code for code, label in enumerate(labels)}
+            for alias, target in ALIASES.get(category, {}).items():
+                if target in mapping and alias not in mapping:
+                    mapping[alias] = mapping[target]
+            self.maps[category] = mapping
+
+    def encode(self, value, category):
+        """Integer code for one value"""
+        mapping = self.maps.get(category)
+        if mapping is None:
+            return self.fallback_code
+        code = mapping.get(normalize(value))
+        if code is None:
+            self._count_unseen(category, value, 1)
+            return self.fallback_code
+        return code
+
+    def encode_many(self, values, category):
+        """Integer codes for a batch, resolving each distinct value once"""
+        values = np.asarray([str(v) for v in values], dtype=object)
+        if len(values) == 0:
+            return np.zeros(0, dtype=np.int64)
+        uniques, inverse = np.unique(values, return_inverse=True)
+        codes = np.empty(len(uniques), dtype=np.int64)
+        counts = np.bincount(inverse, minlength=len(uniques))
+
+        mapping = self.maps.get(category)
+        for i, value in enumerate(uniques):
+            code = None if mapping is None else mapping.get(normalize(value))
+            if code is None:
+                code = self.fallback_code
+                if mapping is not None:
+                    self._count_unseen(category, value, int(counts[i]))
+            codes[i] = code
+        return codes[inverse]
+
+    def _count_unseen(self, category, value, count):
+        with self._unseen_lock:
+            self.unseen_total[category] += count
+            tracked = self.unseen_values.setdefault(category, Counter())
+            if value in tracked or len(tracked) < MAX_TRACKED_UNSEEN:
+                tracked[value] += count
+
+    def stats(self):
+        with self._unseen_lock:
+            unseen_total = dict(self.unseen_total)
+            unseen_values = {
+                category: dict(counter.most_common(10))
+                for category, counter in self.unseen_values.items()
+            }
+        return {
+            "fallback_code": self.fallback_code,
+            "unseen_total": unseen_total,
+            "unseen_values": unseen_values
+        }
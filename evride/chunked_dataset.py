@@ -0,0 +1,337 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+
+# Compact dtypes for the ride CSV, keyed by normalized (lower-case) column name.
+# Columns not listed here (trip_id) are skipped unless given a dtype.
+RIDE_DTYPES = {
+    'city': 'category',
+    'distance_km': 'float32',
+    'duration_minutes': 'float32',
+    'traffic_level': 'int16',
+    'demand_factor': 'float32',
+    'battery_health_percent': 'int16',
+    'energy_consumption_kwh': 'float32',
+    'route_difficulty': 'int16',
+    'vehicle_type': 'category',
+    'time_of_day': 'category',
+    'day_of_week': 'category',
+    'weather_condition': 'category',
+    'temperature_celsius': 'int16',
+    'humidity_percent': 'int16',
+    'driver_rating': 'float32',
+    'surge_multiplier': 'float32',
+    'historical_pricing_factor': 'float32',
+    'is_holiday': 'int8',
+    'charging_stations_nearby': 'int16',
+    'user_type': 'category',
+    'fare_amount_inr': 'float32',
+}
+
+# (column, low, high) bounds every cleaned ride must satisfy
+VALID_RANGES = [
+    ('distance_km', 0.5, 200),             # realistic range: 0.5 to 200 km
+    ('fare_amount_inr', 10, 10000),        # realistic range: ₹10 to ₹10000
+    ('duration_minutes', 5, 300),          # realistic range: 5 to 300 minutes
+    ('battery_health_percent', 50, 100),
+    ('driver_rating', 1, 5),               # 1-5 scale
+]
+
+
+def normalize_column(name):
+    return name.lower().strip()
+
+
+def valid_rows(columns):
+    """Mask of rows inside every VALID_RANGES bound; columns is a DataFrame or a dict of arrays"""
+    mask = slice(None)  # No bounded column: keep everything
+    for col, low, high in VALID_RANGES:
+        if col in columns:
+            values = np.asarray(columns[col])
+            inside = (values >= low) & (values <= high)
+            mask = inside if isinstance(mask, slice) else mask & inside
+    return mask
+
+
+def _is_integer(dtype):
+    return dtype != 'category' and np.issubdtype(np.dtype(dtype), np.integer)
+
+
+class RideCsvStream:
+    """Reads a ride CSV in chunks with compact dtypes and cleans it like preprocess_data
+
+    Categories get one code table for the whole file, so chunks encode to
+    the same codes and concatenate without falling back to object strings.
+    Complete rows are range-checked and emitted chunk by chunk. Rows with a
+    missing value wait until the end, because preprocess_data fills them
+    with whole-file medians (numbers) and modes (categories) before it
+    filters: modes come from running category counts, medians from a
+    second pass over just the affected columns, which is skipped when
+    nothing is missing.
+    """
+
+    def __init__(self, file_path, chunksize=100_000, usecols=None, dtypes=None):
+        self.file_path = file_path
+        self.chunksize = chunksize
+        dtypes = dict(RIDE_DTYPES, **(dtypes or {}))
+        header = pd.read_csv(file_path, nrows=0, encoding='utf-8').columns
+        raw_names = {normalize_column(name): name for name in header}
+        if usecols is None:
+            usecols = [name for name in raw_names if name in dtypes]
+        else:
+            usecols = [normalize_column(name) for name in usecols]
+            absent = [name for name in usecols if name not in raw_names]
+            if absent:
+                raise ValueError(f"Columns {absent} not in {file_path}")
+            untyped = [name for name in usecols if name not in dtypes]
+            if untyped:
+                raise ValueError(f"No dtype for columns {untyped}; pass them in dtypes")
+        self.columns = usecols
+        self.dtypes = {name: dtypes[name] for name in usecols}
+        self.raw_names = {raw_names[name]: name for name in usecols}
+        self.categories = {name: {} for name, dtype in self.dtypes.items() if dtype == 'category'}
+        self.category_counts = {name: np.zeros(0, dtype=np.int64) for name in self.categories}
+        self.missing = dict.fromkeys(usecols, 0)
+        self.fill_values = {}
+        self.rows_read = 0
+        self.rows_kept = 0
+
+    def _read(self, columns, chunksize):
+        read_dtypes = {}
+        for raw, name in self.raw_names.items():
+            if name in columns:
+                dtype = self.dtypes[name]
+                # Integers parse as float32 (exact for int16, NaN for gaps) on the
+                # C parser's fast path; nullable Int16 parsing is ~3x slower
+                read_dtypes[raw] = 'float32' if _is_integer(dtype) else dtype
+        reader = pd.read_csv(self.file_path, encoding='utf-8', usecols=list(read_dtypes),
+                             dtype=read_dtypes, chunksize=chunksize)
+        for chunk in reader:
+            yield chunk.rename(columns=self.raw_names)
+
+    def _codes(self, name, values):
+        """Codes of a chunk's categorical in the file-wide table; -1 where missing"""
+        known = self.categories[name]
+        lookup = np.array([known.setdefault(value, len(known)) for value in values.categories],
+                          dtype=np.int32)
+        if len(known) > np.iinfo(np.int16).max:
+            raise ValueError(f"Too many categories in {name} for int16 codes")
+        codes = np.asarray(values.codes)
+        codes = np.where(codes >= 0, lookup[codes] if len(lookup) else -1, -1).astype(np.int16)
+        counts = np.bincount(codes[codes >= 0], minlength=len(known))
+        running = self.category_counts[name]
+        counts[:len(running)] += running
+        self.category_counts[name] = counts
+        return codes
+
+    def _encode(self, chunk):
+        """Column arrays of one chunk plus its mask of rows with a missing value"""
+        columns = {}
+        incomplete = np.zeros(len(chunk), dtype=bool)
+        for name in self.columns:
+            if self.dtypes[name] == 'category':
+                values = self._codes(name, chunk[name].array)
+                gaps = values < 0
+            else:
+                values = chunk[name]
+                gaps = values.isna().to_numpy()
+            self.missing[name] += int(gaps.sum())
+            incomplete |= gaps
+            columns[name] = values
+        return columns, incomplete
+
+    def _compact(self, columns, rows):
+        """Select rows and convert every column to its compact dtype (no gaps left)"""
+        compact = {}
+        for name, values in columns.items():
+            dtype = self.dtypes[name]
+            if dtype == 'category':
+                compact[name] = values[rows]
+                continue
+            values = values.to_numpy()[rows]
+            if _is_integer(dtype) and not (np.trunc(values) == values).all():
+                if name not in self.fill_values:
+                    raise ValueError(f"Column {name} has fractional values; give it a float dtype")
+                dtype = 'float32'  # A fractional median filled an integer column
+            compact[name] = values.astype(dtype)
+        return compact
+
+    def _medians(self, names):
+        """Whole-file medians of numeric columns, NaN skipped as pandas does"""
+        values = {name: [] for name in names}
+        for chunk in self._read(names, self.chunksize):
+            for name in names:
+                column = chunk[name].dropna().to_numpy()
+                values[name].append(column)
+        return {name: float(np.median(np.concatenate(parts))) for name, parts in values.items()}
+
+    def _mode(self, name):
+        """Most frequent category; ties go to the smallest value, as Series.mode() orders them"""
+        counts = self.category_counts[name]
+        labels = list(self.categories[name])
+        best = np.flatnonzero(counts == counts.max())
+        return int(min(best, key=lambda code: labels[code]))
+
+    def _fill(self, deferred):
+        """Fill and clean the held-back incomplete rows"""
+        numeric = [name for name in self.columns
+                   if self.missing[name] and self.dtypes[name] != 'category']
+        self.fill_values = self._medians(numeric) if numeric else {}
+        for name in self.categories:
+            if self.missing[name]:
+                self.fill_values[name] = self._mode(name)
+
+        rows = np.concatenate([part[0] for part in deferred])
+        columns = {}
+        for name in self.columns:
+            values = [part[1][name] for part in deferred]
+            if self.dtypes[name] == 'category':
+                values = np.concatenate(values)
+                if name in self.fill_values:
+                    values = np.where(values < 0, self.fill_values[name], values)
+            else:
+                values = pd.concat(values)
+                if name in self.fill_values:
+                    values = values.fillna(self.fill_values[name])
+            columns[name] = values
+        compact = self._compact(columns, slice(None))
+        keep = valid_rows(compact)
+        return rows[keep], {name: values[keep] for name, values in compact.items()}
+
+    def __iter__(self):
+        """Yield (original row numbers, {column: array}) per cleaned chunk"""
+        deferred = []
+        for chunk in self._read(self.columns, self.chunksize):
+            self.rows_read += len(chunk)
+            columns, incomplete = self._encode(chunk)
+            rows = chunk.index.to_numpy()
+            if incomplete.any():
+                deferred.append((rows[incomplete], {
+                    name: values[incomplete] for name, values in columns.items()
+                }))
+            compact = self._compact(columns, ~incomplete)
+            keep = valid_rows(compact)
+            kept_rows = rows[~incomplete][keep]
+            self.rows_kept += len(kept_rows)
+            yield kept_rows, {name: values[keep] for name, values in compact.items()}
+        if deferred:
+            rows, compact = self._fill(deferred)
+            self.rows_kept += len(rows)
+            yield rows, compact
+
+    def category_labels(self, name):
+        return list(self.categories[name])
+
+    def frame(self, rows, columns):
+        """DataFrame from stream output, with categoricals on the file-wide tables"""
+        data = {}
+        for name in self.columns:
+            values = columns[name]
+            if self.dtypes[name] == 'category':
+                values = pd.Categorical.from_codes(values, self.category_labels(name))
+            data[name] = values
+        return pd.DataFrame(data, index=pd.Index(rows), copy=False)
+
+    def fill_labels(self):
+        """fill_values with category codes turned back into their labels"""
+        return {name: self.category_labels(name)[value] if name in self.categories else value
+                for name, value in self.fill_values.items()}
+
+    def stats(self):
+        return {
+            'rows_read': self.rows_read,
+            'rows_kept': self.rows_kept,
+            'missing': {name: count for name, count in self.missing.items() if count},
+        }
+
+
+def load_compact(stream):
+    """Run a RideCsvStream into one compact in-memory DataFrame, in file row order"""
+    row_parts = []
+    parts = {name: [] for name in stream.columns}
+    for rows, columns in stream:
+        row_parts.append(rows)
+        for name, values in columns.items():
+            parts[name].append(values)
+    rows = np.concatenate(row_parts)
+    columns = {}
+    for name, values in parts.items():
+        columns[name] = np.concatenate(values)
+        parts[name] = None  # Drop each chunk list once joined
+    df = stream.frame(rows, columns)
+    if any(stream.missing.values()):
+        df = df.sort_index()  # Filled rows were held back to the end
+    return df
+
+
+def spill_shards(stream, directory, summary=None):
+    """Write a RideCsvStream to columnar shards: one .npy per column per chunk
+
+    A summary_stats.DatasetSummary passed as summary is fed every chunk.
+
+    Shards are written beside directory and renamed into place at the end,
+    so a reader never sees a half-written set. Rows that needed filling land
+    in the last shard, out of file order.
+    """
+    tmp_dir = directory.rstrip(os.sep) + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    n_shards = 0
+    for rows, columns in stream:
+        if summary is not None:
+            summary.update(stream.frame(rows, columns))
+        shard_dir = os.path.join(tmp_dir, f'shard-{n_shards:05d}')
+        os.makedirs(shard_dir)
+        np.save(os.path.join(shard_dir, '_row.npy'), rows.astype(np.int64))
+        for name, values in columns.items():
+            np.save(os.path.join(shard_dir, f'{name}.npy'), values)
+        n_shards += 1
+
+    meta = {
+        'source': os.path.abspath(stream.file_path),
+        'columns': stream.columns,
+        'dtypes': stream.dtypes,
+        'categories': {name: stream.category_labels(name) for name in stream.categories},
+        'shards': n_shards,
+        'fill_values': stream.fill_labels(),
+    }
+    meta.update(stream.stats())
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp_dir, directory)
+    return meta
+
+
+def iter_shards(directory, mmap=True):
+    """Yield each shard written by spill_shards() as a DataFrame
+
+    With mmap=True numeric columns are read-only views of the page cache.
+    """
+    with open(os.path.join(directory, 'meta.json')) as f:
+        meta = json.load(f)
+    for i in range(meta['shards']):
+        shard_dir = os.path.join(directory, f'shard-{i:05d}')
+
+        def read(name):
+            return np.load(os.path.join(shard_dir, f'{name}.npy'),
+                           mmap_mode='r' if mmap else None)
+
+        data = {}
+        for name in meta['columns']:
+            values = read(name)
+            if meta['dtypes'][name] == 'category':
+                values = pd.Categorical.from_codes(values, meta['categories'][name])
+            data[name] = values
+        yield pd.DataFrame(data, index=pd.Index(read('_row')), copy=False)
+
+
+def load_shards(directory):
+    """Every shard written by spill_shards() as one DataFrame, in file row order"""
+    df = pd.concat(list(iter_shards(directory, mmap=True)))
+    return df.sort_index() if not df.index.is_monotonic_increasing else df
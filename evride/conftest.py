@@ -0,0 +1,4 @@
+# pytest puts this directory on sys.path, so tests import the flat modules
+# (ride_repository, forest_evaluator, ...) the way the app does.
+# test_client.py drives a running server by hand; it is not a test module.
+collect_ignore = ["test_client.py"]
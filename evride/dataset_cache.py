@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+
+
+def file_digest(path, block_size=1 << 20):
+    """SHA-1 of a file's contents, read in blocks"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(path, config):
+    """Short key for a source file's contents plus the config that cleaned it"""
+    digest = hashlib.sha1(file_digest(path).encode())
+    digest.update(json.dumps(config, sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+def save_dataset(directory, df, label_encoders, meta):
+    """Write a prepared frame as one .npy per column, with its label encoders
+
+    Text columns are stored as category codes with their labels in
+    meta.json. The set is written beside directory and renamed into place,
+    so a reader never sees a half-written cache entry.
+    """
+    tmp_dir = directory.rstrip(os.sep) + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    dtypes, categories = {}, {}
+    for i, name in enumerate(df.columns):
+        values = df[name]
+        if not pd.api.types.is_numeric_dtype(values) and not isinstance(
+                values.dtype, pd.CategoricalDtype):
+            values = values.astype('category')
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            categories[name] = values.cat.categories.tolist()
+            dtypes[name] = 'category'
+            values = values.cat.codes
+        else:
+            dtypes[name] = str(values.dtype)
+        np.save(os.path.join(tmp_dir, f'{i:03d}.npy'), values.to_numpy())
+    np.save(os.path.join(tmp_dir, '_index.npy'), df.index.to_numpy())
+    joblib.dump(label_encoders, os.path.join(tmp_dir, 'label_encoders.pkl'))
+
+    meta = dict(meta, columns=list(df.columns), dtypes=dtypes, categories=categories,
+                rows=len(df), built_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp_dir, directory)
+    return meta
+
+
+def load_dataset(directory, mmap=True):
+    """Read a cache entry written by save_dataset(); returns (df, label_encoders, meta)
+
+    With mmap=True numeric columns are read-only views of the page cache.
+    """
+    with open(os.path.join(directory, 'meta.json')) as f:
+        meta = json.load(f)
+    mode = 'r' if mmap else None
+    data = {}
+    for i, name in enumerate(meta['columns']):
+        values = np.load(os.path.join(directory, f'{i:03d}.npy'), mmap_mode=mode)
+        if meta['dtypes'][name] == 'category':
+            values = pd.Categorical.from_codes(values, meta['categories'][name])
+        data[name] = values
+    index = pd.Index(np.load(os.path.join(directory, '_index.npy')))
+    df = pd.DataFrame(data, index=index, copy=False)
+    label_encoders = joblib.load(os.path.join(directory, 'label_encoders.pkl'))
+    return df, label_encoders, meta
+
+
+class DatasetCache:
+    """Directory of prepared datasets keyed by cache_key(), keeping the newest few"""
+
+    def __init__(self, root='cache/dataset', keep=3):
+        self.root = root
+        self.keep = keep
+
+    def path(self, key):
+        return os.path.join(self.root, key)
+
+    def get(self, key):
+        """(df, label_encoders, meta) for key, or None on a miss"""
+        path = self.path(key)
+        if not os.path.isfile(os.path.join(path, 'meta.json')):
+            return None
+        os.utime(path)  # Most recently used survives pruning
+        return load_dataset(path)
+
+    def put(self, key, df, label_encoders, meta):
+        os.makedirs(self.root, exist_ok=True)
+        meta = save_dataset(self.path(key), df, label_encoders, dict(meta, key=key))
+        self._prune()
+        return meta
+
+    def _prune(self):
+        entries = [os.path.join(self.root, name) for name in os.listdir(self.root)
+                   if not name.endswith('.tmp')]
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for path in entries[self.keep:]:
+            shutil.rmtree(path, ignore_errors=True)
@@ -5,18 +5,40 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import joblib
+import json
 import os
 from datetime import datetime
 import warnings
+from forest_evaluator import FlatForest, verify_against_sklearn
+from categorical_encoding import label_classes
+from chunked_dataset import (RIDE_DTYPES, VALID_RANGES, RideCsvStream, load_compact,
+                             spill_shards, valid_rows)
+from dataset_cache import DatasetCache, cache_key
+from summary_stats import DatasetSummary, summarize_frame
+from fare_tuning import load_tuned_params, save_tuning, tuning_path
+from fare_tuning import tune as tune_forest
 warnings.filterwarnings('ignore')
 
+# Columns encode_categorical label-encodes
+CATEGORICAL_FEATURES = ['city', 'traffic_level', 'vehicle_type',
+                        'time_of_day', 'weather_condition', 'user_type']
+
+# Columns get_summary reports the most frequent values of
+SUMMARY_CATEGORICALS = ['city', 'vehicle_type', 'time_of_day', 'weather_condition', 'user_type']
+
+# Bump when preprocess_data or encode_categorical change in a way the
+# prepared-dataset cache key cannot see (it already covers the rules above)
+PREPARED_DATASET_VERSION = 1
+
 class EVRideDatasetLoader:
     """Load and preprocess EV ride dataset"""
     
-    def _init_(self, file_path='your_ride_data.csv'):
+    def __init__(self, file_path='your_ride_data.csv'):
         self.file_path = file_path
         self.df = None
         self.label_encoders = {}
+        self.prepared_key = None
+        self.summary = None
         
     def load_data(self):
         """Load dataset from CSV file"""
@@ -39,6 +61,54 @@ class EVRideDatasetLoader:
             print(f" Error loading dataset: {e}")
             return None
     
+    def load_data_chunked(self, chunksize=100_000, usecols=None, dtypes=None):
+        """Stream the CSV in chunks with compact dtypes, cleaned as preprocess_data would
+
+        Columns are read with usecols and RIDE_DTYPES (category, float32,
+        int16) instead of inferred object/float64/int64, and each chunk is
+        cleaned on the way, so memory peaks at one raw chunk plus the compact
+        result. The frame needs no preprocess_data() afterwards.
+        """
+        try:
+            print(f" Streaming dataset: {self.file_path} ({chunksize:,} rows per chunk)")
+            stream = RideCsvStream(self.file_path, chunksize, usecols, dtypes)
+            self.df = load_compact(stream)
+        except FileNotFoundError:
+            print(f" File not found: {self.file_path}")
+            return None
+        except ValueError as e:
+            print(f" Error streaming dataset: {e}")
+            return None
+
+        self._report_stream(stream)
+        print(f" Clean dataset: {self.df.shape[0]} rows × {self.df.shape[1]} columns")
+        print(f" Memory usage: {self.df.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
+        return self.df
+
+    def spill_chunked(self, directory, chunksize=100_000, usecols=None, dtypes=None):
+        """Like load_data_chunked, but write the cleaned rows to columnar shards in directory
+
+        Nothing is kept in memory; read the shards back with
+        chunked_dataset.iter_shards() or load_shards(). get_summary() reports
+        on the statistics gathered on the way. Returns the shard metadata.
+        """
+        print(f" Spilling dataset: {self.file_path} -> {directory}")
+        stream = RideCsvStream(self.file_path, chunksize, usecols, dtypes)
+        self.df = None
+        self.summary = DatasetSummary(SUMMARY_CATEGORICALS)
+        meta = spill_shards(stream, directory, self.summary)
+        self._report_stream(stream)
+        print(f" Wrote {meta['rows_kept']:,} clean rows in {meta['shards']} shards")
+        return meta
+
+    def _report_stream(self, stream):
+        stats = stream.stats()
+        for col, count in stats['missing'].items():
+            print(f"   {col}: {count} missing, filled with {stream.fill_labels()[col]}")
+        removed = stats['rows_read'] - stats['rows_kept']
+        print(f"    Removed {removed} outlier rows "
+              f"({removed / max(stats['rows_read'], 1) * 100:.2f}%)")
+
     def preprocess_data(self):
         """Preprocess and clean data for real-world scenarios"""
         if self.df is None:
@@ -64,13 +134,13 @@ class EVRideDatasetLoader:
             num_cols = self.df.select_dtypes(include=[np.number]).columns
             for col in num_cols:
                 if self.df[col].isnull().any():
-                    self.df[col].fillna(self.df[col].median(), inplace=True)
+                    self.df[col] = self.df[col].fillna(self.df[col].median())
             
             # Fill categorical with mode
             cat_cols = self.df.select_dtypes(include=['object']).columns
             for col in cat_cols:
                 if self.df[col].isnull().any():
-                    self.df[col].fillna(self.df[col].mode()[0], inplace=True)
+                    self.df[col] = self.df[col].fillna(self.df[col].mode()[0])
             
             print("Missing values handled!")
         else:
@@ -80,25 +150,8 @@ class EVRideDatasetLoader:
         print(f"\n Removing outliers and invalid data...")
         initial_rows = len(self.df)
         
-        # Remove invalid distances (realistic range: 0.5 to 200 km)
-        if 'distance_km' in self.df.columns:
-            self.df = self.df[(self.df['distance_km'] >= 0.5) & (self.df['distance_km'] <= 200)]
-        
-        # Remove invalid fares (realistic range: ₹10 to ₹10000)
-        if 'fare_amount_inr' in self.df.columns:
-            self.df = self.df[(self.df['fare_amount_inr'] >= 10) & (self.df['fare_amount_inr'] <= 10000)]
-        
-        # Remove invalid durations (realistic range: 5 to 300 minutes)
-        if 'duration_minutes' in self.df.columns:
-            self.df = self.df[(self.df['duration_minutes'] >= 5) & (self.df['duration_minutes'] <= 300)]
-        
-        # Remove invalid battery health (0-100%)
-        if 'battery_health_percent' in self.df.columns:
-            self.df = self.df[(self.df['battery_health_percent'] >= 50) & (self.df['battery_health_percent'] <= 100)]
-        
-        # Remove invalid ratings (1-5 scale)
-        if 'driver_rating' in self.df.columns:
-            self.df = self.df[(self.df['driver_rating'] >= 1) & (self.df['driver_rating'] <= 5)]
+        # Keep rows inside the realistic ranges (distance, fare, duration, battery, rating)
+        self.df = self.df[valid_rows(self.df)]
         
         removed = initial_rows - len(self.df)
         print(f"    Removed {removed} outlier rows ({removed/initial_rows*100:.2f}%)")
@@ -115,10 +168,7 @@ class EVRideDatasetLoader:
         print(" ENCODING CATEGORICAL FEATURES")
         print("="*70)
         
-        categorical_cols = ['city', 'traffic_level', 'vehicle_type', 
-                           'time_of_day', 'weather_condition', 'user_type']
-        
-        for col in categorical_cols:
+        for col in CATEGORICAL_FEATURES:
             if col in self.df.columns:
                 le = LabelEncoder()
                 self.df[f'{col}_encoded'] = le.fit_transform(self.df[col].astype(str))
@@ -128,7 +178,12 @@ class EVRideDatasetLoader:
         
         # Handle day_of_week if it's text
         if 'day_of_week' in self.df.columns:
-            if self.df['day_of_week'].dtype == 'object':
+            if isinstance(self.df['day_of_week'].dtype, pd.CategoricalDtype):
+                # Chunked loads read it as a category whether the file has names or numbers
+                day = self.df['day_of_week'].astype(str)
+                numeric = pd.to_numeric(day, errors='coerce')
+                self.df['day_of_week'] = numeric if numeric.notna().all() else day
+            if not pd.api.types.is_numeric_dtype(self.df['day_of_week']):
                 day_mapping = {
                     'Monday': 0, 'Tuesday': 1, 'Wednesday': 2, 
                     'Thursday': 3, 'Friday': 4, 'Saturday': 5, 'Sunday': 6,
@@ -139,64 +194,119 @@ class EVRideDatasetLoader:
         
         return self.df
     
-    def get_summary(self):
-        """Get comprehensive dataset summary"""
-        if self.df is None:
+    def cleaning_config(self, chunked=False):
+        """Everything besides the CSV itself that shapes the prepared dataset"""
+        config = {
+            'version': PREPARED_DATASET_VERSION,
+            'loader': 'chunked' if chunked else 'eager',
+            'valid_ranges': VALID_RANGES,
+            'categorical_features': CATEGORICAL_FEATURES
+        }
+        if chunked:
+            config['dtypes'] = RIDE_DTYPES
+        return config
+
+    def load_cached(self, cache, chunked=False):
+        """Cleaned and encoded dataset from cache if this CSV was prepared before, else None"""
+        try:
+            self.prepared_key = cache_key(self.file_path, self.cleaning_config(chunked))
+        except FileNotFoundError:
+            return None
+        hit = cache.get(self.prepared_key)
+        if hit is None:
+            print(f" No cached dataset for {self.file_path} (key {self.prepared_key})")
+            return None
+        self.df, self.label_encoders, meta = hit
+        print(f" Cached dataset {self.prepared_key}: {meta['rows']:,} rows × "
+              f"{len(meta['columns'])} columns, built {meta['built_at']}")
+        return self.df
+
+    def save_cached(self, cache, chunked=False):
+        """Store the cleaned and encoded dataset and its label encoders in cache"""
+        if self.prepared_key is None:
+            self.prepared_key = cache_key(self.file_path, self.cleaning_config(chunked))
+        cache.put(self.prepared_key, self.df, self.label_encoders, {
+            'source': os.path.abspath(self.file_path),
+            'config': self.cleaning_config(chunked)
+        })
+        print(f" Cached prepared dataset: {cache.path(self.prepared_key)}")
+
+    def get_summary(self, chunk_rows=100_000):
+        """Get comprehensive dataset summary
+
+        Every figure comes from one pass over the frame in chunks of
+        chunk_rows (summary_stats.DatasetSummary), or from self.summary when
+        a spilled load already collected it. Quartiles and the median are
+        exact, as df.describe() gives them, up to
+        summary_stats.EXACT_QUANTILE_ROWS rows; past that they come from a
+        KLL sketch and are approximate, within about 1% of rank.
+        """
+        if self.df is not None:
+            self.summary = summarize_frame(self.df, chunk_rows, SUMMARY_CATEGORICALS)
+        if self.summary is None:
             return None
+        summary = self.summary
         
         print("\n" + "="*70)
         print(" DATASET SUMMARY & STATISTICS")
         print("="*70)
-        print(f"Total Records: {len(self.df):,}")
-        print(f"Time Period: {self.df.index[0]} to {self.df.index[-1]}")
+        print(f"Total Records: {summary.rows:,}")
+        print(f"Time Period: {summary.first_index} to {summary.last_index}")
         
         print(f"\n NUMERICAL FEATURES STATISTICS:")
         print("-" * 70)
-        numerical_stats = self.df.describe()
+        numerical_stats = summary.describe()
         print(numerical_stats.to_string())
         
         print(f"\n CATEGORICAL FEATURES DISTRIBUTION:")
         print("-" * 70)
-        cat_cols = ['city', 'vehicle_type', 'time_of_day', 'weather_condition', 'user_type']
-        for col in cat_cols:
-            if col in self.df.columns:
+        for col in SUMMARY_CATEGORICALS:
+            if col in summary.top:
                 print(f"\n🔹 {col.upper()}:")
-                value_counts = self.df[col].value_counts().head(5)
-                for value, count in value_counts.items():
-                    percentage = (count / len(self.df)) * 100
+                for value, count in summary.top[col].most_common(5):
+                    percentage = (count / summary.rows) * 100
                     print(f"   {value}: {count:,} ({percentage:.1f}%)")
         
         print(f"\n FARE ANALYSIS:")
         print("-" * 70)
-        if 'fare_amount_inr' in self.df.columns:
-            print(f"   Average Fare:    ₹{self.df['fare_amount_inr'].mean():.2f}")
-            print(f"   Median Fare:     ₹{self.df['fare_amount_inr'].median():.2f}")
-            print(f"   Min Fare:        ₹{self.df['fare_amount_inr'].min():.2f}")
-            print(f"   Max Fare:        ₹{self.df['fare_amount_inr'].max():.2f}")
-            print(f"   Std Deviation:   ₹{self.df['fare_amount_inr'].std():.2f}")
+        if 'fare_amount_inr' in summary.numeric:
+            fare = summary.numeric['fare_amount_inr']
+            print(f"   Average Fare:    ₹{fare.mean:.2f}")
+            print(f"   Median Fare:     ₹{fare.quantiles([0.5])[0]:.2f}")
+            print(f"   Min Fare:        ₹{fare.min:.2f}")
+            print(f"   Max Fare:        ₹{fare.max:.2f}")
+            print(f"   Std Deviation:   ₹{fare.std:.2f}")
         
         print(f"\n RIDE ANALYSIS:")
         print("-" * 70)
-        if 'distance_km' in self.df.columns:
-            print(f"   Average Distance: {self.df['distance_km'].mean():.2f} km")
-            print(f"   Total Distance:   {self.df['distance_km'].sum():,.2f} km")
-        if 'duration_minutes' in self.df.columns:
-            print(f"   Average Duration: {self.df['duration_minutes'].mean():.2f} mins")
-            print(f"   Total Duration:   {self.df['duration_minutes'].sum():,.0f} mins")
-        
-        return self.df.describe()
+        if 'distance_km' in summary.numeric:
+            distance = summary.numeric['distance_km']
+            print(f"   Average Distance: {distance.mean:.2f} km")
+            print(f"   Total Distance:   {distance.sum:,.2f} km")
+        if 'duration_minutes' in summary.numeric:
+            duration = summary.numeric['duration_minutes']
+            print(f"   Average Duration: {duration.mean:.2f} mins")
+            print(f"   Total Duration:   {duration.sum:,.0f} mins")
+        
+        return numerical_stats
+
+
+# Forest shape used unless tune() picked another (see fare_tuning.SEARCH_SPACE)
+DEFAULT_FOREST_PARAMS = {
+    'n_estimators': 200,        # More trees for better accuracy
+    'max_depth': 20,            # Prevent overfitting
+    'min_samples_leaf': 2,      # Require 2 samples in leaf
+    'max_features': 'sqrt',     # Use sqrt of features
+}
 
 
 class EnhancedFarePredictor:
     """Production-ready Random Forest model for fare prediction"""
     
-    def _init_(self):
+    def __init__(self, params=None):
         self.model = RandomForestRegressor(
-            n_estimators=200,        # More trees for better accuracy
-            max_depth=20,            # Prevent overfitting
+            **dict(DEFAULT_FOREST_PARAMS, **(params or {})),
             min_samples_split=5,     # Require 5 samples to split
-            min_samples_leaf=2,      # Require 2 samples in leaf
-            max_features='sqrt',     # Use sqrt of features
             random_state=42,
             n_jobs=-1,               # Use all CPU cores
             verbose=0
@@ -244,7 +354,7 @@ class EnhancedFarePredictor:
         
         # Ensure all columns are numeric
         for col in X.columns:
-            if X[col].dtype == 'object':
+            if not pd.api.types.is_numeric_dtype(X[col]):
                 X[col] = pd.to_numeric(X[col], errors='coerce')
         
         # Handle any remaining NaN
@@ -283,7 +393,7 @@ class EnhancedFarePredictor:
         X_test_scaled = self.scaler.transform(X_test)
         
         # Train model
-        print(f" Training Random Forest (200 trees)...")
+        print(f" Training Random Forest ({self.model.n_estimators} trees)...")
         print(f"   This may take 30-60 seconds...")
         self.model.fit(X_train_scaled, y_train)
         self.is_fitted = True
@@ -348,6 +458,46 @@ class EnhancedFarePredictor:
         
         return True
     
+    def tune(self, df, budget_s=300, n_candidates=27, workers=None, test_size=0.2, mae_slack=0.02):
+        """Search forest size, depth, leaf size and max_features; adopt the chosen config
+
+        Searches on the same training split train() uses, holding 20% of it
+        out for validation, so the test set stays unseen. Candidates are
+        scored on validation MAE and on single-row and batch latency of the
+        flattened forest the API serves (fare_tuning.tune). The chosen config
+        is the fastest one on the Pareto front within mae_slack of its best
+        MAE. Returns the tuning result; save it with save_tuning().
+        """
+        print("\n" + "="*70)
+        print(f" TUNING FOREST HYPERPARAMETERS (budget {budget_s:.0f}s)")
+        print("="*70)
+        X, y = self.prepare_features(df)
+        if X is None:
+            return None
+        X_train, _, y_train, _ = train_test_split(
+            X, y, test_size=test_size, random_state=42, shuffle=True
+        )
+        X_fit, X_val, y_fit, y_val = train_test_split(
+            X_train, y_train, test_size=0.2, random_state=42, shuffle=True
+        )
+        baseline = {name: self.model.get_params()[name] for name in DEFAULT_FOREST_PARAMS}
+        result = tune_forest(X_fit.to_numpy(np.float64), y_fit.to_numpy(np.float64),
+                      X_val.to_numpy(np.float64), y_val.to_numpy(np.float64),
+                      budget_s=budget_s, n_candidates=n_candidates, workers=workers,
+                      baseline=baseline, fixed={'min_samples_split': 5}, mae_slack=mae_slack)
+        
+        print(f"\n PARETO FRONT (validation MAE vs serving latency):")
+        print("-" * 70)
+        for r in result['front']:
+            marker = '*' if r['config'] == result['chosen'] else ' '
+            print(f" {marker} MAE ₹{r['mae']:8.2f}  1 row {r['single_ms']:6.2f} ms  "
+                  f"256 rows {r['batch_ms']:7.2f} ms  {r['config']}")
+        if not result['complete']:
+            print("   Budget ran out before the last rung; front is from partial data")
+        self.model.set_params(**result['chosen'])
+        print(f" Chosen config: {result['chosen']}")
+        return result
+    
     def predict(self, features_dict):
         """Predict fare for new ride"""
         if not self.is_fitted:
@@ -359,9 +509,14 @@ class EnhancedFarePredictor:
         
         return self.model.predict(features_scaled)[0]
     
+    def export_flat_forest(self):
+        """Flatten the fitted forest for serving, with the scaler folded in"""
+        return FlatForest.from_sklearn(self.model, self.scaler)
+    
     def save_model(self, filename='models/fare_model_enhanced.pkl'):
-        """Save trained model to disk"""
+        """Save trained model to disk; returns the exported serving forest"""
         os.makedirs(os.path.dirname(filename), exist_ok=True)
+        forest = self.export_flat_forest()
         model_data = {
             'model': self.model,
             'scaler': self.scaler,
@@ -372,6 +527,19 @@ class EnhancedFarePredictor:
         joblib.dump(model_data, filename)
         file_size = os.path.getsize(filename) / 1024  # KB
         print(f" Model saved: {filename} ({file_size:.2f} KB)")
+        
+        # Compact, memory-mappable serving bundle next to the pickle; the
+        # flattened arrays live only here, not in the pickle as well
+        bundle_dir = os.path.splitext(filename)[0] + '.flat'
+        forest.save(bundle_dir, metadata={
+            'feature_columns': self.feature_columns,
+            'training_date': model_data['training_date']
+        })
+        bundle_size = sum(
+            os.path.getsize(os.path.join(bundle_dir, f)) for f in os.listdir(bundle_dir)
+        ) / 1024
+        print(f" Serving bundle saved: {bundle_dir} ({bundle_size:.2f} KB)")
+        return forest
     
     def load_model(self, filename='models/fare_model_enhanced.pkl'):
         """Load trained model from disk"""
@@ -387,8 +555,20 @@ class EnhancedFarePredictor:
 
 # MAIN TRAINING PIPELINE
 
-def train_models_from_dataset(dataset_path='your_ride_data.csv'):
-    """Complete end-to-end training pipeline"""
+def train_models_from_dataset(dataset_path='your_ride_data.csv', chunksize=None,
+                              cache_dir='cache/dataset', rebuild_cache=False, tune_budget_s=None):
+    """Complete end-to-end training pipeline
+
+    With chunksize the CSV is streamed and cleaned in chunks of that many
+    rows (load_data_chunked) instead of read whole. The cleaned, encoded
+    dataset is cached in cache_dir under a hash of the CSV and the cleaning
+    config, so re-runs on an unchanged CSV skip steps 1-3; rebuild_cache
+    forces them, and cache_dir=None turns the cache off.
+
+    With tune_budget_s the forest config is tuned first and the result saved
+    to models/fare_model_enhanced.tuning.json; without it a config tuned
+    earlier is reused from that file.
+    """
     
     print("\n" + "="*70)
     print(" EV RIDE BOOKING - MACHINE LEARNING MODEL TRAINING")
@@ -397,26 +577,38 @@ def train_models_from_dataset(dataset_path='your_ride_data.csv'):
     print(f" Dataset: {dataset_path}")
     print("="*70)
     
-    # Step 1: Load Dataset
-    print("\n[STEP 1/5]  LOADING DATASET...")
     loader = EVRideDatasetLoader(dataset_path)
-    df = loader.load_data()
+    cache = DatasetCache(cache_dir) if cache_dir else None
+    df = None
+    if cache is not None and not rebuild_cache:
+        print("\n[STEPS 1-3/5]  LOOKING UP PREPARED DATASET...")
+        df = loader.load_cached(cache, chunked=bool(chunksize))
     
     if df is None:
-        print("\n TRAINING FAILED: Could not load dataset!")
-        return None
-    
-    # Step 2: Preprocess
-    print("\n[STEP 2/5] 🧹 PREPROCESSING DATA...")
-    df = loader.preprocess_data()
-    
-    if df is None or len(df) == 0:
-        print("\n TRAINING FAILED: No data after preprocessing!")
-        return None
-    
-    # Step 3: Encode Categorical
-    print("\n[STEP 3/5]  ENCODING CATEGORICAL FEATURES...")
-    df = loader.encode_categorical()
+        # Step 1: Load Dataset
+        print("\n[STEP 1/5]  LOADING DATASET...")
+        df = loader.load_data_chunked(chunksize) if chunksize else loader.load_data()
+        
+        if df is None:
+            print("\n TRAINING FAILED: Could not load dataset!")
+            return None
+        
+        # Step 2: Preprocess
+        print("\n[STEP 2/5] 🧹 PREPROCESSING DATA...")
+        if chunksize:
+            print(" Already cleaned while streaming")
+        else:
+            df = loader.preprocess_data()
+        
+        if df is None or len(df) == 0:
+            print("\n TRAINING FAILED: No data after preprocessing!")
+            return None
+        
+        # Step 3: Encode Categorical
+        print("\n[STEP 3/5]  ENCODING CATEGORICAL FEATURES...")
+        df = loader.encode_categorical()
+        if cache is not None:
+            loader.save_cached(cache, chunked=bool(chunksize))
     
     # Step 4: Analyze Dataset
     print("\n[STEP 4/5]  ANALYZING DATASET...")
@@ -424,23 +616,44 @@ def train_models_from_dataset(dataset_path='your_ride_data.csv'):
     
     # Step 5: Train Model
     print("\n[STEP 5/5]  TRAINING ML MODEL...")
-    fare_predictor = EnhancedFarePredictor()
+    model_path = 'models/fare_model_enhanced.pkl'
+    if tune_budget_s:
+        fare_predictor = EnhancedFarePredictor()
+        tuning = fare_predictor.tune(df, budget_s=tune_budget_s)
+        if tuning is not None:
+            save_tuning(tuning, tuning_path(model_path))
+            print(f" Tuning result saved: {tuning_path(model_path)}")
+    else:
+        tuned = load_tuned_params(tuning_path(model_path))
+        if tuned is not None:
+            print(f" Using tuned forest config from {tuning_path(model_path)}: {tuned}")
+        fare_predictor = EnhancedFarePredictor(tuned)
     success = fare_predictor.train(df, test_size=0.2)
     
     if success:
         # Save model
-        fare_predictor.save_model('models/fare_model_enhanced.pkl')
+        forest = fare_predictor.save_model(model_path)
+        
+        # Check the flattened serving forest against sklearn on the full dataset
+        X, _ = fare_predictor.prepare_features(df)
+        max_diff = verify_against_sklearn(
+            forest, fare_predictor.model, fare_predictor.scaler, X
+        )
+        print(f" Flattened forest matches sklearn on {len(X):,} rows (max diff {max_diff:.2e})")
         
         # Save label encoders
         joblib.dump(loader.label_encoders, 'models/label_encoders.pkl')
-        print(" Label encoders saved: models/label_encoders.pkl")
+        # JSON copy lets the API load encoders without importing sklearn
+        with open('models/label_encoders.json', 'w') as f:
+            json.dump(label_classes(loader.label_encoders), f, indent=2)
+        print(" Label encoders saved: models/label_encoders.pkl, models/label_encoders.json")
         
         print("\n" + "="*70)
         print(" MODEL TRAINING COMPLETED SUCCESSFULLY!")
         print("="*70)
         print(" Trained Files:")
         print("   1. models/fare_model_enhanced.pkl")
-        print("   2. models/label_encoders.pkl")
+        print("   2. models/label_encoders.pkl (+ .json)")
         print("\n Next Steps:")
         print("   - Use this model in your FastAPI application")
         print("   - Run: uvicorn main_enhanced:app --reload")
@@ -466,7 +679,14 @@ if __name__ == "__main__":
     print("STARTING EV RIDE ML TRAINING PIPELINE")
     print(" "*35)
     
-    result = train_models_from_dataset('your_ride_data.csv')
+    chunksize = int(os.getenv("EVRIDE_TRAIN_CHUNKSIZE", "0")) or None
+    result = train_models_from_dataset(
+        'your_ride_data.csv',
+        chunksize=chunksize,
+        cache_dir=os.getenv("EVRIDE_DATASET_CACHE", "cache/dataset") or None,
+        rebuild_cache=os.getenv("EVRIDE_REBUILD_DATASET_CACHE", "0") == "1",
+        tune_budget_s=float(os.getenv("EVRIDE_TUNE_BUDGET_S", "0")) or None
+    )
     
     if result is None:
         print("\n TRAINING FAILED!")
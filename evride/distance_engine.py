@@ -0,0 +1,64 @@
+"""Vectorized distance calculations for driver matching and trip estimates
+
+Two accuracy tiers:
+
+- Fast tier (haversine_km / equirectangular_km): one NumPy pass over arrays
+  of coordinates on a sphere of mean Earth radius. Relative error against the
+  WGS84 geodesic is at most ~0.56% anywhere on Earth (measured <= 0.55% for
+  trips under 50 km across India). Equirectangular agrees with haversine to
+  better than 0.01% below 100 km away from the poles.
+- Exact tier (geodesic_km): geopy's ellipsoidal solve, used only for the
+  matched driver and the trip distance.
+
+Ranking candidates with the fast tier can only swap two drivers whose scores
+are within that error band of each other.
+"""
+import math
+
+import numpy as np
+from geopy.distance import geodesic
+
+
+EARTH_RADIUS_KM = 6371.0088
+MAX_RELATIVE_ERROR = 0.0056  # Fast tier vs geodesic
+
+
+def haversine_km(lat, lon, lats, lons):
+    """Great-circle distance from one point to arrays of points"""
+    lat1 = np.radians(lat)
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    dlat = lat2 - lat1
+    dlon = np.radians(np.asarray(lons, dtype=np.float64) - lon)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def equirectangular_km(lat, lon, lats, lons):
+    """Flat-earth approximation, cheapest option for short city distances"""
+    lat1 = np.radians(lat)
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    dlon = np.radians(np.asarray(lons, dtype=np.float64) - lon)
+    x = dlon * np.cos((lat1 + lat2) / 2)
+    y = lat2 - lat1
+    return EARTH_RADIUS_KM * np.hypot(x, y)
+
+
+def equirectangular_pair_km(lat1, lon1, lat2, lon2):
+    """equirectangular_km for one pair of points, in plain floats
+
+    An order of magnitude cheaper per call than the NumPy version, for hot
+    scalar paths such as movement thresholds.
+    """
+    lat1, lat2 = math.radians(lat1), math.radians(lat2)
+    x = math.radians(lon2 - lon1) * math.cos((lat1 + lat2) / 2)
+    return EARTH_RADIUS_KM * math.hypot(x, lat2 - lat1)
+
+
+def geodesic_km(lat1, lon1, lat2, lon2):
+    """Exact WGS84 distance for a single pair"""
+    return geodesic((lat1, lon1), (lat2, lon2)).km
+
+
+def within_radius(lat, lon, lats, lons, radius_km):
+    """Boolean mask of points within radius_km (fast tier)"""
+    return haversine_km(lat, lon, lats, lons) <= radius_km
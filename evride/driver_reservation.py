@@ -0,0 +1,78 @@
+import threading
+
+
+class DriverReservations:
+    """Atomic compare-and-set claims on driver availability, locked by spatial cell
+
+    Matching runs on executor threads, so two requests can pick the same
+    driver. claim() flips a free driver to taken under the lock of the
+    stripe its grid cell hashes to: claims in different cells proceed in
+    parallel, two claims on one driver serialize and exactly one wins.
+
+    The cell a driver locks on is tracked here and only changes while its
+    old stripe is held, so every claim or release on a driver takes the
+    same lock even as the driver moves.
+    """
+
+    def __init__(self, fleet, stripes=64):
+        self.fleet = fleet
+        self.locks = [threading.Lock() for _ in range(stripes)]
+        self.cells = {}  # driver_id -> grid cell its claims lock on
+        # Per-stripe counters, only written under that stripe's lock
+        self.claimed = [0] * stripes
+        self.conflicts = [0] * stripes
+
+    def _stripe(self, cell):
+        return hash(cell) % len(self.locks)
+
+    def _locked(self, driver_id):
+        """Acquire the driver's stripe and return its index; caller releases"""
+        while True:
+            cell = self.cells[driver_id]
+            stripe = self._stripe(cell)
+            self.locks[stripe].acquire()
+            if self.cells[driver_id] == cell:
+                return stripe
+            self.locks[stripe].release()  # Moved to another cell meanwhile
+
+    def place(self, driver_id, cell):
+        """Record the grid cell a driver is in, moving it to that cell's stripe"""
+        if driver_id not in self.cells:
+            self.cells[driver_id] = cell
+            return
+        if self.cells[driver_id] == cell:
+            return
+        stripe = self._locked(driver_id)
+        try:
+            self.cells[driver_id] = cell
+        finally:
+            self.locks[stripe].release()
+
+    def claim(self, driver_id):
+        """Take a free driver; False if it is already taken"""
+        stripe = self._locked(driver_id)
+        try:
+            row = self.fleet.rows[driver_id]
+            if not self.fleet.available[row]:
+                self.conflicts[stripe] += 1
+                return False
+            self.fleet.available[row] = False
+            self.claimed[stripe] += 1
+            return True
+        finally:
+            self.locks[stripe].release()
+
+    def release(self, driver_id):
+        """Make a claimed driver free again"""
+        stripe = self._locked(driver_id)
+        try:
+            self.fleet.set_available(driver_id, True)
+        finally:
+            self.locks[stripe].release()
+
+    def stats(self):
+        return {
+            "stripes": len(self.locks),
+            "claimed": sum(self.claimed),
+            "conflicts": sum(self.conflicts)
+        }
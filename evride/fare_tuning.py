@@ -0,0 +1,216 @@
+import json
+import math
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+import numpy as np
+
+from forest_evaluator import FlatForest
+
+
+# Forest hyperparameters tune() samples from
+SEARCH_SPACE = {
+    'n_estimators': [25, 50, 100, 200, 400],
+    'max_depth': [8, 12, 16, 20, None],
+    'min_samples_leaf': [1, 2, 4, 8],
+    'max_features': ['sqrt', 0.5, 1.0],
+}
+
+# Training data for the worker processes, set once per process by _init_worker
+_data = None
+
+
+def sample_configs(n, rng, include=None):
+    """Up to n distinct random configs from SEARCH_SPACE, starting with `include` if given"""
+    configs = [dict(include)] if include else []
+    seen = {json.dumps(c, sort_keys=True) for c in configs}
+    space = math.prod(len(values) for values in SEARCH_SPACE.values())
+    while len(configs) < min(n, space):
+        config = {name: values[rng.integers(len(values))] for name, values in SEARCH_SPACE.items()}
+        key = json.dumps(config, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            configs.append(config)
+    return configs
+
+
+def measure_latency(forest, X, single_reps=200, batch_size=256, batch_reps=20):
+    """Median FlatForest predict latency: (ms for one row, ms for a batch_size-row batch)"""
+    X = np.asarray(X, dtype=np.float64)
+    single = []
+    for i in range(single_reps):
+        row = X[i % len(X)][None, :]
+        started = time.perf_counter()
+        forest.predict(row)
+        single.append(time.perf_counter() - started)
+    batch = np.resize(X, (batch_size, X.shape[1]))
+    batched = []
+    for _ in range(batch_reps):
+        started = time.perf_counter()
+        forest.predict(batch)
+        batched.append(time.perf_counter() - started)
+    return float(np.median(single)) * 1000, float(np.median(batched)) * 1000
+
+
+def _init_worker(X_train, y_train, X_val, y_val):
+    global _data
+    _data = (X_train, y_train, X_val, y_val)
+
+
+def _evaluate(config, n_rows, fixed, keep_forest=False):
+    """Train one config on the first n_rows training rows; score MAE and serving latency"""
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.metrics import mean_absolute_error
+    from sklearn.preprocessing import StandardScaler
+
+    X_train, y_train, X_val, y_val = _data
+    started = time.perf_counter()
+    scaler = StandardScaler().fit(X_train[:n_rows])
+    model = RandomForestRegressor(**config, **fixed, n_jobs=1)
+    model.fit(scaler.transform(X_train[:n_rows]), y_train[:n_rows])
+    fit_s = time.perf_counter() - started
+
+    forest = FlatForest.from_sklearn(model, scaler)
+    single_ms, batch_ms = measure_latency(forest, X_val)
+    return {
+        'config': config,
+        'rows': n_rows,
+        'mae': float(mean_absolute_error(y_val, forest.predict(X_val))),
+        'single_ms': single_ms,
+        'batch_ms': batch_ms,
+        'fit_s': fit_s,
+        'nodes': forest.n_nodes,
+        'forest': forest.to_dict() if keep_forest else None,
+    }
+
+
+def pareto_front(results, objectives=('mae', 'single_ms')):
+    """Results no other result beats on every objective, best MAE first"""
+    front = []
+    for r in results:
+        dominated = any(
+            all(o[k] <= r[k] for k in objectives) and any(o[k] < r[k] for k in objectives)
+            for o in results
+        )
+        if not dominated:
+            front.append(r)
+    return sorted(front, key=lambda r: r['mae'])
+
+
+def _promote(results, keep):
+    """Best `keep` results by successive Pareto fronts on MAE and latency, MAE breaking ties"""
+    chosen, rest = [], list(results)
+    while rest and len(chosen) < keep:
+        front = pareto_front(rest)
+        chosen.extend(front[:keep - len(chosen)])
+        rest = [r for r in rest if all(r is not f for f in front)]
+    return chosen
+
+
+def choose(front, mae_slack=0.02):
+    """Fastest single-row config whose MAE is within mae_slack of the front's best"""
+    best = min(r['mae'] for r in front)
+    eligible = [r for r in front if r['mae'] <= best * (1 + mae_slack)]
+    return min(eligible, key=lambda r: (r['single_ms'], r['mae']))
+
+
+def tune(X_train, y_train, X_val, y_val, budget_s=300, n_candidates=27, eta=3,
+         workers=None, seed=42, baseline=None, fixed=None, mae_slack=0.02):
+    """Successive halving over forest configs in a process pool, within budget_s seconds
+
+    Every candidate first trains on 1/eta**(rungs-1) of the rows; each rung
+    keeps the best 1/eta by Pareto rank on validation MAE and single-row
+    latency and retrains them on eta times more rows, up to all of them.
+    Results are collected until the deadline; whatever is still training
+    then is abandoned (a worker already fitting finishes in the background)
+    and the search reports on the highest rung reached.
+    Final-rung forests are shipped back and their latency re-measured here
+    one at a time, so pool contention does not skew the front.
+    """
+    started = time.perf_counter()
+    deadline = started + budget_s
+    rng = np.random.default_rng(seed)
+    fixed = dict(fixed or {}, random_state=seed)
+    configs = sample_configs(n_candidates, rng, include=baseline)
+    n_rungs = 1
+    while eta ** n_rungs < len(configs):
+        n_rungs += 1
+    order = rng.permutation(len(X_train))
+    X_train, y_train = np.asarray(X_train)[order], np.asarray(y_train)[order]
+    X_val, y_val = np.asarray(X_val), np.asarray(y_val)
+
+    rungs = []
+    timed_out = False
+    pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                               initializer=_init_worker,
+                               initargs=(X_train, y_train, X_val, y_val))
+    try:
+        for rung in range(n_rungs):
+            final = rung == n_rungs - 1
+            n_rows = len(X_train) if final else max(
+                1, len(X_train) // eta ** (n_rungs - 1 - rung))
+            pending = {pool.submit(_evaluate, config, n_rows, fixed, final) for config in configs}
+            results = []
+            while pending:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    timed_out = True
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                results.extend(f.result() for f in done)
+            print(f"   rung {rung + 1}/{n_rungs}: {len(results)}/{len(configs)} configs "
+                  f"on {n_rows:,} rows ({time.perf_counter() - started:.0f}s)")
+            if results:
+                rungs.append(results)
+            if timed_out:
+                for future in pending:
+                    future.cancel()
+                break
+            configs = [r['config'] for r in _promote(results, math.ceil(len(results) / eta))]
+    finally:
+        pool.shutdown(wait=not timed_out, cancel_futures=True)
+
+    if not rungs:
+        raise RuntimeError(f"No config finished within the {budget_s}s tuning budget")
+    results = rungs[-1]
+    for r in results:
+        forest = r.pop('forest')
+        if forest is not None:
+            r['single_ms'], r['batch_ms'] = measure_latency(FlatForest.from_dict(forest), X_val)
+    front = pareto_front(results)
+    return {
+        'chosen': choose(front, mae_slack)['config'],
+        'front': front,
+        'results': results,
+        'rungs': [[{k: v for k, v in r.items() if k != 'forest'} for r in rung] for rung in rungs],
+        'complete': len(rungs) == n_rungs and not timed_out,
+        'budget_s': budget_s,
+        'elapsed_s': time.perf_counter() - started,
+        'mae_slack': mae_slack,
+        'fixed': fixed,
+        'tuned_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+def tuning_path(model_path):
+    """Tuning result written next to the model pickle"""
+    return os.path.splitext(model_path)[0] + '.tuning.json'
+
+
+def save_tuning(result, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(result, f, indent=2)
+    os.replace(tmp, path)
+
+
+def load_tuned_params(path):
+    """The chosen config from a saved tuning result, or None if there is none"""
+    try:
+        with open(path) as f:
+            return json.load(f)['chosen']
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,195 @@
+import numpy as np
+
+
+# Features the API produces for the fare model, in training order
+RIDE_FEATURES = [
+    'distance_km', 'duration_minutes', 'demand_factor', 'battery_health_percent',
+    'energy_consumption_kwh', 'route_difficulty', 'day_of_week', 'temperature_celsius',
+    'humidity_percent', 'driver_rating', 'surge_multiplier', 'historical_pricing_factor',
+    'is_holiday', 'charging_stations_nearby', 'city_encoded', 'traffic_level_encoded',
+    'vehicle_type_encoded', 'time_of_day_encoded', 'weather_condition_encoded',
+    'user_type_encoded',
+]
+
+# Model inputs the API does not observe yet
+CONSTANT_FEATURES = {
+    'route_difficulty': 3,  # Medium difficulty (1-5 scale)
+    'temperature_celsius': 28,  # Default, integrate weather API
+    'humidity_percent': 65,
+    'historical_pricing_factor': 1.0,
+    'charging_stations_nearby': 3,  # Default
+}
+
+ENERGY_KWH_PER_KM = 0.25  # Approx 0.25 kWh/km
+
+# Request attributes encoded per ride, each with its LabelEncoder category
+REQUEST_CATEGORIES = ('city', 'vehicle_type', 'time_of_day', 'user_type')
+
+# Per-ride values written by single(), in argument order
+SINGLE_ROW_FEATURES = (
+    'distance_km', 'duration_minutes', 'energy_consumption_kwh',
+    'battery_health_percent', 'driver_rating', 'demand_factor', 'day_of_week',
+    'surge_multiplier', 'is_holiday', 'traffic_level_encoded', 'city_encoded',
+    'vehicle_type_encoded', 'time_of_day_encoded', 'user_type_encoded',
+)
+
+# Quote cache rounding in decimal places; None leaves the feature out of the key
+CACHE_KEY_DECIMALS = {
+    'distance_km': 1,  # 100 m
+    'duration_minutes': 0,
+    'energy_consumption_kwh': None,  # Derived from distance
+}
+DEFAULT_CACHE_KEY_DECIMALS = 2
+
+
+class FeatureAssembler:
+    """Fare-model rows written straight into preallocated arrays by column index
+
+    Compiled once per model from its feature_columns. Constants and the
+    'clear' weather code live in a template row. batch() copies it, writes
+    the shared pricing context once and fills per-ride columns in place;
+    single() does the same for one ride on a plain list, where element
+    stores are cheaper than on an ndarray. No per-request feature dict is
+    built either way.
+    Features the model does not use are skipped. distance_km and
+    surge_multiplier are appended after the model's columns when the model
+    lacks them, since the fallback fare needs both; model_input() drops them.
+    """
+
+    def __init__(self, fare_features=None, encoders=None):
+        self.model_columns = list(fare_features or RIDE_FEATURES)
+        self.columns = self.model_columns + [
+            name for name in ('distance_km', 'surge_multiplier') if name not in self.model_columns
+        ]
+        self.n_model = len(self.model_columns)
+        self.index = {name: i for i, name in enumerate(self.columns)}
+        self.encoders = encoders
+
+        self.template = np.zeros((1, len(self.columns)), dtype=np.float64)
+        for name, value in CONSTANT_FEATURES.items():
+            self._set(self.template, name, value)
+        if encoders is not None:
+            self._set(self.template, 'weather_condition_encoded',
+                      encoders.encode('clear', 'weather_condition'))
+
+        key_columns, key_scale = [], []
+        for i, name in enumerate(self.model_columns):
+            decimals = CACHE_KEY_DECIMALS.get(name, DEFAULT_CACHE_KEY_DECIMALS)
+            if decimals is not None:
+                key_columns.append(i)
+                key_scale.append(10.0 ** decimals)
+        self.key_pairs = list(zip(key_columns, key_scale))
+
+        # Features the model lacks go to a scratch slot past the last column
+        scratch = len(self.columns)
+        self.template_list = self.template[0].tolist() + [0.0]
+        self.single_index = [self.index.get(name, scratch) for name in SINGLE_ROW_FEATURES]
+        self.key_columns = np.asarray(key_columns, dtype=np.intp)
+        self.key_scale = np.asarray(key_scale, dtype=np.float64)
+
+    def _set(self, X, name, value):
+        i = self.index.get(name)
+        if i is None:
+            return
+        if len(X) == 1 and np.isscalar(value):
+            X[0, i] = value  # Element store, much cheaper than a column slice
+        else:
+            X[:, i] = value
+
+    def column(self, X, name):
+        return X[:, self.index[name]]
+
+    def batch(self, requests, context, distances, durations, battery, driver_rating,
+              default_time_of_day):
+        """Rows for many rides; per-ride arguments may be scalars or sequences"""
+        X = self.allocate(len(requests), context)
+        self.set_trips(X, distances, durations)
+        self.set_driver(X, battery, driver_rating)
+        self.set_request_codes(X, requests, default_time_of_day)
+        return X
+
+    def single(self, request, context, distance_km, duration_minutes, battery, driver_rating,
+               default_time_of_day):
+        """A 1 x n matrix for one ride, same values as batch() with one request"""
+        if self.encoders is not None:
+            encode = self.encoders.encode
+            codes = (
+                encode(context["traffic_level"], 'traffic_level'),
+                encode(request.city, 'city'),
+                encode(request.vehicle_type, 'vehicle_type'),
+                encode(request.time_of_day or default_time_of_day, 'time_of_day'),
+                encode(request.user_type, 'user_type'),
+            )
+        else:
+            codes = (0, 0, 0, 0, 0)
+        values = (
+            distance_km, duration_minutes, distance_km * ENERGY_KWH_PER_KM,
+            battery, driver_rating, context["demand_factor"], context["day_of_week"],
+            context["surge_multiplier"], int(context["is_holiday"])
+        ) + codes
+        row = self.template_list.copy()
+        for i, value in zip(self.single_index, values):
+            row[i] = value
+        return np.array([row[:-1]], dtype=np.float64)
+
+    def allocate(self, n, context):
+        """n rows holding the constants and the pricing context shared by a batch"""
+        X = np.empty((n, len(self.columns)), dtype=np.float64)
+        X[:] = self.template
+        self._set(X, 'demand_factor', context["demand_factor"])
+        self._set(X, 'day_of_week', context["day_of_week"])
+        self._set(X, 'surge_multiplier', context["surge_multiplier"])
+        self._set(X, 'is_holiday', int(context["is_holiday"]))
+        if self.encoders is not None:
+            self._set(X, 'traffic_level_encoded',
+                      self.encoders.encode(context["traffic_level"], 'traffic_level'))
+        return X
+
+    def set_trips(self, X, distance_km, duration_minutes):
+        self._set(X, 'distance_km', distance_km)
+        self._set(X, 'duration_minutes', duration_minutes)
+        if np.isscalar(distance_km):
+            self._set(X, 'energy_consumption_kwh', distance_km * ENERGY_KWH_PER_KM)
+        else:
+            self._set(X, 'energy_consumption_kwh',
+                      np.asarray(distance_km, dtype=np.float64) * ENERGY_KWH_PER_KM)
+
+    def set_driver(self, X, battery, driver_rating):
+        self._set(X, 'battery_health_percent', battery)
+        self._set(X, 'driver_rating', driver_rating)
+
+    def set_request_codes(self, X, requests, default_time_of_day):
+        """Encode each request's categoricals, one lookup per column for batches"""
+        if self.encoders is None:
+            return
+        for category in REQUEST_CATEGORIES:
+            values = [getattr(r, category) for r in requests]
+            if category == 'time_of_day':
+                values = [v or default_time_of_day for v in values]
+            if len(values) == 1:
+                codes = self.encoders.encode(values[0], category)
+            else:
+                codes = self.encoders.encode_many(values, category)
+            self._set(X, f'{category}_encoded', codes)
+
+    def model_input(self, X):
+        """The columns the fare model was trained on"""
+        return X if self.n_model == X.shape[-1] else X[..., :self.n_model]
+
+    def from_dicts(self, rows):
+        """Matrix from feature dicts; missing features default to 0"""
+        return np.array([[row.get(col, 0) for col in self.columns] for row in rows],
+                        dtype=np.float64)
+
+    def row_keys(self, X):
+        """Quantized, hashable quote cache keys, one per row
+
+        Both branches round half to even, so a ride and a batch quote for
+        the same trip share a key.
+        """
+        X = np.atleast_2d(X)
+        if len(X) == 1:
+            row = X[0].tolist()
+            return [tuple(round(row[i] * scale) for i, scale in self.key_pairs)]
+        quantized = np.rint(X[:, self.key_columns] * self.key_scale).astype(np.int64)
+        return [tuple(row) for row in quantized.tolist()]
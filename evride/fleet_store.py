@@ -0,0 +1,205 @@
+from typing import NamedTuple
+
+import numpy as np
+
+
+class TelemetryApplied(NamedTuple):
+    """Outcome of FleetStore.apply_telemetry"""
+    rows: np.ndarray      # Rows that took a new position, one per driver
+    old_lat: np.ndarray   # Their positions before the update
+    old_lon: np.ndarray
+    stale: int            # Records older than the driver's last report or superseded in the batch
+    unknown: int          # Records for drivers not in the fleet
+    invalid: int          # Records with a non-finite or out-of-range position or timestamp
+
+
+class FleetStore:
+    """Struct-of-arrays driver state with a driver_id -> row index
+
+    Numeric fields live in contiguous NumPy arrays so availability, battery
+    and vehicle-type filters are single boolean-mask operations. Rows freed
+    by remove() are reused before the arrays grow, and pydantic models are
+    only built from record() at the response boundary. ts holds the
+    timestamp of each driver's last applied telemetry report.
+    """
+
+    def __init__(self, capacity=1024):
+        self.capacity = 0
+        self.size = 0           # High-water mark of used rows
+        self.rows = {}          # driver_id -> row
+        self.free_rows = []
+        self.vehicle_types = []  # code -> vehicle type
+        self.vehicle_codes = {}  # vehicle type -> code
+
+        self.lat = np.zeros(0, dtype=np.float64)
+        self.lon = np.zeros(0, dtype=np.float64)
+        self.battery = np.zeros(0, dtype=np.float64)
+        self.rating = np.zeros(0, dtype=np.float64)
+        self.vehicle_code = np.zeros(0, dtype=np.int16)
+        self.available = np.zeros(0, dtype=bool)
+        self.active = np.zeros(0, dtype=bool)
+        self.ts = np.zeros(0, dtype=np.float64)
+        self.driver_ids = []
+        self.names = []
+        self._grow(capacity)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, driver_id):
+        return driver_id in self.rows
+
+    def _grow(self, capacity):
+        """Resize every column to the new capacity"""
+        for field in ('lat', 'lon', 'battery', 'rating', 'vehicle_code', 'available', 'active',
+                      'ts'):
+            old = getattr(self, field)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, field, new)
+        self.driver_ids.extend([None] * (capacity - self.capacity))
+        self.names.extend([None] * (capacity - self.capacity))
+        self.capacity = capacity
+
+    def vehicle_code_of(self, vehicle_type):
+        """Integer code for a vehicle type, registering new types"""
+        code = self.vehicle_codes.get(vehicle_type)
+        if code is None:
+            code = len(self.vehicle_types)
+            self.vehicle_types.append(vehicle_type)
+            self.vehicle_codes[vehicle_type] = code
+        return code
+
+    def upsert(self, driver_id, name, lat, lon, battery, vehicle_type, rating, available=True):
+        """Insert or overwrite a driver and return its row"""
+        row = self.rows.get(driver_id)
+        if row is None:
+            if self.free_rows:
+                row = self.free_rows.pop()
+            else:
+                if self.size == self.capacity:
+                    self._grow(max(1, self.capacity * 2))
+                row = self.size
+                self.size += 1
+            self.rows[driver_id] = row
+            self.ts[row] = 0.0
+
+        self.driver_ids[row] = driver_id
+        self.names[row] = name
+        self.lat[row] = lat
+        self.lon[row] = lon
+        self.battery[row] = battery
+        self.rating[row] = rating
+        self.vehicle_code[row] = self.vehicle_code_of(vehicle_type)
+        self.available[row] = available
+        self.active[row] = True
+        return row
+
+    def remove(self, driver_id):
+        """Drop a driver and release its row for reuse"""
+        row = self.rows.pop(driver_id, None)
+        if row is None:
+            return
+        self.active[row] = False
+        self.available[row] = False
+        self.driver_ids[row] = None
+        self.names[row] = None
+        self.free_rows.append(row)
+
+    def row_of(self, driver_id):
+        """Row for a driver, or None if unknown"""
+        return self.rows.get(driver_id)
+
+    def rows_of(self, driver_ids):
+        """Row array for a batch of known driver ids"""
+        rows = self.rows
+        return np.fromiter((rows[driver_id] for driver_id in driver_ids),
+                           dtype=np.intp, count=len(driver_ids))
+
+    def set_available(self, driver_id, available):
+        self.available[self.rows[driver_id]] = available
+
+    def move(self, driver_id, lat, lon):
+        row = self.rows[driver_id]
+        self.lat[row] = lat
+        self.lon[row] = lon
+
+    def apply_telemetry(self, driver_ids, lat, lon, battery, ts):
+        """Apply a batch of position reports in one vectorized pass
+
+        lat, lon, battery and ts are arrays aligned with driver_ids; a NaN
+        battery leaves the stored value alone. Records with a non-finite or
+        out-of-range lat, lon or ts are dropped before anything is written.
+        Only the newest record per driver is kept, and only if it is newer
+        than the last one applied, so late or replayed reports never move a
+        driver backwards.
+        """
+        n = len(driver_ids)
+        get = self.rows.get
+        rows = np.fromiter((get(driver_id, -1) for driver_id in driver_ids),
+                           dtype=np.intp, count=n)
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        ts = np.asarray(ts, dtype=np.float64)
+        with np.errstate(invalid='ignore'):  # NaN compares False, which drops it
+            valid = ((np.abs(lat) <= 90) & (np.abs(lon) <= 180) & np.isfinite(ts))
+        unknown = int(np.count_nonzero(rows < 0))
+        invalid = int(np.count_nonzero(~valid & (rows >= 0)))
+        candidates = np.where(valid, rows, -1)
+
+        # Newest record per row: sort by (row, ts), keep the last of each run
+        order = np.lexsort((ts, candidates))
+        sorted_rows = candidates[order]
+        last = np.ones(n, dtype=bool)
+        last[:-1] = sorted_rows[1:] != sorted_rows[:-1]
+        pick = order[last & (sorted_rows >= 0)]
+        pick = pick[ts[pick] > self.ts[rows[pick]]]
+
+        target = rows[pick]
+        applied = TelemetryApplied(target, self.lat[target], self.lon[target],
+                                   n - unknown - invalid - len(pick), unknown, invalid)
+        self.lat[target] = lat[pick]
+        self.lon[target] = lon[pick]
+        battery = np.asarray(battery, dtype=np.float64)[pick]
+        reported = ~np.isnan(battery)
+        self.battery[target[reported]] = battery[reported]
+        self.ts[target] = ts[pick]
+        return applied
+
+    def mask(self, available=None, min_battery=None, vehicle_type=None):
+        """Boolean mask over rows [0, size) matching every given filter"""
+        n = self.size
+        mask = self.active[:n].copy()
+        if available is not None:
+            mask &= self.available[:n] == available
+        if min_battery is not None:
+            mask &= self.battery[:n] > min_battery
+        if vehicle_type is not None:
+            code = self.vehicle_codes.get(vehicle_type)
+            if code is None:
+                mask[:] = False
+            else:
+                mask &= self.vehicle_code[:n] == code
+        return mask
+
+    def select(self, **filters):
+        """Row indices matching mask() filters"""
+        return np.flatnonzero(self.mask(**filters))
+
+    def vehicle_type_of(self, row):
+        return self.vehicle_types[self.vehicle_code[row]]
+
+    def record(self, row):
+        """Plain dict of a row, shaped like the Driver response model"""
+        return {
+            "driver_id": self.driver_ids[row],
+            "name": self.names[row],
+            "current_location": {
+                "latitude": float(self.lat[row]),
+                "longitude": float(self.lon[row])
+            },
+            "available": bool(self.available[row]),
+            "ev_battery": float(self.battery[row]),
+            "vehicle_type": self.vehicle_type_of(row),
+            "driver_rating": float(self.rating[row])
+        }
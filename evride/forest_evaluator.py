@@ -0,0 +1,218 @@
+import json
+import os
+import shutil
+
+import numpy as np
+
+
+# On-disk dtypes for the .npy bundle. Thresholds stay float64 because they
+# encode exact float32 rounding boundaries; leaf values lose < 1e-7 relative.
+BUNDLE_DTYPES = {
+    'feature': np.int16,
+    'threshold': np.float64,
+    'left': np.int32,
+    'right': np.int32,
+    'value': np.float32,
+    'roots': np.int32,
+}
+
+
+def float32_split_boundary(threshold):
+    """Largest float64 v with float32(v) <= threshold
+
+    sklearn casts inputs to float32 before comparing them with float64 split
+    thresholds. Comparing the uncast float64 value against this boundary
+    gives the same branch, which lets the scaler be folded into the splits.
+    """
+    threshold = np.asarray(threshold, dtype=np.float64)
+    below = threshold.astype(np.float32)
+    below = np.where(below > threshold, np.nextafter(below, np.float32(-np.inf)), below)
+    above = np.nextafter(below, np.float32(np.inf))
+    boundary = (below.astype(np.float64) + above.astype(np.float64)) / 2
+    # An exact midpoint rounds to the float32 with an even mantissa
+    odd = (below.view(np.uint32) & 1).astype(bool)
+    return np.where(odd, np.nextafter(boundary, -np.inf), boundary)
+
+
+def unscaled_split_boundary(boundary, mean, scale, max_steps=64):
+    """Largest float64 x with (x - mean) / scale <= boundary, rounded as StandardScaler does
+
+    boundary * scale + mean is only within a few ulps of it, enough to send
+    inputs right at a split down the wrong branch. The scaled value is
+    monotone in x, so stepping one ulp at a time from there finds the
+    exact cut.
+    """
+    x = boundary * scale + mean
+    for _ in range(max_steps):
+        over = (x - mean) / scale > boundary
+        if not over.any():
+            break
+        x = np.where(over, np.nextafter(x, -np.inf), x)
+    for _ in range(max_steps):
+        step = np.nextafter(x, np.inf)
+        under = (step - mean) / scale <= boundary
+        if not under.any():
+            break
+        x = np.where(under, step, x)
+    return x
+
+
+class FlatForest:
+    """A fitted RandomForestRegressor flattened into contiguous node arrays
+
+    All trees share one set of arrays (feature, threshold, left, right,
+    value) indexed by global node id. Leaves point to themselves with an
+    infinite threshold, so every tree is walked in lock-step for exactly
+    max_depth steps with no per-tree Python loop.
+
+    Thresholds are adjusted for sklearn's float32 input cast (see
+    float32_split_boundary). When a StandardScaler is folded in, they are
+    then moved back into raw feature space (see unscaled_split_boundary), so
+    predict() takes unscaled features and scaler.transform disappears from
+    the hot path.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+
+    @classmethod
+    def from_sklearn(cls, model, scaler=None):
+        """Flatten a fitted forest, optionally folding a StandardScaler into its splits"""
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            is_leaf = tree.children_left < 0
+            node_ids = np.arange(offset, offset + n)
+
+            feature = np.where(is_leaf, 0, tree.feature).astype(np.int64)
+            threshold = np.where(is_leaf, np.inf, float32_split_boundary(tree.threshold))
+            if scaler is not None:
+                split = ~is_leaf
+                scale = np.asarray(scaler.scale_, dtype=np.float64)[feature[split]]
+                mean = np.asarray(scaler.mean_, dtype=np.float64)[feature[split]]
+                threshold[split] = unscaled_split_boundary(threshold[split], mean, scale)
+
+            features.append(feature)
+            thresholds.append(threshold)
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            rights.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+            values.append(tree.value.reshape(n, -1)[:, 0].astype(np.float64))
+            roots.append(offset)
+
+            offset += n
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.int64),
+            max_depth=max_depth,
+            n_features=model.n_features_in_
+        )
+
+    def to_dict(self):
+        """Plain arrays for saving alongside the model"""
+        return {
+            'feature': self.feature,
+            'threshold': self.threshold,
+            'left': self.left,
+            'right': self.right,
+            'value': self.value,
+            'roots': self.roots,
+            'max_depth': self.max_depth,
+            'n_features': self.n_features
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def predict(self, X):
+        """Mean leaf value over all trees for each row of raw features"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), self.n_trees))
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        return self.value[nodes].mean(axis=1, dtype=np.float64)
+
+    def save(self, dirname, metadata=None):
+        """Write a directory of compact .npy arrays that load() can memory-map
+
+        The bundle is written beside dirname and renamed into place, so a
+        reader never sees a half-written model.
+        """
+        if self.n_features > np.iinfo(np.int16).max or self.n_nodes > np.iinfo(np.int32).max:
+            raise ValueError("Forest too large for the compact bundle dtypes")
+
+        tmp_dir = dirname.rstrip(os.sep) + '.tmp'
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        for name, dtype in BUNDLE_DTYPES.items():
+            np.save(os.path.join(tmp_dir, f'{name}.npy'), getattr(self, name).astype(dtype))
+
+        meta = dict(metadata or {})
+        meta.update({'max_depth': self.max_depth, 'n_features': self.n_features})
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+        shutil.rmtree(dirname, ignore_errors=True)
+        os.replace(tmp_dir, dirname)
+
+    @classmethod
+    def load(cls, dirname, mmap=True):
+        """Load a bundle written by save(); returns (forest, metadata)
+
+        With mmap=True the arrays are read-only views of the page cache, so
+        every worker process serving the same bundle shares one copy.
+        """
+        with open(os.path.join(dirname, 'meta.json')) as f:
+            meta = json.load(f)
+        arrays = {
+            name: np.asarray(np.load(os.path.join(dirname, f'{name}.npy'),
+                                     mmap_mode='r' if mmap else None))
+            for name in BUNDLE_DTYPES
+        }
+        forest = cls(max_depth=meta['max_depth'], n_features=meta['n_features'], **arrays)
+        return forest, meta
+
+
+def verify_against_sklearn(forest, model, scaler, X, rtol=1e-9, atol=1e-6):
+    """Compare FlatForest on raw X with sklearn on scaled X; returns max abs difference"""
+    X = np.asarray(X, dtype=np.float64)
+    expected = model.predict(scaler.transform(X) if scaler is not None else X)
+    actual = forest.predict(X)
+    max_diff = float(np.max(np.abs(actual - expected))) if len(X) else 0.0
+    if not np.allclose(actual, expected, rtol=rtol, atol=atol):
+        mismatched = int(np.sum(~np.isclose(actual, expected, rtol=rtol, atol=atol)))
+        raise AssertionError(
+            f"FlatForest disagrees with sklearn on {mismatched}/{len(X)} rows (max diff {max_diff:.6g})"
+        )
+    return max_diff
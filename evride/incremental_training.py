@@ -0,0 +1,248 @@
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+
+
+class TrainingStore:
+    """Append-only store of completed rides as fare-model feature rows and fares
+
+    price() keeps the feature row a ride was quoted on, keyed by ride_id and
+    out of the ride record itself; add() pairs it with the fare the rider
+    was actually charged once the ride completes. Rides completed without a
+    final_fare are counted in stats() and not stored, so the model never
+    trains on its own quotes. Rows are buffered in memory and written out
+    by flush() as numbered segment directories (X.npy, y.npy, meta.json),
+    each renamed into place so a reader never sees half a segment.
+    state.json records the last segment a forest update consumed. Feature
+    rows of open rides and unflushed rows do not survive a restart.
+    """
+
+    def __init__(self, directory='data/training', max_open=100_000):
+        self.directory = directory
+        self.max_open = max_open
+        self.lock = threading.Lock()  # Guards the buffer and open rides
+        self.flush_lock = threading.Lock()  # One segment writer at a time
+        self.open = OrderedDict()  # ride_id -> feature row, oldest quote first
+        self.rows, self.labels, self.ride_ids = [], [], []
+        self.skipped = 0  # Completed rides with no final fare or no feature row
+        self.state = {'trained_through': -1, 'last_completed_at': None}
+        try:
+            with open(self._path('state.json')) as f:
+                self.state.update(json.load(f))
+        except FileNotFoundError:
+            pass
+        self.last_completed_at = self.state['last_completed_at']  # Newest completion buffered or flushed
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def segments(self):
+        """Numbers of the segments on disk, oldest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(int(name.split('-')[1]) for name in os.listdir(self.directory)
+                      if name.startswith('segment-') and not name.endswith('.tmp'))
+
+    def price(self, ride_id, features):
+        """Keep the feature row a ride was priced on until it completes or is discarded
+
+        Past max_open open rides the oldest row is dropped.
+        """
+        with self.lock:
+            self.open[ride_id] = features
+            if len(self.open) > self.max_open:
+                self.open.popitem(last=False)
+
+    def discard(self, ride_id):
+        """Forget the feature row of a ride that will not complete"""
+        with self.lock:
+            self.open.pop(ride_id, None)
+
+    def add(self, ride):
+        """Buffer a completed ride with its final fare as the label; returns whether it was kept"""
+        with self.lock:
+            features = self.open.pop(ride['ride_id'], None)
+            if features is None or ride.get('final_fare') is None:
+                self.skipped += 1
+                return False
+            self.rows.append(features)
+            self.labels.append(ride['final_fare'])
+            self.ride_ids.append(ride['ride_id'])
+            completed_at = ride.get('completed_at')
+            if completed_at and (self.last_completed_at is None
+                                 or completed_at > self.last_completed_at):
+                self.last_completed_at = completed_at
+        return True
+
+    def flush(self):
+        """Write buffered rows as the next segment; returns its number, or None if empty"""
+        with self.flush_lock:
+            with self.lock:  # Only the buffer swap blocks add()
+                if not self.rows:
+                    return None
+                rows, labels, ride_ids = self.rows, self.labels, self.ride_ids
+                self.rows, self.labels, self.ride_ids = [], [], []
+                last_completed_at = self.last_completed_at
+            segments = self.segments()
+            number = segments[-1] + 1 if segments else 0
+
+            directory = self._path(f'segment-{number:05d}')
+            tmp_dir = directory + '.tmp'
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            os.makedirs(tmp_dir)
+            np.save(os.path.join(tmp_dir, 'X.npy'), np.asarray(rows, dtype=np.float64))
+            np.save(os.path.join(tmp_dir, 'y.npy'), np.asarray(labels, dtype=np.float64))
+            with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+                json.dump({'rows': len(rows), 'ride_ids': ride_ids,
+                           'written_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}, f)
+            os.replace(tmp_dir, directory)
+            self._write_state(last_completed_at=last_completed_at)
+            return number
+
+    def untrained(self):
+        """(X, y, last segment) over the segments no forest update has consumed yet"""
+        numbers = [n for n in self.segments() if n > self.state['trained_through']]
+        if not numbers:
+            return np.empty((0, 0)), np.empty(0), self.state['trained_through']
+        X = np.concatenate([np.load(self._path(f'segment-{n:05d}/X.npy')) for n in numbers])
+        y = np.concatenate([np.load(self._path(f'segment-{n:05d}/y.npy')) for n in numbers])
+        return X, y, numbers[-1]
+
+    def mark_trained(self, through):
+        self._write_state(trained_through=through)
+
+    def _write_state(self, **changes):
+        state = dict(self.state, **changes)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self._path('state.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp, self._path('state.json'))
+        self.state = state
+
+    def stats(self):
+        segments = self.segments()
+        return {
+            'directory': self.directory,
+            'open_rides': len(self.open),
+            'buffered_rows': len(self.rows),
+            'skipped_rides': self.skipped,
+            'segments': len(segments),
+            'untrained_segments': sum(n > self.state['trained_through'] for n in segments),
+            'last_completed_at': self.last_completed_at
+        }
+
+
+def grow_forest(model, scaler, X, y, new_trees=20, max_trees=None):
+    """Fit new_trees more trees on (X, y) with warm_start; past max_trees the oldest are dropped
+
+    Existing trees are left untouched, so the cost depends on len(X) only.
+    The scaler stays as fitted on the full history. With max_trees=None the
+    forest only grows; with a cap, trees fitted longest ago age out first,
+    which keeps serving latency flat. Returns the number of trees dropped.
+    """
+    if hasattr(scaler, 'feature_names_in_'):
+        import pandas as pd
+        X = pd.DataFrame(X, columns=scaler.feature_names_in_)
+    model.set_params(warm_start=True, oob_score=False,
+                     n_estimators=len(model.estimators_) + new_trees)
+    model.fit(scaler.transform(X), y)
+    dropped = max(0, len(model.estimators_) - max_trees) if max_trees else 0
+    model.estimators_ = model.estimators_[dropped:]  # New trees are appended last
+    model.set_params(warm_start=False, n_estimators=len(model.estimators_))
+    return dropped
+
+
+def candidate_path(model_path, through):
+    """Versioned path a retrained model is saved to before it is promoted"""
+    stem, ext = os.path.splitext(model_path)
+    return f'{stem}-retrain-{through:05d}{ext}'
+
+
+def bundle_path(model_path):
+    """Serving bundle directory EnhancedFarePredictor.save_model writes beside a pickle"""
+    return os.path.splitext(model_path)[0] + '.flat'
+
+
+def promote(candidate, model_path):
+    """Move a candidate's pickle and serving bundle onto the served paths"""
+    served_bundle = bundle_path(model_path)
+    shutil.rmtree(served_bundle, ignore_errors=True)
+    os.replace(bundle_path(candidate), served_bundle)
+    os.replace(candidate, model_path)
+
+
+def discard(candidate):
+    """Delete a candidate that was not promoted"""
+    shutil.rmtree(bundle_path(candidate), ignore_errors=True)
+    if os.path.exists(candidate):
+        os.remove(candidate)
+
+
+def retrain(store, model_path='models/fare_model_enhanced.pkl', new_trees=20,
+            max_trees=None, min_rows=500, holdout=0.2):
+    """Grow the saved forest on the rows it has not seen yet and save it as a candidate
+
+    The newest `holdout` share of the rows is kept out of the fit and
+    scores the current and the grown forest. Only a grown forest with no
+    higher holdout MAE is saved, at candidate_path(); the served files are
+    left alone and no segment is marked trained, so the caller promote()s
+    the candidate and calls store.mark_trained(report['through_segment'])
+    once it is serving. Returns a report dict, or None while fewer than
+    min_rows rows are waiting.
+    """
+    # Deferred: sklearn is only needed when a retrain actually runs
+    from dataset_integration import EnhancedFarePredictor
+
+    store.flush()
+    X, y, through = store.untrained()
+    if len(y) < max(min_rows, 2):
+        return None
+
+    started = time.perf_counter()
+    predictor = EnhancedFarePredictor()
+    predictor.load_model(model_path)
+    if X.shape[1] != len(predictor.feature_columns):
+        raise ValueError(f"Training store rows have {X.shape[1]} features, "
+                         f"model expects {len(predictor.feature_columns)}")
+    split = len(y) - min(len(y) - 1, max(1, int(round(len(y) * holdout))))  # Newest rows last
+    X_fit, y_fit, X_test, y_test = X[:split], y[:split], X[split:], y[split:]
+    mae_before = float(np.abs(predictor.export_flat_forest().predict(X_test) - y_test).mean())
+
+    fit_started = time.perf_counter()
+    dropped = grow_forest(predictor.model, predictor.scaler, X_fit, y_fit, new_trees, max_trees)
+    fit_s = time.perf_counter() - fit_started
+    mae_after = float(np.abs(predictor.export_flat_forest().predict(X_test) - y_test).mean())
+    accepted = mae_after <= mae_before
+
+    candidate = None
+    if accepted:
+        candidate = candidate_path(model_path, through)
+        predictor.save_model(candidate)
+
+    report = {
+        'rows': len(y),
+        'holdout_rows': len(y_test),
+        'through_segment': through,
+        'trees_added': new_trees,
+        'trees_dropped': dropped,
+        'max_trees': max_trees,
+        'n_trees': len(predictor.model.estimators_),
+        'mae_before': round(mae_before, 2),
+        'mae_after': round(mae_after, 2),
+        'accepted': accepted,
+        'candidate': candidate,
+        'fit_s': round(fit_s, 3),
+        'elapsed_s': round(time.perf_counter() - started, 3)
+    }
+    aged_out = f", aged out {dropped} oldest (cap {max_trees})" if dropped else ""
+    print(f"Incremental retrain: {len(y_fit):,} rows, +{new_trees} trees{aged_out} "
+          f"in {report['elapsed_s']:.2f}s; holdout MAE {mae_before:.2f} -> {mae_after:.2f}"
+          f"{'' if accepted else ', rejected'}")
+    return report
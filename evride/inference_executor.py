@@ -0,0 +1,105 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+EXECUTOR_MODES = ("inline", "thread", "process")
+
+# Model state preloaded in each process-pool worker
+_worker_model = None
+
+
+def _init_worker(forest):
+    """Process-pool initializer: keep the forest of the bundle the pool was started for"""
+    global _worker_model
+    _worker_model = forest
+
+
+def _worker_predict(features):
+    return _worker_model.predict(features)
+
+
+class InferenceExecutor:
+    """Runs CPU-bound inference and matching off the asyncio event loop
+
+    inline  - call directly on the event loop (previous behaviour)
+    thread  - thread pool; sklearn and NumPy release the GIL in their hot loops
+    process - process pool with the fare model preloaded in every worker;
+              matching still uses a thread since fleet state lives here
+
+    The process pool is tagged with the model version it serves, and its
+    workers get that bundle's FlatForest itself as initializer argument
+    rather than a path, so a worker spawned after the model files were
+    rewritten still serves the tagged version. Forked workers share the
+    parent's (memory-mapped) arrays; spawned ones receive a pickled copy.
+    Predictions for any other version run on the thread pool instead.
+    """
+
+    def __init__(self, mode="thread", workers=None):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown executor mode '{mode}', expected one of {EXECUTOR_MODES}")
+        self.mode = mode
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.thread_pool = None
+        self.process_pool = None
+        self.pool_version = None
+
+    def start(self, version=None, forest=None):
+        """Create the thread pool, and the process pool if a model version is given
+
+        Without a version the process pool is left to the first
+        restart_workers() call, so a boot that loads the model right after
+        starting spawns its workers once.
+        """
+        if self.mode == "inline":
+            return
+        self.thread_pool = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="evride-cpu"
+        )
+        if version is not None:
+            self.process_pool = self._start_process_pool(forest)
+            self.pool_version = version
+
+    def _start_process_pool(self, forest):
+        if self.mode != "process" or forest is None:
+            return None
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(forest,)
+        )
+
+    def restart_workers(self, version, forest):
+        """Swap in a process pool serving forest, the evaluator of bundle `version`
+
+        The old pool finishes the work already submitted to it and exits.
+        """
+        if self.mode != "process" or self.thread_pool is None or version == self.pool_version:
+            return
+        old_pool = self.process_pool
+        self.process_pool = self._start_process_pool(forest)
+        self.pool_version = version
+        if old_pool is not None:
+            old_pool.shutdown(wait=False)
+
+    def shutdown(self):
+        if self.thread_pool is not None:
+            self.thread_pool.shutdown(wait=False)
+            self.thread_pool = None
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=False, cancel_futures=True)
+            self.process_pool = None
+
+    async def run(self, fn, *args):
+        """Run fn(*args) in the thread pool, or inline if there is none"""
+        if self.thread_pool is None:
+            return fn(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.thread_pool, fn, *args)
+
+    async def predict(self, model, features, version=None):
+        """Forest predict on a raw feature matrix"""
+        if self.process_pool is not None and version == self.pool_version:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.process_pool, _worker_predict, features)
+        return await self.run(model.predict, features)
@@ -0,0 +1,113 @@
+import asyncio
+import time
+from collections import deque
+
+import numpy as np
+
+
+class BatchMetrics:
+    """Rolling batch size, queue wait and batch latency samples"""
+
+    def __init__(self, window=2048):
+        self.batches = 0
+        self.rows = 0
+        self.batch_sizes = deque(maxlen=window)
+        self.queue_wait_ms = deque(maxlen=window)
+        self.batch_latency_ms = deque(maxlen=window)
+
+    def record(self, batch_size, waits_ms, latency_ms):
+        self.batches += 1
+        self.rows += batch_size
+        self.batch_sizes.append(batch_size)
+        self.queue_wait_ms.extend(waits_ms)
+        self.batch_latency_ms.append(latency_ms)
+
+    @staticmethod
+    def _summary(samples):
+        if not samples:
+            return {"mean": 0.0, "p50": 0.0, "p99": 0.0, "max": 0.0}
+        values = np.fromiter(samples, dtype=np.float64)
+        return {
+            "mean": round(float(values.mean()), 3),
+            "p50": round(float(np.percentile(values, 50)), 3),
+            "p99": round(float(np.percentile(values, 99)), 3),
+            "max": round(float(values.max()), 3)
+        }
+
+    def snapshot(self):
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "batch_size": self._summary(self.batch_sizes),
+            "queue_wait_ms": self._summary(self.queue_wait_ms),
+            "batch_latency_ms": self._summary(self.batch_latency_ms)
+        }
+
+
+class MicroBatchScheduler:
+    """Coalesce concurrent single-row predictions into batched calls
+
+    Rows wait at most window_ms (or until max_batch rows are queued), then
+    the whole batch goes through predict_batch(rows, context) once and each
+    caller's future receives its own result. Rows submitted with different
+    context objects (e.g. model bundles) are split into separate calls.
+    predict_batch may be a coroutine function.
+    """
+
+    def __init__(self, predict_batch, window_ms=2.0, max_batch=64):
+        self.predict_batch = predict_batch
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.metrics = BatchMetrics()
+        self._pending = []
+        self._flush_handle = None
+
+    async def submit(self, row, context=None):
+        """Queue one row and wait for its prediction"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, context, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, []
+        groups = {}
+        for item in pending:
+            groups.setdefault(id(item[1]), []).append(item)
+        loop = asyncio.get_running_loop()
+        for batch in groups.values():
+            loop.create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch):
+        started = time.perf_counter()
+        waits_ms = [(started - enqueued) * 1000 for _, _, _, enqueued in batch]
+        try:
+            results = await self._predict([row for row, _, _, _ in batch], batch[0][1])
+        except Exception as e:
+            for _, _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.metrics.record(len(batch), waits_ms, (time.perf_counter() - started) * 1000)
+        for (_, _, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _predict(self, rows, context):
+        result = self.predict_batch(rows, context)
+        if asyncio.iscoroutine(result):
+            result = await result
+        return result
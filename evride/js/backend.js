@@ -33,6 +33,23 @@ export async function requestRideFromBackend(rideData) {
   return await response.json();
 }
 
+// Price several trips in one call without reserving drivers
+export async function requestQuotesFromBackend(quotes) {
+  const response = await fetch(`${API_BASE_URL}/ride/quote/batch`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({ quotes })
+  });
+
+  if (!response.ok) {
+    throw new Error('Backend error');
+  }
+
+  return await response.json();
+}
+
 // Complete ride notification to backend
 export async function notifyRideCompletion(rideId) {
   try {
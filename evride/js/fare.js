@@ -1,9 +1,14 @@
 import { cityLocations, vehicleRates } from './config.js';
-import { requestRideFromBackend } from './backend.js';
+import { requestQuotesFromBackend, requestRideFromBackend } from './backend.js';
 import { showAlert } from './ui.js';
 
 export let selectedVehicle = "Sedan";
 
+// Fare per km as text, or "—" for a zero-length trip (pickup equals dropoff)
+function perKmText(fare, distance, digits) {
+  return distance > 0 ? (fare / distance).toFixed(digits) : "—";
+}
+
 // Select vehicle
 export function selectVehicle(vehicle, element) {
   selectedVehicle = vehicle;
@@ -18,6 +23,43 @@ export function selectVehicle(vehicle, element) {
   });
 }
 
+// Latest route priced by quoteAllVehicles; older responses are ignored
+let quoteRoute = 0;
+
+// Price every vehicle card for the route in one batch call, replacing the
+// per-km estimates; those stay up if the backend is unavailable
+export async function quoteAllVehicles(pickupCoords, dropCoords, city) {
+  const route = ++quoteRoute;
+  const cards = Array.from(document.querySelectorAll(".vehicle-card"));
+  const quotes = cards.map(card => ({
+    pickup: {
+      latitude: pickupCoords[0],
+      longitude: pickupCoords[1]
+    },
+    dropoff: {
+      latitude: dropCoords[0],
+      longitude: dropCoords[1]
+    },
+    city: city,
+    vehicle_type: card.querySelector('strong').textContent.toLowerCase(),
+    user_type: "regular"
+  }));
+
+  try {
+    const data = await requestQuotesFromBackend(quotes);
+    if (route !== quoteRoute) return;
+    data.quotes.forEach((quote, i) => {
+      const perKm = perKmText(quote.estimated_fare, quote.estimated_distance, 1);
+      cards[i].querySelector('.vehicle-price').innerHTML = `
+      <div style="font-size: 0.8em; color: #059669;">₹${perKm}/km</div>
+      <div style="font-size: 0.9em; font-weight: 700; color: #1f2937;">₹${Math.round(quote.estimated_fare)}</div>
+    `;
+    });
+  } catch (error) {
+    console.log("Batch quote failed, keeping per-km estimates:", error);
+  }
+}
+
 // Calculate Fare
 export async function calculateFare() {
   const pickupLocation = document.getElementById("pickupLocation").value;
@@ -70,7 +112,7 @@ export async function calculateFare() {
     document.getElementById("predictedFare").textContent = data.estimated_fare.toFixed(2);
     document.getElementById("fareDistance").textContent = data.estimated_distance.toFixed(1);
     document.getElementById("fareDuration").textContent = Math.round(data.estimated_time);
-    document.getElementById("perKmRate").textContent = (data.estimated_fare / data.estimated_distance).toFixed(2);
+    document.getElementById("perKmRate").textContent = perKmText(data.estimated_fare, data.estimated_distance, 2);
 
     document.getElementById("fareSection").classList.remove("hidden");
     document.getElementById("fareSection").scrollIntoView({ behavior: "smooth", block: "nearest" });
@@ -98,7 +140,7 @@ export async function calculateFare() {
     document.getElementById("predictedFare").textContent = finalFare.toFixed(2);
     document.getElementById("fareDistance").textContent = distance.toFixed(1);
     document.getElementById("fareDuration").textContent = duration;
-    document.getElementById("perKmRate").textContent = (finalFare / distance).toFixed(2);
+    document.getElementById("perKmRate").textContent = perKmText(finalFare, distance, 2);
 
     document.getElementById("fareSection").classList.remove("hidden");
   }
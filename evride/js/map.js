@@ -1,6 +1,7 @@
 import { cityLocations, cityCenter } from './config.js';
 import { updateAllVehiclePrices } from './ui.js';
 import { stopRideSimulation } from './ride.js';
+import { quoteAllVehicles } from './fare.js';
 
 // Map variables
 export let map, pickupMarker, dropMarker, routeLine, movingVehicle;
@@ -102,6 +103,7 @@ export function updateMapRoute() {
   document.getElementById("routeDuration").textContent = duration;
 
   updateAllVehiclePrices();
+  quoteAllVehicles(pickupCoords, dropCoords, city);
   document.getElementById("fareSection").classList.add("hidden");
   
   if (rideInProgress) {
@@ -0,0 +1,177 @@
+import asyncio
+import json
+
+from distance_engine import equirectangular_pair_km
+
+
+def moved_m(lat1, lon1, lat2, lon2):
+    """Equirectangular distance in metres, plenty for a movement threshold"""
+    return 1000.0 * equirectangular_pair_km(lat1, lon1, lat2, lon2)
+
+
+def location_message(lat, lon):
+    """Websocket payload for a driver position"""
+    return json.dumps({"latitude": float(lat), "longitude": float(lon)})
+
+
+class LocationSubscription:
+    """One websocket watching one driver: a single pending-message slot and a wake-up event
+
+    offer() overwrites the slot, so a burst of updates that arrives while a
+    send is in flight collapses into the newest position.
+    """
+
+    __slots__ = ("driver_id", "pending", "wake", "sent", "coalesced", "sending_since",
+                 "pump", "dropped")
+
+    def __init__(self, driver_id):
+        self.driver_id = driver_id
+        self.pending = None
+        self.wake = asyncio.Event()
+        self.sent = 0
+        self.coalesced = 0
+        self.sending_since = None  # loop time the in-flight send started
+        self.pump = None
+        self.dropped = False
+
+    def offer(self, message):
+        if self.pending is not None:
+            self.coalesced += 1
+        self.pending = message
+        self.wake.set()
+
+    async def next_message(self):
+        await self.wake.wait()
+        self.wake.clear()
+        message, self.pending = self.pending, None
+        return message
+
+
+class LocationHub:
+    """Pub/sub fan-out of driver positions to websocket subscribers
+
+    A location update is published once: it is dropped when the driver has
+    moved less than min_move_m since the last published position, otherwise
+    it is encoded once and offered to that driver's subscribers. Each
+    connection has one send task that sleeps until it has something to send,
+    so idle connections cost no timers or redundant sends. A single
+    watchdog task drops subscribers whose send has not finished within
+    send_timeout, rather than a timeout per send; coalescing means a slow
+    one never queues more than one message.
+    """
+
+    def __init__(self, min_move_m=10.0, send_timeout=5.0):
+        self.min_move_m = min_move_m
+        self.send_timeout = send_timeout
+        self.subscribers = {}     # driver_id -> set(LocationSubscription)
+        self.last_published = {}  # driver_id -> (lat, lon)
+        self.published = 0
+        self.suppressed = 0
+        self.delivered = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.watchdog = None
+
+    def subscribe(self, driver_id, lat=None, lon=None):
+        """New subscription, primed with the current position if given"""
+        subscription = LocationSubscription(driver_id)
+        first = driver_id not in self.subscribers
+        self.subscribers.setdefault(driver_id, set()).add(subscription)
+        if lat is not None:
+            if first or driver_id not in self.last_published:
+                self.last_published[driver_id] = (lat, lon)
+            subscription.offer(location_message(lat, lon))
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscribers = self.subscribers.get(subscription.driver_id)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self.subscribers[subscription.driver_id]
+        self.coalesced += subscription.coalesced
+
+    def publish(self, driver_id, lat, lon):
+        """Fan a position out to the driver's subscribers; False if below the threshold"""
+        last = self.last_published.get(driver_id)
+        if last is not None and moved_m(last[0], last[1], lat, lon) < self.min_move_m:
+            self.suppressed += 1
+            return False
+        self.last_published[driver_id] = (lat, lon)
+        self.published += 1
+        subscribers = self.subscribers.get(driver_id)
+        if subscribers:
+            message = location_message(lat, lon)
+            for subscription in subscribers:
+                subscription.offer(message)
+        return True
+
+    def publish_many(self, driver_ids, lats, lons):
+        """publish() for a telemetry batch, skipping drivers nobody watches"""
+        subscribers = self.subscribers
+        for driver_id, lat, lon in zip(driver_ids, lats, lons):
+            if driver_id in subscribers:
+                self.publish(driver_id, lat, lon)
+
+    async def _pump(self, subscription, send):
+        loop = asyncio.get_running_loop()
+        while True:
+            message = await subscription.next_message()
+            subscription.sending_since = loop.time()
+            await send(message)
+            subscription.sending_since = None
+            subscription.sent += 1
+            self.delivered += 1
+
+    async def _watch_sends(self):
+        """Cancel sends stuck for longer than send_timeout"""
+        loop = asyncio.get_running_loop()
+        while self.subscribers:
+            await asyncio.sleep(self.send_timeout / 2)
+            deadline = loop.time() - self.send_timeout
+            for subscribers in list(self.subscribers.values()):
+                for subscription in subscribers:
+                    since = subscription.sending_since
+                    if since is not None and since < deadline and not subscription.dropped:
+                        subscription.dropped = True
+                        subscription.pump.cancel()
+        self.watchdog = None
+
+    async def stream(self, subscription, send, wait_closed):
+        """Serve one connection until the client leaves or is dropped as too slow
+
+        send(text) writes one message; wait_closed() returns once the client
+        has disconnected. Returns True if the subscriber was dropped.
+        """
+        subscription.pump = asyncio.ensure_future(self._pump(subscription, send))
+        closed = asyncio.ensure_future(wait_closed())
+        if self.watchdog is None:
+            self.watchdog = asyncio.ensure_future(self._watch_sends())
+        try:
+            await asyncio.wait({subscription.pump, closed},
+                               return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            subscription.pump.cancel()
+            closed.cancel()
+            self.unsubscribe(subscription)
+        for task in (subscription.pump, closed):
+            if task.done() and not task.cancelled():
+                task.exception()  # A send or receive error just means the client is gone
+        if subscription.dropped:
+            self.dropped += 1
+        return subscription.dropped
+
+    def stats(self):
+        return {
+            "subscribers": sum(len(s) for s in self.subscribers.values()),
+            "watched_drivers": len(self.subscribers),
+            "min_move_m": self.min_move_m,
+            "published": self.published,
+            "suppressed": self.suppressed,
+            "delivered": self.delivered,
+            "coalesced": self.coalesced + sum(
+                sub.coalesced for subs in self.subscribers.values() for sub in subs
+            ),
+            "dropped_slow": self.dropped
+        }
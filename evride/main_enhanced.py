@@ -1,13 +1,21 @@
-from fastapi import FastAPI, HTTPException
+from startup_timing import StartupTimer
+startup_timer = StartupTimer()  # Created first so the import phase is timed
+
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List, Optional
-import pandas as pd
+import asyncio
 import numpy as np
-import joblib
 import os
 from datetime import datetime
-from geopy.distance import geodesic
+from spatial_index import DriverSpatialIndex
+from ride_log import open_ride_repository
+from ride_repository import InvalidTransition
+import distance_engine
+
+startup_timer.lap("imports")
 
 app = FastAPI(
     title="EV Ride Booking Platform - Production Ready",
@@ -70,6 +78,8 @@ class EnhancedModelManager:
         
     def load_models(self):
         """Load pre-trained models"""
+        # Deferred: pulls in sklearn when unpickling
+        import joblib
         try:
             if os.path.exists('models/fare_model_enhanced.pkl'):
                 fare_data = joblib.load('models/fare_model_enhanced.pkl')
@@ -196,7 +206,15 @@ model_manager = EnhancedModelManager()
 
 #In-Memory Storage
 
-rides_db = {}
+# Indexed by user, driver and status; keeps /admin/stats aggregates. With
+# EVRIDE_RIDE_STORE=log every change is group-committed to an append-only
+# log under EVRIDE_RIDE_LOG_DIR and replayed here on startup. The log takes
+# one writer process per directory; a second one raises at import.
+rides_db = open_ride_repository(
+    os.environ.get("EVRIDE_RIDE_STORE", "memory"),
+    os.environ.get("EVRIDE_RIDE_LOG_DIR", "data/rides"),
+    int(os.environ.get("EVRIDE_RIDE_SNAPSHOT_EVERY", "10000"))
+)
 drivers_db = {}
 
 # Sample drivers
@@ -224,13 +242,42 @@ for d in sample_drivers:
         driver_rating=d["rating"]
     )
 
+# Spatial index over available drivers
+driver_index = DriverSpatialIndex()
+
+def index_driver(driver: Driver):
+    """Sync a driver's position and availability into the spatial index"""
+    driver_index.update(
+        driver.driver_id,
+        driver.current_location.latitude,
+        driver.current_location.longitude,
+        driver.vehicle_type,
+        driver.available
+    )
+
+def set_driver_available(driver_id: str, available: bool):
+    """Flip driver availability and keep the spatial index in step"""
+    driver = drivers_db[driver_id]
+    driver.available = available
+    index_driver(driver)
+
+for driver in drivers_db.values():
+    index_driver(driver)
+
+# Drivers still on a recovered ride stay busy
+for driver_id in list(rides_db.active_by_driver):
+    if driver_id in drivers_db:
+        set_driver_available(driver_id, False)
+
+startup_timer.lap("app_setup")
+
 #Helper Functions 
 def calculate_distance(loc1: Location, loc2: Location) -> float:
-    """Calculate distance between two locations"""
-    return geodesic(
-        (loc1.latitude, loc1.longitude), 
-        (loc2.latitude, loc2.longitude)
-    ).km
+    """Calculate exact distance between two locations"""
+    return distance_engine.geodesic_km(
+        loc1.latitude, loc1.longitude,
+        loc2.latitude, loc2.longitude
+    )
 
 def estimate_duration(distance_km: float, traffic_level: str) -> float:
     """Estimate trip duration in minutes"""
@@ -258,40 +305,74 @@ def is_holiday() -> bool:
     """Check if today is holiday"""
     return False
 
-def find_nearest_driver(pickup: Location, available_drivers: list, vehicle_type: str = None) -> tuple:
-    """Find nearest available driver"""
-    if not available_drivers:
-        return None, float('inf')
+def find_nearest_driver(pickup: Location, vehicle_type: str = None) -> tuple:
+    """Find nearest available driver from nearby grid cells"""
     
-    if vehicle_type:
-        filtered = [d for d in available_drivers if d.vehicle_type == vehicle_type]
-        if filtered:
-            available_drivers = filtered
+    def score(driver_ids):
+        batch = [drivers_db[driver_id] for driver_id in driver_ids]
+        battery = np.array([d.ev_battery for d in batch])
+        dist = distance_engine.haversine_km(
+            pickup.latitude, pickup.longitude,
+            [d.current_location.latitude for d in batch],
+            [d.current_location.longitude for d in batch]
+        )
+        return np.where(battery > 20, dist + ((100 - battery) / 10), np.inf)
     
-    min_dist = float('inf')
-    best_driver = None
+    best_id = None
+    if vehicle_type:
+        _, best_id = driver_index.best(pickup.latitude, pickup.longitude, score, vehicle_type)
+    if best_id is None:
+        _, best_id = driver_index.best(pickup.latitude, pickup.longitude, score)
     
-    for driver in available_drivers:
-        dist = calculate_distance(pickup, driver.current_location)
-        score = dist + ((100 - driver.ev_battery) / 10)
-        
-        if score < min_dist:
-            min_dist = dist
-            best_driver = driver
+    if best_id is None:
+        return None, float('inf')
     
-    return best_driver, min_dist
+    # Refine only the winner with the exact geodesic
+    best_driver = drivers_db[best_id]
+    return best_driver, calculate_distance(pickup, best_driver.current_location)
 
 # Startup Event
 @app.on_event("startup")
 async def startup_event():
-    """Load models on startup"""
+    """Load models in the background so the socket binds immediately"""
     print("\n" + "="*60)
     print(" Starting EV Ride Booking Platform...")
     print("="*60)
-    model_manager.load_models()
-    print(" Server ready!")
+    asyncio.get_running_loop().create_task(warm_up_models())
+    print(" Accepting connections, loading models in the background")
     print("="*60 + "\n")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close the ride store"""
+    await rides_db.close()
+
+async def warm_up_models():
+    """Load models in a thread, run one prediction, then mark the server ready"""
+    loop = asyncio.get_running_loop()
+    with startup_timer.phase("model_load"):
+        loaded = await loop.run_in_executor(None, model_manager.load_models)
+    if not loaded:
+        return
+    with startup_timer.phase("model_warm"):
+        await loop.run_in_executor(None, model_manager.predict_fare, {'distance_km': 5.0})
+    startup_timer.mark_ready()
+    print(" Server ready!")
+    startup_timer.report()
+
+@app.get("/healthz")
+def healthz():
+    """Liveness: the process is up and serving HTTP"""
+    return {"status": "alive"}
+
+@app.get("/readyz")
+def readyz():
+    """Readiness: models are loaded and warmed"""
+    startup = startup_timer.summary()
+    if not startup_timer.ready:
+        return JSONResponse(status_code=503, content={"status": "loading", "startup": startup})
+    return {"status": "ready", "startup": startup}
+
 # API Endpoints
 @app.get("/")
 def root():
@@ -313,17 +394,12 @@ def root():
 async def request_ride(ride_request: RideRequest):
     """Request a ride with ML-powered pricing"""
     
-    # Get available drivers
-    available_drivers = [d for d in drivers_db.values() 
-                        if d.available and d.ev_battery > 20]
-    
-    if not available_drivers:
+    if len(driver_index) == 0:
         raise HTTPException(status_code=404, detail="No available drivers found")
     
-    # Find nearest driver
+    # Find nearest driver among nearby grid cells
     selected_driver, driver_distance = find_nearest_driver(
         ride_request.pickup,
-        available_drivers,
         ride_request.vehicle_type
     )
     
@@ -394,10 +470,17 @@ async def request_ride(ride_request: RideRequest):
         "status": "pending",
         "created_at": now.isoformat()
     }
-    rides_db[ride_id] = ride_data
+    rides_db.add(ride_data)
     
     # Mark driver as busy
-    drivers_db[selected_driver.driver_id].available = False
+    set_driver_available(selected_driver.driver_id, False)
+    try:
+        await rides_db.flush()
+    except BaseException:
+        # The ride never became durable, or the client went away: give the driver back
+        rides_db.transition(ride_id, "cancelled")
+        set_driver_available(selected_driver.driver_id, True)
+        raise
     
     return RideResponse(
         ride_id=ride_id,
@@ -417,12 +500,14 @@ async def complete_ride(ride_id: str):
     if ride_id not in rides_db:
         raise HTTPException(status_code=404, detail="Ride not found")
     
-    ride = rides_db[ride_id]
-    ride["status"] = "completed"
-    ride["completed_at"] = datetime.now().isoformat()
+    try:
+        ride = rides_db.transition(ride_id, "completed", completed_at=datetime.now().isoformat())
+    except InvalidTransition as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    await rides_db.flush()
     
     # Make driver available
-    drivers_db[ride["driver_id"]].available = True
+    set_driver_available(ride["driver_id"], True)
     
     return {
         "message": "Ride completed successfully",
@@ -438,10 +523,47 @@ async def get_ride(ride_id: str):
         raise HTTPException(status_code=404, detail="Ride not found")
     return rides_db[ride_id]
 
+
+@app.get("/rides")
+async def list_rides(user_id: Optional[str] = None,
+                     driver_id: Optional[str] = None,
+                     status: Optional[str] = None,
+                     cursor: Optional[int] = None,
+                     limit: int = Query(20, ge=1, le=100)):
+    """Rides matching the filters, newest first; pass next_cursor to get the next page"""
+    rides, next_cursor = rides_db.query(
+        user_id=user_id, driver_id=driver_id, status=status, cursor=cursor, limit=limit
+    )
+    return {
+        "count": len(rides),
+        "rides": rides,
+        "next_cursor": next_cursor
+    }
+
+@app.get("/drivers/{driver_id}/active_ride")
+async def get_driver_active_ride(driver_id: str):
+    """The driver's pending or accepted ride"""
+    if driver_id not in drivers_db:
+        raise HTTPException(status_code=404, detail="Driver not found")
+    ride = rides_db.active_ride(driver_id)
+    if ride is None:
+        raise HTTPException(status_code=404, detail="No active ride for this driver")
+    return ride
+
 @app.get("/drivers/available")
-async def get_available_drivers():
-    """Get all available drivers"""
+async def get_available_drivers(latitude: Optional[float] = None,
+                                longitude: Optional[float] = None,
+                                radius_km: Optional[float] = None):
+    """Get available drivers, optionally within radius_km of a point"""
     available = [d for d in drivers_db.values() if d.available]
+    if available and latitude is not None and longitude is not None and radius_km is not None:
+        mask = distance_engine.within_radius(
+            latitude, longitude,
+            [d.current_location.latitude for d in available],
+            [d.current_location.longitude for d in available],
+            radius_km
+        )
+        available = [d for d, keep in zip(available, mask) if keep]
     return {
         "count": len(available),
         "drivers": available
@@ -449,25 +571,20 @@ async def get_available_drivers():
 
 @app.get("/admin/stats")
 async def get_stats():
-    """Get system statistics"""
-    total_rides = len(rides_db)
-    completed_rides = len([r for r in rides_db.values() if r["status"] == "completed"])
-    
-    if completed_rides > 0:
-        avg_fare = sum(r["fare"] for r in rides_db.values() if r["status"] == "completed") / completed_rides
-        avg_distance = sum(r["distance"] for r in rides_db.values() if r["status"] == "completed") / completed_rides
-    else:
-        avg_fare = 0
-        avg_distance = 0
-    
+    """Get system statistics, from running aggregates rather than a scan of rides_db"""
+    rides = rides_db.stats.snapshot()
     return {
         "models_loaded": model_manager.models_loaded,
-        "total_rides": total_rides,
-        "completed_rides": completed_rides,
-        "pending_rides": total_rides - completed_rides,
-        "available_drivers": len([d for d in drivers_db.values() if d.available]),
-        "average_fare": round(avg_fare, 2),
-        "average_distance": round(avg_distance, 2)
+        "startup": startup_timer.summary(),
+        "total_rides": rides["total_rides"],
+        "completed_rides": rides["completed_rides"],
+        "pending_rides": rides["pending_rides"],
+        "rides_by_status": rides["rides_by_status"],
+        "ride_store": rides_db.store_stats(),
+        "available_drivers": len(driver_index),
+        "available_drivers_by_vehicle_type": driver_index.counts(),
+        "average_fare": rides["average_fare"],
+        "average_distance": rides["average_distance"]
     }
 
 # uvicorn main_enhanced:app --reload --port 8000
\ No newline at end of file
@@ -1,14 +1,35 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File
-from pydantic import BaseModel
+from startup_timing import StartupTimer
+startup_timer = StartupTimer()  # Created first so the import phase is timed
+
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+import asyncio
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List, Optional
-import pandas as pd
 import numpy as np
-import joblib
 import os
 from datetime import datetime
-from geopy.distance import geodesic
-from fastapi import WebSocket
+from fastapi import WebSocket, WebSocketDisconnect
+from spatial_index import DriverSpatialIndex
+from ride_log import open_ride_repository
+from ride_repository import InvalidTransition
+from location_hub import LocationHub
+from driver_reservation import DriverReservations
+from fleet_store import FleetStore
+from inference_scheduler import MicroBatchScheduler
+from batch_dispatch import assign
+from inference_executor import InferenceExecutor
+from quote_cache import QuoteCache
+from incremental_training import TrainingStore, bundle_path, discard, promote, retrain
+from model_bundle import (
+    ModelBundle, artifact_fingerprint, label_classes_path, load_model_bundle, validate_bundle
+)
+import distance_engine
+
+startup_timer.lap("imports")
 
 app = FastAPI(
     title="EV Ride Booking Platform - Production Ready",
@@ -24,21 +45,46 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(RequestValidationError)
+async def validation_error(request, exc: RequestValidationError):
+    """422 without echoing the rejected input, which may be NaN or inf and so not JSON"""
+    errors = [{key: value for key, value in error.items() if key != "input"}
+              for error in exc.errors()]
+    return JSONResponse(status_code=422, content={"detail": jsonable_encoder(errors)})
+
 
 @app.websocket("/ws/driver/{driver_id}")
 async def driver_updates(websocket: WebSocket, driver_id: str):
+    """Push the driver's position whenever it moves past the hub's threshold"""
+    await websocket.accept()
+    row = fleet.row_of(driver_id)
+    if row is None:
+        subscription = location_hub.subscribe(driver_id)
+    else:
+        subscription = location_hub.subscribe(driver_id, fleet.lat[row], fleet.lon[row])
+
+    async def wait_closed():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    if await location_hub.stream(subscription, websocket.send_text, wait_closed):
+        await websocket.close(code=1013)  # Too slow to keep up; client may reconnect
+
+@app.websocket("/ws/drivers/telemetry")
+async def driver_telemetry_stream(websocket: WebSocket):
+    """Telemetry batches over one long-lived connection, acknowledged per message"""
     await websocket.accept()
     try:
         while True:
-            driver = drivers_db.get(driver_id)
-            if driver:
-                await websocket.send_json({
-                    "latitude": driver.latitude,
-                    "longitude": driver.longitude
-                })
-            await asyncio.sleep(2)
-    except Exception:
-        await websocket.close()
+            message = await websocket.receive_text()
+            try:
+                batch = TelemetryBatch.model_validate_json(message)
+            except ValidationError as e:
+                await websocket.send_json({"error": e.errors(include_url=False, include_input=False)})
+                continue
+            await websocket.send_json(ingest_telemetry(batch.records))
+    except WebSocketDisconnect:
+        pass
 
 
 
@@ -57,6 +103,49 @@ class RideRequest(BaseModel):
     user_type: str = "regular"
     time_of_day: Optional[str] = None  # morning/afternoon/evening/night
 
+class QuoteRequest(BaseModel):
+    pickup: Location
+    dropoff: Location
+    city: str = "Delhi"
+    vehicle_type: str = "sedan"
+    user_type: str = "regular"
+    time_of_day: Optional[str] = None
+
+class BatchQuoteRequest(BaseModel):
+    quotes: List[QuoteRequest]
+
+class FareQuote(BaseModel):
+    estimated_fare: float
+    base_fare: float
+    surge_multiplier: float
+    estimated_distance: float
+    estimated_time: float
+    demand_factor: float
+
+class BatchQuoteResponse(BaseModel):
+    count: int
+    quotes: List[FareQuote]
+
+class TelemetryRecord(BaseModel):
+    model_config = ConfigDict(allow_inf_nan=False)
+
+    driver_id: str
+    lat: float = Field(ge=-90, le=90)
+    lon: float = Field(ge=-180, le=180)
+    battery: Optional[float] = None
+    ts: float  # Seconds since the epoch, as reported by the driver app
+
+class TelemetryBatch(BaseModel):
+    records: List[TelemetryRecord]
+
+class TelemetryResult(BaseModel):
+    received: int
+    applied: int
+    stale: int
+    unknown: int
+    invalid: int
+    cell_changes: int
+
 class Driver(BaseModel):
     driver_id: str
     name: str
@@ -79,51 +168,108 @@ class RideResponse(BaseModel):
     
     
 
+# Model artifacts; the .flat bundle is memory-mapped and shared across workers
+FARE_MODEL_PATH = 'models/fare_model_enhanced.pkl'
+FARE_MODEL_BUNDLE = 'models/fare_model_enhanced.flat'
+LABEL_ENCODERS_PATH = 'models/label_encoders.pkl'
+
+# Seconds between checks of the model files for a new version (0 disables)
+MODEL_WATCH_INTERVAL = float(os.environ.get("EVRIDE_MODEL_WATCH_INTERVAL", "0"))
+
+# Incremental retraining from completed rides: seconds between runs (0
+# disables the schedule; POST /admin/models/retrain still works), rows
+# needed before a run grows the forest, trees added per run, the forest
+# size past which the oldest trees age out (0 lets the forest grow without
+# a cap) and the newest share of rows held out to accept or reject a run
+TRAINING_STORE_DIR = os.environ.get("EVRIDE_TRAINING_STORE_DIR", "data/training")
+RETRAIN_INTERVAL = float(os.environ.get("EVRIDE_RETRAIN_INTERVAL", "0"))
+RETRAIN_MIN_ROWS = int(os.environ.get("EVRIDE_RETRAIN_MIN_ROWS", "500"))
+RETRAIN_NEW_TREES = int(os.environ.get("EVRIDE_RETRAIN_TREES", "20"))
+RETRAIN_MAX_TREES = int(os.environ.get("EVRIDE_RETRAIN_MAX_TREES", "200")) or None
+RETRAIN_HOLDOUT = float(os.environ.get("EVRIDE_RETRAIN_HOLDOUT", "0.2"))
+
+# Micro-batching of concurrent fare predictions
+INFERENCE_BATCH_WINDOW_MS = float(os.environ.get("EVRIDE_BATCH_WINDOW_MS", "2"))
+INFERENCE_MAX_BATCH = int(os.environ.get("EVRIDE_MAX_BATCH", "64"))
+
+# Where CPU-bound inference and matching run: inline, thread or process
+INFERENCE_EXECUTOR = os.environ.get("EVRIDE_EXECUTOR", "thread")
+INFERENCE_WORKERS = int(os.environ.get("EVRIDE_EXECUTOR_WORKERS", "0")) or None
+
+# Fare quote cache; TTL matches how long a surge multiplier stays valid
+QUOTE_CACHE_SIZE = int(os.environ.get("EVRIDE_QUOTE_CACHE_SIZE", "10000"))
+QUOTE_CACHE_TTL = float(os.environ.get("EVRIDE_QUOTE_CACHE_TTL", "300"))
+
+# Driver location fan-out to /ws/driver subscribers
+LOCATION_MIN_MOVE_M = float(os.environ.get("EVRIDE_LOCATION_MIN_MOVE_M", "10"))
+WS_SEND_TIMEOUT = float(os.environ.get("EVRIDE_WS_SEND_TIMEOUT", "5"))
+
+# Lock stripes for driver claims; drivers map to a stripe by grid cell
+RESERVATION_STRIPES = int(os.environ.get("EVRIDE_RESERVATION_STRIPES", "64"))
+
+# Candidates tried in score order when better ones are claimed concurrently
+MATCH_ATTEMPTS = 8
+
+# Driver dispatch: greedy claims the best driver per request as it arrives;
+# batch buffers requests for a window and solves them as one assignment
+DISPATCH_MODE = os.environ.get("EVRIDE_DISPATCH_MODE", "greedy")
+DISPATCH_WINDOW_MS = float(os.environ.get("EVRIDE_DISPATCH_WINDOW_MS", "1000"))
+DISPATCH_MAX_BATCH = int(os.environ.get("EVRIDE_DISPATCH_MAX_BATCH", "256"))
+DISPATCH_CANDIDATES = int(os.environ.get("EVRIDE_DISPATCH_CANDIDATES", "8"))
+if DISPATCH_MODE not in ("greedy", "batch"):
+    raise ValueError(f"Unknown dispatch mode '{DISPATCH_MODE}', expected greedy or batch")
+
 # Enhanced Model Manager
 class EnhancedModelManager:
     def __init__(self):
-        self.fare_model = None
-        self.fare_scaler = None
-        self.fare_features = None
-        self.label_encoders = None
+        # Current ModelBundle; replaced as a whole, never mutated
+        self.bundle = ModelBundle.empty()
         self.models_loaded = False
+        self.executor = InferenceExecutor(
+            mode=INFERENCE_EXECUTOR,
+            workers=INFERENCE_WORKERS
+        )
+        self.quote_cache = QuoteCache(maxsize=QUOTE_CACHE_SIZE, ttl=QUOTE_CACHE_TTL)
+        self.scheduler = MicroBatchScheduler(
+            self.infer_scheduled_rows,
+            window_ms=INFERENCE_BATCH_WINDOW_MS,
+            max_batch=INFERENCE_MAX_BATCH
+        )
         
+    def artifact_version(self):
+        """Version of the model files on disk, from a stat of each; nothing is read"""
+        return artifact_fingerprint(
+            FARE_MODEL_BUNDLE, FARE_MODEL_PATH, LABEL_ENCODERS_PATH,
+            label_classes_path(LABEL_ENCODERS_PATH)
+        )
+    
+    def load_bundle(self):
+        """Read the model files into a new, not yet published, bundle"""
+        return load_model_bundle(FARE_MODEL_PATH, FARE_MODEL_BUNDLE, LABEL_ENCODERS_PATH)
+    
+    def swap_bundle(self, bundle):
+        """Publish a bundle; requests already holding the old one finish on it"""
+        previous = self.bundle
+        self.bundle = bundle
+        self.models_loaded = True
+        self.quote_cache.clear()
+        self.executor.restart_workers(bundle.version, bundle.fare_evaluator)
+        return previous
+    
     def load_models(self):
         """Load pre-trained models"""
         try:
-            # Load fare prediction model
-            if os.path.exists('models/fare_model_enhanced.pkl'):
-                fare_data = joblib.load('models/fare_model_enhanced.pkl')
-                self.fare_model = fare_data['model']
-                self.fare_scaler = fare_data['scaler']
-                self.fare_features = fare_data['feature_columns']
-                print("Enhanced Fare model loaded")
-            else:
-                print("Fare model not found. Using default calculations.")
-                
-            # Load label encoders
-            if os.path.exists('models/label_encoders.pkl'):
-                self.label_encoders = joblib.load('models/label_encoders.pkl')
-                print("Label encoders loaded")
-            else:
-                print("Label encoders not found.")
-                
-            self.models_loaded = True
+            self.swap_bundle(self.load_bundle())
             return True
             
         except Exception as e:
             print(f"Error loading models: {e}")
             return False
     
-    def encode_categorical(self, value, category):
-        """Encode categorical value"""
-        if self.label_encoders and category in self.label_encoders:
-            try:
-                return self.label_encoders[category].transform([value])[0]
-            except:
-                # If value not seen during training, use default (0)
-                return 0
-        return 0
+    def encode_categorical(self, value, category, bundle=None):
+        """Encode categorical value; unseen values get the fallback code"""
+        bundle = bundle or self.bundle
+        return bundle.encoders.encode(value, category)
     
     def get_time_of_day(self):
         """Get current time of day"""
@@ -188,65 +334,170 @@ class EnhancedModelManager:
         
         return round(surge, 2)
     
+    def fallback_fare(self, ride_features):
+        """Distance-based fare when the model is unavailable"""
+        base = 40
+        per_km = 12
+        fare = base + (ride_features['distance_km'] * per_km)
+        fare *= ride_features.get('surge_multiplier', 1.0)
+        return fare
+    
+    def fallback_fares(self, X, bundle):
+        """fallback_fare for every row of an assembled feature matrix"""
+        base = 40
+        per_km = 12
+        assembler = bundle.assembler
+        fares = base + (assembler.column(X, 'distance_km') * per_km)
+        fares *= assembler.column(X, 'surge_multiplier')
+        return fares.tolist()
+    
     def predict_fare(self, ride_features):
         """Predict fare using trained model"""
-        if self.fare_model is None or not self.models_loaded:
-            # Fallback calculation
-            base = 40
-            per_km = 12
-            fare = base + (ride_features['distance_km'] * per_km)
-            fare *= ride_features.get('surge_multiplier', 1.0)
-            return fare
+        bundle = self.bundle
+        if bundle.fare_evaluator is None or not self.models_loaded:
+            return self.fallback_fare(ride_features)
+        return self.predict_fares(bundle.assembler.from_dicts([ride_features]), bundle)[0]
+    
+    async def predict_fare_async(self, row, bundle=None):
+        """Predict fare for one assembled row from the quote cache, or batched
+        with concurrent requests"""
+        bundle = bundle or self.bundle
+        key = self.quote_cache.key(
+            bundle.assembler.row_keys(row)[0], datetime.now().hour, bundle.version
+        )
+        fare = self.quote_cache.get(key)
+        if fare is None:
+            fare = await self.scheduler.submit(row, bundle)
+            self.quote_cache.put(key, fare)
+        return fare
+    
+    def features_matrix(self, rows, bundle=None):
+        """Feature matrix from feature dicts, missing columns default to 0"""
+        bundle = bundle or self.bundle
+        return bundle.assembler.from_dicts(rows)
+    
+    def predict_fares(self, X, bundle=None):
+        """Predict fares for an assembled feature matrix with a single flattened-forest pass"""
+        bundle = bundle or self.bundle
+        if bundle.fare_evaluator is None or not self.models_loaded:
+            return self.fallback_fares(X, bundle)
         
         try:
-            # Prepare features in correct order
-            features_dict = {}
-            for col in self.fare_features:
-                if col in ride_features:
-                    features_dict[col] = ride_features[col]
-                else:
-                    features_dict[col] = 0  # Default value
-            
-            features_array = np.array([[features_dict[col] for col in self.fare_features]])
-            features_scaled = self.fare_scaler.transform(features_array)
-            
-            predicted_fare = self.fare_model.predict(features_scaled)[0]
-            return max(40, predicted_fare)  # Minimum fare ₹40
+            predicted_fares = bundle.fare_evaluator.predict(bundle.assembler.model_input(X))
+            return np.maximum(40, predicted_fares).tolist()  # Minimum fare ₹40
             
         except Exception as e:
             print(f"Error in fare prediction: {e}")
-            # Fallback
-            base = 40
-            per_km = 12
-            fare = base + (ride_features['distance_km'] * per_km)
-            fare *= ride_features.get('surge_multiplier', 1.0)
-            return fare
-        
-    ## Find the nearest driver for our ride 
+            return self.fallback_fares(X, bundle)
     
-    def find_nearest_driver(self, pickup_lat, pickup_lon, available_drivers):
-        """Find nearest driver - FIXED VERSION"""
-        if not available_drivers:
-            return None, float('inf')
+    async def predict_fares_async(self, X, bundle=None):
+        """Batch prediction, running the model only for quote cache misses"""
+        bundle = bundle or self.bundle
+        hour = datetime.now().hour
+        keys = [
+            self.quote_cache.key(row_key, hour, bundle.version)
+            for row_key in bundle.assembler.row_keys(X)
+        ]
+        fares = [self.quote_cache.get(key) for key in keys]
         
-        min_dist = float('inf')
-        best_driver = None
+        misses = [i for i, fare in enumerate(fares) if fare is None]
+        if misses:
+            predicted = await self.infer_fares_async(X[misses], bundle)
+            for i, fare in zip(misses, predicted):
+                fares[i] = fare
+                self.quote_cache.put(keys[i], fare)
+        return fares
+    
+    async def infer_scheduled_rows(self, rows, bundle):
+        """Scheduler callback: stack the queued rows and predict them together"""
+        return await self.infer_fares_async(np.vstack(rows), bundle)
+    
+    async def infer_fares_async(self, X, bundle=None):
+        """Uncached batch prediction with the forest pass dispatched to the executor"""
+        bundle = bundle or self.bundle
+        if bundle.fare_evaluator is None or not self.models_loaded:
+            return self.fallback_fares(X, bundle)
         
-        for driver in available_drivers:
-            dist = geodesic(
-                (pickup_lat, pickup_lon),
-                (driver.current_location.latitude, driver.current_location.longitude)
-            ).km
-            
-            # Consider both distance and battery
-            
-            score = dist + ((100 - driver.ev_battery) / 10)
+        try:
+            predicted_fares = await self.executor.predict(
+                bundle.fare_evaluator, bundle.assembler.model_input(X), bundle.version
+            )
+            return np.maximum(40, predicted_fares).tolist()  # Minimum fare ₹40
             
-            if score < min_dist:
-                min_dist = dist
-                best_driver = driver
+        except Exception as e:
+            print(f"Error in fare prediction: {e}")
+            return self.fallback_fares(X, bundle)
         
-        return best_driver, min_dist
+    ## Find the nearest driver for our ride 
+    
+    def driver_scorer(self, pickup_lat, pickup_lon, fleet):
+        """Score function over driver ids for one pickup, lower is better
+
+        Never less than the driver's distance in km, as the spatial index
+        requires. Drivers already claimed score as unavailable.
+        """
+
+        def score(driver_ids):
+            rows = fleet.rows_of(driver_ids)
+            battery = fleet.battery[rows]
+            dist = distance_engine.haversine_km(
+                pickup_lat, pickup_lon, fleet.lat[rows], fleet.lon[rows]
+            )
+            # Consider both distance and battery
+            return np.where((battery > 20) & fleet.available[rows],
+                            dist + ((100 - battery) / 10), np.inf)
+
+        return score
+
+    def pickup_distance(self, pickup_lat, pickup_lon, fleet, driver_id):
+        """(row, exact geodesic km) for a claimed driver"""
+        row = fleet.row_of(driver_id)
+        return row, distance_engine.geodesic_km(
+            pickup_lat, pickup_lon, fleet.lat[row], fleet.lon[row]
+        )
+
+    def claim_nearest_driver(self, pickup_lat, pickup_lon, driver_index, fleet, reservations,
+                             vehicle_type=None, attempts=MATCH_ATTEMPTS):
+        """Find and claim the nearest driver, scoring only drivers in nearby grid cells
+
+        Safe to run on several threads at once: the winner is claimed with
+        an atomic compare-and-set, and a request that loses the race falls
+        through to the next-best driver.
+        """
+        score = self.driver_scorer(pickup_lat, pickup_lon, fleet)
+        for _ in range(attempts):
+            _, best_id = driver_index.best(pickup_lat, pickup_lon, score, vehicle_type)
+            if best_id is None or reservations.claim(best_id):
+                break
+        else:
+            best_id = None
+        if best_id is None:
+            return None, float('inf')
+        return self.pickup_distance(pickup_lat, pickup_lon, fleet, best_id)
+
+    def assign_window(self, pickups, driver_index, fleet, reservations, k=DISPATCH_CANDIDATES):
+        """Assign and claim drivers for a window of (lat, lon, vehicle_type) pickups at once
+
+        Each rider's k best-scoring drivers form a sparse cost graph that is
+        solved as one assignment problem, so a rider is not stranded because
+        an earlier request took the only driver near them. A rider left
+        unassigned, or whose driver was claimed elsewhere meanwhile, falls
+        back to claim_nearest_driver. Returns what claim_nearest_driver
+        would, per pickup.
+        """
+        candidates = [
+            driver_index.nearest(lat, lon, k, self.driver_scorer(lat, lon, fleet), vehicle_type)
+            for lat, lon, vehicle_type in pickups
+        ]
+        results = []
+        for (lat, lon, vehicle_type), driver_id in zip(pickups, assign(candidates)):
+            if driver_id is not None and reservations.claim(driver_id):
+                results.append(self.pickup_distance(lat, lon, fleet, driver_id))
+            else:
+                results.append(self.claim_nearest_driver(
+                    lat, lon, driver_index, fleet, reservations, vehicle_type
+                ))
+        return results
 
 # Initialize model manager
 
@@ -254,8 +505,19 @@ model_manager = EnhancedModelManager()
 
 # In-Memory Storage   
 
-rides_db = {}
-drivers_db = {}
+# Indexed by user, driver and status; keeps /admin/stats aggregates. With
+# EVRIDE_RIDE_STORE=log every change is group-committed to an append-only
+# log under EVRIDE_RIDE_LOG_DIR and replayed here on startup. The log takes
+# one writer process per directory; a second one raises at import.
+rides_db = open_ride_repository(
+    os.environ.get("EVRIDE_RIDE_STORE", "memory"),
+    os.environ.get("EVRIDE_RIDE_LOG_DIR", "data/rides"),
+    int(os.environ.get("EVRIDE_RIDE_SNAPSHOT_EVERY", "10000"))
+)
+fleet = FleetStore()
+
+# Completed rides as fare-model training rows, for incremental retraining
+training_store = TrainingStore(TRAINING_STORE_DIR)
 
 # Sample drivers with enhanced data
 
@@ -273,23 +535,115 @@ sample_drivers = [
 ]
 
 for d in sample_drivers:
-    drivers_db[d["driver_id"]] = Driver(
-        driver_id=d["driver_id"],
+    fleet.upsert(
+        d["driver_id"],
         name=d["name"],
-        current_location=Location(latitude=d["location"][0], longitude=d["location"][1]),
-        available=d["available"],
-        ev_battery=d["battery"],
+        lat=d["location"][0],
+        lon=d["location"][1],
+        battery=d["battery"],
         vehicle_type=d["vehicle"],
-        driver_rating=d["rating"]
+        rating=d["rating"],
+        available=d["available"]
+    )
+
+# Spatial index over available drivers
+
+driver_index = DriverSpatialIndex()
+location_hub = LocationHub(LOCATION_MIN_MOVE_M, WS_SEND_TIMEOUT)
+driver_reservations = DriverReservations(fleet, RESERVATION_STRIPES)
+
+def index_driver(driver_id: str):
+    """Sync a driver's position and availability into the spatial index"""
+    row = fleet.row_of(driver_id)
+    driver_reservations.place(driver_id, driver_index.cell_of(fleet.lat[row], fleet.lon[row]))
+    driver_index.update(
+        driver_id,
+        fleet.lat[row],
+        fleet.lon[row],
+        fleet.vehicle_type_of(row),
+        fleet.available[row]
+    )
+
+async def dispatch_window_batch(pickups, context=None):
+    """Scheduler callback: assign one dispatch window off the event loop"""
+    return await model_manager.executor.run(
+        model_manager.assign_window, pickups, driver_index, fleet, driver_reservations
     )
 
+dispatch_window = MicroBatchScheduler(
+    dispatch_window_batch,
+    window_ms=DISPATCH_WINDOW_MS,
+    max_batch=DISPATCH_MAX_BATCH
+)
+
+def release_driver(driver_id: str):
+    """Free a claimed driver and put it back in the spatial index"""
+    driver_reservations.release(driver_id)
+    index_driver(driver_id)
+
+def move_driver(driver_id: str, lat: float, lon: float):
+    """Record a new driver position, re-index it and publish it to watchers"""
+    fleet.move(driver_id, lat, lon)
+    index_driver(driver_id)
+    location_hub.publish(driver_id, lat, lon)
+
+def ingest_telemetry(records) -> dict:
+    """Apply a telemetry batch to the fleet in one pass
+
+    Out-of-order reports are dropped by timestamp. Only drivers whose grid
+    cell changed touch the spatial index and reservation stripes, and only
+    watched drivers are offered to the location hub.
+    """
+    nan = float("nan")
+    applied = fleet.apply_telemetry(
+        [r.driver_id for r in records],
+        [r.lat for r in records],
+        [r.lon for r in records],
+        [nan if r.battery is None else r.battery for r in records],
+        [r.ts for r in records]
+    )
+    rows = applied.rows
+    old_row, old_col = driver_index.cells_of(applied.old_lat, applied.old_lon)
+    new_row, new_col = driver_index.cells_of(fleet.lat[rows], fleet.lon[rows])
+    changed = rows[(old_row != new_row) | (old_col != new_col)]
+    for row in changed.tolist():
+        index_driver(fleet.driver_ids[row])
+    if location_hub.subscribers:
+        location_hub.publish_many(
+            [fleet.driver_ids[row] for row in rows.tolist()],
+            fleet.lat[rows].tolist(),
+            fleet.lon[rows].tolist()
+        )
+    return {
+        "received": len(records),
+        "applied": len(rows),
+        "stale": applied.stale,
+        "unknown": applied.unknown,
+        "invalid": applied.invalid,
+        "cell_changes": len(changed)
+    }
+
+def driver_model(row) -> Driver:
+    """Materialize a fleet row as a Driver response model"""
+    return Driver(**fleet.record(row))
+
+for driver_id in fleet.rows:
+    index_driver(driver_id)
+
+# Drivers still on a recovered ride stay busy
+for driver_id in list(rides_db.active_by_driver):
+    if driver_id in fleet and driver_reservations.claim(driver_id):
+        index_driver(driver_id)
+
+startup_timer.lap("app_setup")
+
 # Helper Functions 
 def calculate_distance(loc1: Location, loc2: Location) -> float:
-    """Calculate distance between two locations"""
-    return geodesic(
-        (loc1.latitude, loc1.longitude), 
-        (loc2.latitude, loc2.longitude)
-    ).km
+    """Calculate exact distance between two locations"""
+    return distance_engine.geodesic_km(
+        loc1.latitude, loc1.longitude,
+        loc2.latitude, loc2.longitude
+    )
 
 def estimate_duration(distance_km: float, traffic_level: str) -> float:
     """Estimate trip duration in minutes"""
@@ -320,26 +674,202 @@ def is_holiday() -> bool:
     # In production, use holiday calendar API
     return False
 
+# Defaults for quotes priced before a driver is assigned
+DEFAULT_BATTERY_HEALTH = 85.0
+DEFAULT_DRIVER_RATING = 4.5
+
+def pricing_context(now: datetime) -> dict:
+    """Traffic, demand and surge shared by every ride priced at `now`"""
+    current_hour = now.hour
+    current_day = now.weekday()
+    is_holiday_today = is_holiday()
+    
+    # Calculate traffic and demand
+    traffic_level = model_manager.get_traffic_level(current_hour, current_day)
+    demand_factor = model_manager.calculate_demand_factor(
+        current_hour, current_day, is_holiday_today
+    )
+    surge_multiplier = model_manager.calculate_surge_multiplier(
+        demand_factor, traffic_level
+    )
+    return {
+        "day_of_week": current_day,
+        "is_holiday": is_holiday_today,
+        "traffic_level": traffic_level,
+        "demand_factor": demand_factor,
+        "surge_multiplier": surge_multiplier
+    }
+
 # Startup Event
 
 @app.on_event("startup")
 async def startup_event():
-    """Load models on startup"""
+    """Start the executor and load models in the background
+
+    uvicorn binds the socket once this returns, so /healthz answers while
+    the model is still loading; /readyz flips to 200 when it is warm.
+    """
     print("\n" + "="*60)
     print("Starting EV Ride Booking Platform...")
     print("="*60)
-    model_manager.load_models()
-    print("Server ready!")
+    with startup_timer.phase("executor_start"):
+        model_manager.executor.start()
+    print(f"Inference executor: {model_manager.executor.mode} ({model_manager.executor.workers} workers)")
+    asyncio.get_running_loop().create_task(warm_up_models())
+    print("Accepting connections, loading models in the background")
     print("="*60 + "\n")
 
+async def warm_up_models():
+    """Initial model load and canary warm-up; marks the server ready"""
+    try:
+        await reload_models(startup_timer)
+    except Exception as e:
+        print(f"Error loading models: {e}")
+        return
+    startup_timer.mark_ready()
+    print(f"Server ready! Model version: {model_manager.bundle.version}")
+    startup_timer.report()
+    if MODEL_WATCH_INTERVAL > 0:
+        asyncio.get_running_loop().create_task(watch_model_files(MODEL_WATCH_INTERVAL))
+    if RETRAIN_INTERVAL > 0:
+        asyncio.get_running_loop().create_task(retrain_periodically(RETRAIN_INTERVAL))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop executor pools, close the ride store and write out buffered training rows"""
+    model_manager.executor.shutdown()
+    await rides_db.close()
+    training_store.flush()
+
+# Model hot reload
+
+# Canary trip lengths priced by every new bundle before it is published
+CANARY_DISTANCES_KM = (2.0, 8.0, 20.0, 45.0)
+
+model_reload_lock = asyncio.Lock()
+
+def canary_matrix(bundle: ModelBundle):
+    """Feature matrix for a few typical trips, encoded with `bundle`"""
+    context = pricing_context(datetime.now())
+    origin = Location(latitude=28.6139, longitude=77.2090)
+    requests = [QuoteRequest(pickup=origin, dropoff=origin)] * len(CANARY_DISTANCES_KM)
+    durations = [estimate_duration(d, context["traffic_level"]) for d in CANARY_DISTANCES_KM]
+    return bundle.assembler.batch(
+        requests, context, CANARY_DISTANCES_KM, durations,
+        DEFAULT_BATTERY_HEALTH, DEFAULT_DRIVER_RATING, model_manager.get_time_of_day()
+    )
+
+async def reload_models(timer: Optional[StartupTimer] = None):
+    """Load, warm and validate a new bundle off the event loop, then swap it in
+
+    Files whose fingerprint matches the serving bundle are not read at all.
+    Returns (bundle, swapped). Raises if the new files fail to load or the
+    canary batch is rejected; the current bundle keeps serving either way.
+    """
+    timer = timer or StartupTimer()
+    async with model_reload_lock:
+        current = model_manager.bundle
+        if model_manager.artifact_version() == current.version:
+            return current, False
+        with timer.phase("model_load"):
+            bundle = await model_manager.executor.run(model_manager.load_bundle)
+        if bundle.version == current.version:
+            return current, False
+        if bundle.fare_evaluator is not None:
+            with timer.phase("model_warm"):
+                await model_manager.executor.run(validate_bundle, bundle, canary_matrix(bundle))
+        model_manager.swap_bundle(bundle)
+        print(f"Model reloaded: {current.version} -> {bundle.version}")
+        return bundle, True
+
+async def watch_model_files(interval: float):
+    """Reload when the model files change; a rejected version is not retried"""
+    rejected = None
+    while True:
+        await asyncio.sleep(interval)
+        version = model_manager.artifact_version()
+        if version in (model_manager.bundle.version, rejected):
+            continue
+        try:
+            await reload_models()
+        except Exception as e:
+            rejected = version
+            print(f"Model reload rejected: {e}")
+
+# Incremental retraining
+
+retrain_lock = asyncio.Lock()
+
+async def retrain_models(min_rows: int = RETRAIN_MIN_ROWS):
+    """Grow the fare forest on rides completed since the last run, then publish it
+
+    Training runs on the default thread pool, away from inference, and only
+    on the new rows. A candidate that beats the current forest on the held
+    out rows is loaded from its own files and canaried; only then does it
+    replace the served files and mark its rows trained. Returns (report,
+    bundle); report is None when fewer than min_rows rows were waiting.
+    """
+    async with retrain_lock:
+        loop = asyncio.get_running_loop()
+        report = await loop.run_in_executor(
+            None, retrain, training_store, FARE_MODEL_PATH,
+            RETRAIN_NEW_TREES, RETRAIN_MAX_TREES, min_rows, RETRAIN_HOLDOUT
+        )
+        if report is None or not report["accepted"]:
+            return report, model_manager.bundle
+        candidate = report["candidate"]
+        async with model_reload_lock:
+            try:
+                bundle = await model_manager.executor.run(
+                    load_model_bundle, candidate, bundle_path(candidate), LABEL_ENCODERS_PATH
+                )
+                await model_manager.executor.run(validate_bundle, bundle, canary_matrix(bundle))
+                await model_manager.executor.run(promote, candidate, FARE_MODEL_PATH)
+            except Exception:
+                await model_manager.executor.run(discard, candidate)
+                raise
+            current = model_manager.bundle
+            bundle = bundle._replace(version=model_manager.artifact_version())
+            model_manager.swap_bundle(bundle)
+            print(f"Model reloaded: {current.version} -> {bundle.version}")
+        training_store.mark_trained(report["through_segment"])
+        return report, bundle
+
+async def retrain_periodically(interval: float):
+    """Background retraining job; a failed run leaves the current model serving"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await retrain_models()
+        except Exception as e:
+            print(f"Incremental retrain failed: {e}")
+
 #  API Endpoints
 
+@app.get("/healthz")
+def healthz():
+    """Liveness: the process is up and serving HTTP"""
+    return {"status": "alive"}
+
+@app.get("/readyz")
+def readyz():
+    """Readiness: models are loaded and warmed"""
+    startup = startup_timer.summary()
+    if not startup_timer.ready:
+        return JSONResponse(status_code=503, content={"status": "loading", "startup": startup})
+    return {
+        "status": "ready",
+        "model_version": model_manager.bundle.version,
+        "startup": startup
+    }
+
 @app.get("/")
 def root():
     return {
         "message": "EV Ride Booking Platform - Production API v2.0",
         "status": "online",
         "models_loaded": model_manager.models_loaded,
+        "model_version": model_manager.bundle.version,
         "features": [
             "ML-powered fare prediction",
             "Smart driver matching",
@@ -348,125 +878,168 @@ def root():
         ],
         "endpoints": {
             "request_ride": "POST /ride/request",
+            "quote_batch": "POST /ride/quote/batch",
             "accept_ride": "POST /ride/accept",
             "complete_ride": "POST /ride/complete/{ride_id}",
             "get_ride": "GET /ride/{ride_id}",
+            "list_rides": "GET /rides",
             "available_drivers": "GET /drivers/available",
-            "model_stats": "GET /admin/stats"
+            "driver_active_ride": "GET /drivers/{driver_id}/active_ride",
+            "update_driver_location": "POST /drivers/{driver_id}/location",
+            "driver_telemetry": "POST /drivers/telemetry/bulk",
+            "driver_telemetry_stream": "WS /ws/drivers/telemetry",
+            "driver_location_stream": "WS /ws/driver/{driver_id}",
+            "model_stats": "GET /admin/stats",
+            "health": "GET /healthz",
+            "ready": "GET /readyz",
+            "reload_models": "POST /admin/models/reload"
         }
     }
 
 @app.post("/ride/request", response_model=RideResponse)
 async def request_ride(ride_request: RideRequest):
     """Request a ride with ML-powered pricing"""
+    # Price the whole request with one model version, even across a reload
+    bundle = model_manager.bundle
     
-    # Get available drivers
-    available_drivers = [d for d in drivers_db.values() 
-                        if d.available and d.ev_battery > 20]
-    
-    if not available_drivers:
+    if len(driver_index) == 0:
         raise HTTPException(status_code=404, detail="No available drivers found")
     
-    # Find nearest driver
-    selected_driver, driver_distance = model_manager.find_nearest_driver(
-        ride_request.pickup.latitude,
-        ride_request.pickup.longitude,
-        available_drivers
-    )
+    # Find and claim a driver off the event loop, either right away or
+    # with the rest of this dispatch window; claims are atomic, so
+    # concurrent requests never share a driver
+    if DISPATCH_MODE == "batch":
+        driver_row, driver_distance = await dispatch_window.submit(
+            (ride_request.pickup.latitude, ride_request.pickup.longitude, None)
+        )
+    else:
+        driver_row, driver_distance = await model_manager.executor.run(
+            model_manager.claim_nearest_driver,
+            ride_request.pickup.latitude,
+            ride_request.pickup.longitude,
+            driver_index,
+            fleet,
+            driver_reservations
+        )
     
-    if selected_driver is None:
+    if driver_row is None:
         raise HTTPException(status_code=404, detail="Could not match driver")
     
-    # Calculate trip details
-    trip_distance = calculate_distance(ride_request.pickup, ride_request.dropoff)
+    driver_id = fleet.driver_ids[driver_row]
+    # Driver is already marked busy; drop it from the index
+    index_driver(driver_id)
+    added = False
+    try:
+        selected_driver = driver_model(driver_row)
     
-    # Get contextual data
-    now = datetime.now()
-    current_hour = now.hour
-    current_day = now.weekday()
-    is_holiday_today = is_holiday()
+        # Calculate trip details
+        trip_distance = calculate_distance(ride_request.pickup, ride_request.dropoff)
     
-    # Determine time of day
-    time_of_day = ride_request.time_of_day or model_manager.get_time_of_day()
+        # Get contextual data
+        now = datetime.now()
+        context = pricing_context(now)
+        traffic_level = context["traffic_level"]
+        demand_factor = context["demand_factor"]
+        surge_multiplier = context["surge_multiplier"]
     
-    # Calculate traffic and demand
-    traffic_level = model_manager.get_traffic_level(current_hour, current_day)
-    demand_factor = model_manager.calculate_demand_factor(
-        current_hour, current_day, is_holiday_today
-    )
-    surge_multiplier = model_manager.calculate_surge_multiplier(
-        demand_factor, traffic_level
-    )
+        # Estimate duration
+        trip_duration = estimate_duration(trip_distance, traffic_level)
     
-    # Estimate duration
-    trip_duration = estimate_duration(trip_distance, traffic_level)
-    
-    # Prepare features for ML prediction
-    ride_features = {
-        'distance_km': trip_distance,
-        'duration_minutes': trip_duration,
-        'demand_factor': demand_factor,
-        'battery_health_percent': selected_driver.ev_battery,
-        'energy_consumption_kwh': trip_distance * 0.25,  # Approx 0.25 kWh/km
-        'route_difficulty': 3,  # Medium difficulty (1-5 scale)
-        'day_of_week': current_day,
-        'temperature_celsius': 28,  # Default, integrate weather API
-        'humidity_percent': 65,
-        'driver_rating': selected_driver.driver_rating,
-        'surge_multiplier': surge_multiplier,
-        'historical_pricing_factor': 1.0,
-        'is_holiday': int(is_holiday_today),
-        'charging_stations_nearby': 3,  # Default
-        # Encoded features
-        'city_encoded': model_manager.encode_categorical(ride_request.city, 'city'),
-        'traffic_level_encoded': model_manager.encode_categorical(traffic_level, 'traffic_level'),
-        'vehicle_type_encoded': model_manager.encode_categorical(ride_request.vehicle_type, 'vehicle_type'),
-        'time_of_day_encoded': model_manager.encode_categorical(time_of_day, 'time_of_day'),
-        'weather_condition_encoded': model_manager.encode_categorical('clear', 'weather_condition'),
-        'user_type_encoded': model_manager.encode_categorical(ride_request.user_type, 'user_type'),
-    }
+        # Prepare features for ML prediction, straight into the model's column order
+        features = bundle.assembler.single(
+            ride_request, context, trip_distance, trip_duration,
+            selected_driver.ev_battery, selected_driver.driver_rating,
+            model_manager.get_time_of_day()
+        )
     
-    # Predict fare using ML model
-    estimated_fare = model_manager.predict_fare(ride_features)
-    base_fare = estimated_fare / surge_multiplier
+        # Predict fare using ML model
+        estimated_fare = await model_manager.predict_fare_async(features[0], bundle)
+        base_fare = estimated_fare / surge_multiplier
     
-    # Optimize route
-    optimized_route = optimize_route(ride_request.pickup, ride_request.dropoff)
+        # Optimize route
+        optimized_route = optimize_route(ride_request.pickup, ride_request.dropoff)
     
-    # Create ride
-    ride_id = f"RIDE_{len(rides_db) + 1}_{now.strftime('%Y%m%d%H%M%S')}"
-    ride_data = {
-        "ride_id": ride_id,
-        "user_id": ride_request.user_id,
-        "driver_id": selected_driver.driver_id,
-        "pickup": ride_request.pickup,
-        "dropoff": ride_request.dropoff,
-        "fare": estimated_fare,
-        "base_fare": base_fare,
-        "surge_multiplier": surge_multiplier,
-        "distance": trip_distance,
-        "duration": trip_duration,
-        "demand_factor": demand_factor,
-        "traffic_level": traffic_level,
-        "status": "pending",
-        "created_at": now.isoformat()
-    }
-    rides_db[ride_id] = ride_data
-    
-    # Mark driver as busy
-    drivers_db[selected_driver.driver_id].available = False
-    
-    return RideResponse(
-        ride_id=ride_id,
-        driver=selected_driver,
-        estimated_fare=round(estimated_fare, 2),
-        base_fare=round(base_fare, 2),
-        surge_multiplier=surge_multiplier,
-        estimated_distance=round(trip_distance, 2),
-        estimated_time=round(trip_duration, 2),
-        demand_factor=demand_factor,
-        optimized_route=optimized_route
+        # Create ride
+        ride_id = f"RIDE_{len(rides_db) + 1}_{now.strftime('%Y%m%d%H%M%S')}"
+        ride_data = {
+            "ride_id": ride_id,
+            "user_id": ride_request.user_id,
+            "driver_id": selected_driver.driver_id,
+            "pickup": ride_request.pickup,
+            "dropoff": ride_request.dropoff,
+            "fare": estimated_fare,
+            "base_fare": base_fare,
+            "surge_multiplier": surge_multiplier,
+            "distance": trip_distance,
+            "duration": trip_duration,
+            "demand_factor": demand_factor,
+            "traffic_level": traffic_level,
+            "status": "pending",
+            "created_at": now.isoformat()
+        }
+        rides_db.add(ride_data)
+        added = True
+        training_store.price(ride_id, bundle.assembler.model_input(features)[0].tolist())
+        await rides_db.flush()
+    
+        return RideResponse(
+            ride_id=ride_id,
+            driver=selected_driver,
+            estimated_fare=round(estimated_fare, 2),
+            base_fare=round(base_fare, 2),
+            surge_multiplier=surge_multiplier,
+            estimated_distance=round(trip_distance, 2),
+            estimated_time=round(trip_duration, 2),
+            demand_factor=demand_factor,
+            optimized_route=optimized_route
+        )
+    except BaseException:
+        # Pricing or logging failed, or the client went away: give the driver back
+        if added:
+            rides_db.transition(ride_id, "cancelled")
+            training_store.discard(ride_id)
+        release_driver(driver_id)
+        raise
+
+
+
+def build_quote_rows(quotes: List[QuoteRequest], context: dict, bundle: ModelBundle):
+    """Trip (distance, duration) pairs and the feature matrix for a quote batch"""
+    trips = []
+    for quote in quotes:
+        trip_distance = calculate_distance(quote.pickup, quote.dropoff)
+        trip_duration = estimate_duration(trip_distance, context["traffic_level"])
+        trips.append((trip_distance, trip_duration))
+    distances, durations = zip(*trips) if trips else ((), ())
+    X = bundle.assembler.batch(
+        quotes, context, distances, durations,
+        DEFAULT_BATTERY_HEALTH, DEFAULT_DRIVER_RATING, model_manager.get_time_of_day()
     )
+    return trips, X
+
+@app.post("/ride/quote/batch", response_model=BatchQuoteResponse)
+async def quote_batch(batch: BatchQuoteRequest):
+    """Price many trips with one model pass, without reserving drivers"""
+    bundle = model_manager.bundle
+    context = pricing_context(datetime.now())
+    surge_multiplier = context["surge_multiplier"]
+    
+    # Distances and feature rows are CPU work too; keep them off the event loop
+    trips, X = await model_manager.executor.run(build_quote_rows, batch.quotes, context, bundle)
+    fares = await model_manager.predict_fares_async(X, bundle) if trips else []
+    
+    quotes = [
+        FareQuote(
+            estimated_fare=round(fare, 2),
+            base_fare=round(fare / surge_multiplier, 2),
+            surge_multiplier=surge_multiplier,
+            estimated_distance=round(trip_distance, 2),
+            estimated_time=round(trip_duration, 2),
+            demand_factor=context["demand_factor"]
+        )
+        for fare, (trip_distance, trip_duration) in zip(fares, trips)
+    ]
+    return BatchQuoteResponse(count=len(quotes), quotes=quotes)
 
 
 
@@ -480,8 +1053,11 @@ async def accept_ride(ride_id: str, driver_id: str):
     if ride["driver_id"] != driver_id:
         raise HTTPException(status_code=403, detail="Not assigned to this ride")
     
-    ride["status"] = "accepted"
-    ride["accepted_at"] = datetime.now().isoformat()
+    try:
+        rides_db.transition(ride_id, "accepted", accepted_at=datetime.now().isoformat())
+    except InvalidTransition as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    await rides_db.flush()
     
     return {
         "message": "Ride accepted successfully",
@@ -492,17 +1068,28 @@ async def accept_ride(ride_id: str, driver_id: str):
 
 
 @app.post("/ride/complete/{ride_id}")
-async def complete_ride(ride_id: str):
-    """Complete ride"""
+async def complete_ride(ride_id: str, final_fare: Optional[float] = None):
+    """Complete ride
+
+    final_fare is what the rider was actually charged. Only rides completed
+    with one become training rows for incremental retraining; the quote is
+    the model's own output and is never used as a label.
+    """
     if ride_id not in rides_db:
         raise HTTPException(status_code=404, detail="Ride not found")
     
-    ride = rides_db[ride_id]
-    ride["status"] = "completed"
-    ride["completed_at"] = datetime.now().isoformat()
+    fields = {"completed_at": datetime.now().isoformat()}
+    if final_fare is not None:
+        fields["final_fare"] = final_fare
+    try:
+        ride = rides_db.transition(ride_id, "completed", **fields)
+    except InvalidTransition as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    await rides_db.flush()
+    training_store.add(ride)
     
     # Make driver available
-    drivers_db[ride["driver_id"]].available = True
+    release_driver(ride["driver_id"])
     
     return {
         "message": "Ride completed successfully",
@@ -521,11 +1108,58 @@ async def get_ride(ride_id: str):
     return rides_db[ride_id]
 
 
+@app.get("/rides")
+async def list_rides(user_id: Optional[str] = None,
+                     driver_id: Optional[str] = None,
+                     status: Optional[str] = None,
+                     cursor: Optional[int] = None,
+                     limit: int = Query(20, ge=1, le=100)):
+    """Rides matching the filters, newest first; pass next_cursor to get the next page"""
+    rides, next_cursor = rides_db.query(
+        user_id=user_id, driver_id=driver_id, status=status, cursor=cursor, limit=limit
+    )
+    return {
+        "count": len(rides),
+        "rides": rides,
+        "next_cursor": next_cursor
+    }
+
+@app.get("/drivers/{driver_id}/active_ride")
+async def get_driver_active_ride(driver_id: str):
+    """The driver's pending or accepted ride"""
+    if fleet.row_of(driver_id) is None:
+        raise HTTPException(status_code=404, detail="Driver not found")
+    ride = rides_db.active_ride(driver_id)
+    if ride is None:
+        raise HTTPException(status_code=404, detail="No active ride for this driver")
+    return ride
+
+@app.post("/drivers/telemetry/bulk", response_model=TelemetryResult)
+async def bulk_driver_telemetry(batch: TelemetryBatch):
+    """Batched driver position and battery reports"""
+    return ingest_telemetry(batch.records)
+
+@app.post("/drivers/{driver_id}/location")
+async def update_driver_location(driver_id: str, location: Location):
+    """Move a driver; websocket watchers get it only if it moved far enough"""
+    if fleet.row_of(driver_id) is None:
+        raise HTTPException(status_code=404, detail="Driver not found")
+    move_driver(driver_id, location.latitude, location.longitude)
+    return {"driver_id": driver_id, "location": location}
+
+
 
 @app.get("/drivers/available")
-async def get_available_drivers():
-    """Get all available drivers"""
-    available = [d for d in drivers_db.values() if d.available]
+async def get_available_drivers(latitude: Optional[float] = None,
+                                longitude: Optional[float] = None,
+                                radius_km: Optional[float] = None):
+    """Get available drivers, optionally within radius_km of a point"""
+    rows = fleet.select(available=True)
+    if len(rows) and latitude is not None and longitude is not None and radius_km is not None:
+        rows = rows[distance_engine.within_radius(
+            latitude, longitude, fleet.lat[rows], fleet.lon[rows], radius_km
+        )]
+    available = [driver_model(row) for row in rows]
     return {
         "count": len(available),
         "drivers": available
@@ -533,25 +1167,73 @@ async def get_available_drivers():
 
 @app.get("/admin/stats")
 async def get_stats():
-    """Get system statistics"""
-    total_rides = len(rides_db)
-    completed_rides = len([r for r in rides_db.values() if r["status"] == "completed"])
-    
-    if completed_rides > 0:
-        avg_fare = sum(r["fare"] for r in rides_db.values() if r["status"] == "completed") / completed_rides
-        avg_distance = sum(r["distance"] for r in rides_db.values() if r["status"] == "completed") / completed_rides
-    else:
-        avg_fare = 0
-        avg_distance = 0
-    
+    """Get system statistics, from running aggregates rather than a scan of rides_db"""
+    bundle = model_manager.bundle
+    rides = rides_db.stats.snapshot()
     return {
         "models_loaded": model_manager.models_loaded,
-        "total_rides": total_rides,
-        "completed_rides": completed_rides,
-        "pending_rides": total_rides - completed_rides,
-        "available_drivers": len([d for d in drivers_db.values() if d.available]),
-        "average_fare": round(avg_fare, 2),
-        "average_distance": round(avg_distance, 2)
+        "model": {
+            "version": bundle.version,
+            "training_date": bundle.training_date,
+            "loaded_at": bundle.loaded_at
+        },
+        "startup": startup_timer.summary(),
+        "total_rides": rides["total_rides"],
+        "completed_rides": rides["completed_rides"],
+        "pending_rides": rides["pending_rides"],
+        "rides_by_status": rides["rides_by_status"],
+        "ride_store": rides_db.store_stats(),
+        "available_drivers": len(driver_index),
+        "available_drivers_by_vehicle_type": driver_index.counts(),
+        "average_fare": rides["average_fare"],
+        "average_distance": rides["average_distance"],
+        "inference": model_manager.scheduler.metrics.snapshot(),
+        "quote_cache": model_manager.quote_cache.stats(),
+        "location_updates": location_hub.stats(),
+        "driver_reservations": driver_reservations.stats(),
+        "dispatch": {
+            "mode": DISPATCH_MODE,
+            "window_ms": DISPATCH_WINDOW_MS,
+            "windows": dispatch_window.metrics.snapshot()
+        },
+        "categorical_encoding": bundle.encoders.stats(),
+        "training_store": training_store.stats()
+    }
+
+@app.post("/admin/models/reload")
+async def reload_model_endpoint():
+    """Load the model files on disk and swap them in without dropping requests"""
+    previous = model_manager.bundle.version
+    try:
+        bundle, swapped = await reload_models()
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Model reload rejected: {e}")
+    return {
+        "reloaded": swapped,
+        "previous_version": previous,
+        "model_version": bundle.version,
+        "training_date": bundle.training_date,
+        "loaded_at": bundle.loaded_at
+    }
+
+@app.post("/admin/models/retrain")
+async def retrain_model_endpoint(force: bool = False):
+    """Grow the fare forest on newly completed rides and publish the new version
+
+    force runs even with fewer than EVRIDE_RETRAIN_MIN_ROWS rows waiting.
+    A forest rejected on the holdout rows is reported and not published.
+    """
+    previous = model_manager.bundle.version
+    try:
+        report, bundle = await retrain_models(1 if force else RETRAIN_MIN_ROWS)
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Incremental retrain failed: {e}")
+    return {
+        "retrained": report is not None and report["accepted"],
+        "report": report,
+        "previous_version": previous,
+        "model_version": bundle.version,
+        "training_store": training_store.stats()
     }
 
 # uvicorn main_enhanced:app --reload --port 8000
\ No newline at end of file
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from categorical_encoding import CompiledEncoders
+from feature_assembly import FeatureAssembler
+from forest_evaluator import FlatForest
+
+
+class ModelBundle(NamedTuple):
+    """Immutable set of artifacts that prices a ride
+
+    Requests capture one bundle reference and use it from feature encoding
+    through prediction, so a reload swapping in a new bundle never mixes
+    encoders from one model with trees from another.
+    """
+    version: str
+    fare_evaluator: Optional[FlatForest]
+    fare_features: Optional[list]
+    encoders: CompiledEncoders
+    assembler: FeatureAssembler
+    training_date: Optional[str]
+    loaded_at: Optional[str]
+
+    @classmethod
+    def empty(cls):
+        encoders = CompiledEncoders()
+        return cls(version="none", fare_evaluator=None, fare_features=None,
+                   encoders=encoders, assembler=FeatureAssembler(None, encoders),
+                   training_date=None, loaded_at=None)
+
+
+def artifact_fingerprint(*paths):
+    """Short hash of artifact names, sizes and mtimes; changes when any file is replaced"""
+    digest = hashlib.sha1()
+    for path in paths:
+        files = [path]
+        if os.path.isdir(path):
+            files = sorted(os.path.join(path, name) for name in os.listdir(path))
+        for name in files:
+            if os.path.isfile(name):
+                stat = os.stat(name)
+                digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:12]
+
+
+def label_classes_path(encoders_path):
+    """JSON copy of the encoder classes written next to label_encoders.pkl"""
+    return os.path.splitext(encoders_path)[0] + '.json'
+
+
+def load_model_bundle(fare_model_path, fare_bundle_path, encoders_path):
+    """Build a ModelBundle from disk, preferring the memory-mapped forest bundle
+
+    With the .flat bundle and the JSON encoder classes present, nothing here
+    imports sklearn; the pickles are only read as a fallback.
+    """
+    # Deferred: pulls in sklearn when unpickling, which serving otherwise never needs
+    import joblib
+
+    classes_path = label_classes_path(encoders_path)
+    # Fingerprint first, so files replaced mid-load show up as a newer version
+    version = artifact_fingerprint(fare_bundle_path, fare_model_path, encoders_path, classes_path)
+    fare_evaluator = None
+    fare_features = None
+    training_date = None
+
+    if os.path.exists(os.path.join(fare_bundle_path, 'meta.json')):
+        fare_evaluator, meta = FlatForest.load(fare_bundle_path, mmap=True)
+        fare_features = meta['feature_columns']
+        training_date = meta.get('training_date')
+        print("Enhanced Fare model loaded (memory-mapped bundle)")
+    elif os.path.exists(fare_model_path):
+        fare_data = joblib.load(fare_model_path)
+        fare_features = fare_data['feature_columns']
+        training_date = fare_data.get('training_date')
+        # Flattened forest with the scaler folded in, used for serving
+        if 'flat_forest' in fare_data:
+            fare_evaluator = FlatForest.from_dict(fare_data['flat_forest'])
+        else:
+            fare_evaluator = FlatForest.from_sklearn(fare_data['model'], fare_data['scaler'])
+        print("Enhanced Fare model loaded")
+    else:
+        print("Fare model not found. Using default calculations.")
+
+    encoders = CompiledEncoders()
+    if os.path.exists(classes_path):
+        with open(classes_path) as f:
+            encoders = CompiledEncoders.from_classes(json.load(f))
+        print("Label encoders loaded")
+    elif os.path.exists(encoders_path):
+        encoders = CompiledEncoders(joblib.load(encoders_path))
+        print("Label encoders loaded")
+    else:
+        print("Label encoders not found.")
+
+    return ModelBundle(
+        version=version,
+        fare_evaluator=fare_evaluator,
+        fare_features=fare_features,
+        encoders=encoders,
+        assembler=FeatureAssembler(fare_features, encoders),
+        training_date=training_date,
+        loaded_at=datetime.now().isoformat()
+    )
+
+
+def validate_bundle(bundle, canary_matrix, min_fare=10.0, max_fare=10000.0):
+    """Predict a canary batch and check the fares are finite and plausible
+
+    Also warms the evaluator (and its memory-mapped pages) before the swap.
+    Raises ValueError describing the first problem found.
+    """
+    if bundle.fare_evaluator is None:
+        return
+    if bundle.fare_evaluator.n_features != len(bundle.fare_features):
+        raise ValueError(
+            f"Model expects {bundle.fare_evaluator.n_features} features, "
+            f"feature list has {len(bundle.fare_features)}"
+        )
+    fares = bundle.fare_evaluator.predict(bundle.assembler.model_input(canary_matrix))
+    if not np.all(np.isfinite(fares)):
+        raise ValueError("Canary predictions contain NaN or inf")
+    if fares.min() < min_fare or fares.max() > max_fare:
+        raise ValueError(
+            f"Canary fares out of range: {fares.min():.2f} - {fares.max():.2f}"
+        )
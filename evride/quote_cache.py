@@ -0,0 +1,64 @@
+import time
+from collections import OrderedDict
+
+
+class QuoteCache:
+    """LRU + TTL cache of predicted fares keyed on quantized feature rows
+
+    Rows are quantized by FeatureAssembler.row_keys: distance is rounded to
+    100 m and duration to whole minutes, so riders re-quoting the same
+    pickup/drop pair hit the cache. The remaining model inputs (surge,
+    demand, encoded categoricals, day of week, battery, rating) are part of
+    the key as they are, along with the hour and the model version.
+    Entries expire after ttl seconds so they never outlive a surge
+    recalculation window, and clear() is called whenever a new model is
+    loaded.
+    """
+
+    def __init__(self, maxsize=10000, ttl=300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (expires_at, fare)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def key(self, row_key, hour, version=None):
+        """Cache key for a quantized feature row (see FeatureAssembler.row_keys)"""
+        return (row_key, hour, version)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, fare):
+        self.entries[key] = (time.monotonic() + self.ttl, fare)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
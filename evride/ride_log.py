@@ -0,0 +1,316 @@
+import asyncio
+import fcntl
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from ride_repository import InvalidTransition, RideRepository, can_transition
+
+
+RIDE_STORES = ("memory", "log")
+
+
+def _jsonable(value):
+    """json.dumps fallback for pydantic models such as Location"""
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    raise TypeError(f"Cannot log {type(value).__name__}")
+
+
+def apply_event(rides, event):
+    """Apply one logged event to a ride_id -> ride dict, skipping moves transition() would refuse"""
+    if event["op"] == "add":
+        rides[event["ride"]["ride_id"]] = event["ride"]
+    else:
+        ride = rides.get(event["ride_id"])
+        if ride is None or not can_transition(ride["status"], event["status"]):
+            return  # Its add was in a batch whose write failed
+        ride["status"] = event["status"]
+        ride.update(event["fields"])
+
+
+def _fsync_dir(directory):
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class RideLog:
+    """Append-only JSON-lines event log with group commit and snapshot compaction
+
+    The directory holds snapshot.json (every ride as of some segment) and
+    numbered segments log.<n>.jsonl written after it. A single writer
+    thread appends events: whatever queued up while the previous write and
+    fsync ran goes out as one batch with one fsync, so concurrent requests
+    share the fsync cost. Once a segment holds snapshot_every events the
+    writer starts a new one, and a background thread folds the finished
+    segments into a new snapshot and deletes them.
+
+    A failed write fails only the flush() calls waiting on that batch; the
+    next batch goes to a fresh segment, past any torn line, and once it is
+    written flush() succeeds again.
+
+    There is one writer per directory: a lock file makes a second process
+    opening the same log raise RuntimeError. Several server processes (e.g.
+    uvicorn --workers) each need their own directory.
+    """
+
+    def __init__(self, directory, snapshot_every=10000, max_batch=1024):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.max_batch = max_batch
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = open(os.path.join(directory, "LOCK"), "w")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._lock_file.close()
+            raise RuntimeError(f"Ride log {directory} is in use by another process")
+
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="evride-ridelog")
+        self.segment = None
+        self.segment_no = 0
+        self.segment_events = 0
+        self.pending = []   # Encoded events not yet handed to the writer
+        self.submitted = 0  # Events appended so far
+        self.committed = 0  # Events written and fsynced
+        self.settled = 0    # Events whose batch finished writing, or failed to
+        self.waiters = []   # (event count, future) waiting for durability
+        self.flusher = None
+        self.failed = None  # Error of the latest batch, cleared by the next one written
+        self.failures = 0
+        self.torn = False   # Writer thread: the open segment may end in a partial line
+        self.batches = 0
+        self.compactions = 0
+        self._compacting = threading.Lock()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _segments(self):
+        """(number, path) of every log segment, oldest first"""
+        segments = []
+        for name in os.listdir(self.directory):
+            if name.startswith("log.") and name.endswith(".jsonl"):
+                segments.append((int(name[4:-6]), self._path(name)))
+        return sorted(segments)
+
+    def _read_snapshot(self):
+        try:
+            with open(self._path("snapshot.json")) as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return 0, []
+        return snapshot["log_seq"], snapshot["rides"]
+
+    @staticmethod
+    def _read_segment(path):
+        events = []
+        with open(path) as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    break  # Torn final write from a crash; it was never acknowledged
+        return events
+
+    def recover(self):
+        """Snapshot rides plus the events logged after them, then open a fresh segment"""
+        log_seq, rides = self._read_snapshot()
+        events = []
+        last = log_seq
+        for n, path in self._segments():
+            if n > log_seq:
+                events.extend(self._read_segment(path))
+            last = max(last, n)
+        self.segment_no = last + 1
+        self.segment = open(self._path(f"log.{self.segment_no}.jsonl"), "a")
+        _fsync_dir(self.directory)
+        return rides, events
+
+    def append(self, event):
+        """Queue an event; await flush() for it to be durable"""
+        line = json.dumps(event, default=_jsonable) + "\n"
+        self.submitted += 1
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write([line])  # No event loop: write through
+            self.committed += 1
+            self.settled += 1
+            return
+        self.pending.append(line)
+        if self.flusher is None:
+            self.flusher = loop.create_task(self._flush_pending())
+
+    async def flush(self):
+        """Wait until every event appended so far is on disk
+
+        Raises the write error if the batch holding the latest of them failed.
+        """
+        if self.settled >= self.submitted:
+            if self.failed is not None:
+                raise self.failed
+            return
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.append((self.submitted, future))
+        await future
+
+    async def _flush_pending(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while self.pending:
+                batch = self.pending[:self.max_batch]
+                del self.pending[:self.max_batch]
+                try:
+                    await loop.run_in_executor(self.writer, self._write, batch)
+                except Exception as e:
+                    self.failed = e
+                    self.failures += 1
+                else:
+                    self.failed = None
+                    self.committed += len(batch)
+                    self.batches += 1
+                self.settled += len(batch)
+                self._wake()
+        finally:
+            self.flusher = None
+
+    def _wake(self):
+        """Settle the waiters whose latest event was in the batch just finished"""
+        waiting = []
+        for target, future in self.waiters:
+            if target > self.settled:
+                waiting.append((target, future))
+            elif not future.done():
+                if self.failed is not None:
+                    future.set_exception(self.failed)
+                else:
+                    future.set_result(None)
+        self.waiters = waiting
+
+    def _write(self, lines):
+        """Append and fsync one batch (writer thread)"""
+        if self.torn:
+            self._rotate()  # Recovery stops reading a segment at a torn line
+            self.torn = False
+        self.torn = True
+        self.segment.write("".join(lines))
+        self.segment.flush()
+        os.fsync(self.segment.fileno())
+        self.torn = False
+        self.segment_events += len(lines)
+        if self.segment_events >= self.snapshot_every:
+            self._rotate()
+
+    def _rotate(self):
+        self.segment.close()
+        self.segment_no += 1
+        self.segment_events = 0
+        self.segment = open(self._path(f"log.{self.segment_no}.jsonl"), "a")
+        _fsync_dir(self.directory)
+        if self._compacting.acquire(blocking=False):
+            threading.Thread(target=self._compact, args=(self.segment_no - 1,),
+                             name="evride-ridelog-compact", daemon=True).start()
+
+    def _compact(self, upto):
+        """Fold segments up to `upto` into snapshot.json and delete them"""
+        try:
+            log_seq, snapshot = self._read_snapshot()
+            rides = {ride["ride_id"]: ride for ride in snapshot}
+            folded = [(n, path) for n, path in self._segments() if log_seq < n <= upto]
+            for _, path in folded:
+                for event in self._read_segment(path):
+                    apply_event(rides, event)
+
+            tmp = self._path("snapshot.json.tmp")
+            with open(tmp, "w") as f:
+                json.dump({"log_seq": upto, "rides": list(rides.values())}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self._path("snapshot.json"))
+            _fsync_dir(self.directory)
+            for n, path in self._segments():
+                if n <= upto:
+                    os.remove(path)
+            self.compactions += 1
+        except Exception as e:
+            print(f"Ride log compaction failed: {e}")
+        finally:
+            self._compacting.release()
+
+    async def close(self):
+        try:
+            await self.flush()
+        finally:
+            self.writer.shutdown(wait=True)
+            with self._compacting:  # Let a running compaction finish its deletes
+                pass
+            self.segment.close()
+            self._lock_file.close()
+
+    def stats(self):
+        return {
+            "events": self.committed,
+            "pending": self.submitted - self.settled,
+            "batches": self.batches,
+            "mean_batch": round(self.committed / self.batches, 2) if self.batches else 0,
+            "failed_batches": self.failures,
+            "segment": self.segment_no,
+            "compactions": self.compactions
+        }
+
+
+class DurableRideRepository(RideRepository):
+    """RideRepository that logs every change to a RideLog and rebuilds itself from it
+
+    Changes apply in memory right away; await flush() before acknowledging
+    them to a client.
+    """
+
+    def __init__(self, log):
+        super().__init__()
+        self.log = log
+        rides, events = log.recover()
+        for ride in rides:
+            super().add(ride)
+        for event in events:
+            if event["op"] == "add":
+                super().add(event["ride"])
+            elif event["ride_id"] in self.rides:  # Else its add was in a failed batch
+                try:
+                    super().transition(event["ride_id"], event["status"], **event["fields"])
+                except InvalidTransition:
+                    pass  # Older logs may hold a repeated completion; the first one stands
+        self.recovered = len(rides) + len(events)  # Snapshot rides plus replayed events
+
+    def add(self, ride):
+        super().add(ride)
+        self.log.append({"op": "add", "ride": ride})
+
+    def transition(self, ride_id, new_status, **fields):
+        ride = super().transition(ride_id, new_status, **fields)
+        self.log.append({"op": "transition", "ride_id": ride_id, "status": new_status,
+                         "fields": fields})
+        return ride
+
+    async def flush(self):
+        await self.log.flush()
+
+    async def close(self):
+        await self.log.close()
+
+    def store_stats(self):
+        return dict(self.log.stats(), store="log", recovered_records=self.recovered)
+
+
+def open_ride_repository(store="memory", directory="data/rides", snapshot_every=10000):
+    """In-memory or log-backed ride repository, as configured"""
+    if store not in RIDE_STORES:
+        raise ValueError(f"Unknown ride store '{store}', expected one of {RIDE_STORES}")
+    if store == "memory":
+        return RideRepository()
+    return DurableRideRepository(RideLog(directory, snapshot_every))
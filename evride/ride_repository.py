@@ -0,0 +1,161 @@
+from bisect import bisect_left, insort
+
+from ride_stats import RideStats
+
+
+# Statuses in which a ride still holds its driver
+ACTIVE_STATUSES = ("pending", "accepted")
+
+
+class InvalidTransition(ValueError):
+    """A ride cannot move to the requested status from the one it is in"""
+
+
+def can_transition(old_status, new_status):
+    """Only active rides move, and only to a different status"""
+    return old_status in ACTIVE_STATUSES and new_status != old_status
+
+
+class RideRepository:
+    """In-memory rides with secondary indexes for per-user, per-driver and per-status queries
+
+    Every ride gets a creation sequence number. The user, driver and status
+    indexes are sorted lists of those numbers, so a filtered page is a
+    bisect to the cursor plus a walk over at most the matching rides,
+    never a scan of every ride. The status index and the driver -> active
+    ride map are updated by transition(), which also keeps the RideStats
+    aggregates in step.
+
+    Reads mirror a dict keyed by ride_id (`in`, [], len, values) so
+    existing callers keep working. Nothing here outlives the process;
+    ride_log.DurableRideRepository adds a durable log, and callers await
+    flush() before acknowledging a change either way.
+    """
+
+    def __init__(self):
+        self.rides = {}        # ride_id -> ride dict
+        self.seq_of = {}       # ride_id -> creation sequence number
+        self.ids_by_seq = []   # creation order
+        self.by_user = {}      # user_id -> [seq]
+        self.by_driver = {}    # driver_id -> [seq]
+        self.by_status = {}    # status -> [seq], kept sorted
+        self.active_by_driver = {}  # driver_id -> {ride_id} of its active rides
+        self.stats = RideStats()
+
+    def __contains__(self, ride_id):
+        return ride_id in self.rides
+
+    def __getitem__(self, ride_id):
+        return self.rides[ride_id]
+
+    def __len__(self):
+        return len(self.rides)
+
+    def get(self, ride_id, default=None):
+        return self.rides.get(ride_id, default)
+
+    def values(self):
+        return self.rides.values()
+
+    def add(self, ride):
+        """Store a new ride and index it"""
+        ride_id = ride["ride_id"]
+        if ride_id in self.rides:
+            raise ValueError(f"Ride {ride_id} already exists")
+        seq = len(self.ids_by_seq)
+        self.rides[ride_id] = ride
+        self.seq_of[ride_id] = seq
+        self.ids_by_seq.append(ride_id)
+        self.by_user.setdefault(ride["user_id"], []).append(seq)
+        self.by_driver.setdefault(ride["driver_id"], []).append(seq)
+        self.by_status.setdefault(ride["status"], []).append(seq)
+        if ride["status"] in ACTIVE_STATUSES:
+            self.active_by_driver.setdefault(ride["driver_id"], set()).add(ride_id)
+        self.stats.add(ride)
+
+    def transition(self, ride_id, new_status, **fields):
+        """Move a ride to new_status and set fields, updating the status index and active-ride map
+
+        Raises InvalidTransition, leaving the ride untouched, unless it is
+        pending or accepted and new_status differs from its current one.
+        """
+        ride = self.rides[ride_id]
+        old_status = ride["status"]
+        if not can_transition(old_status, new_status):
+            raise InvalidTransition(f"Ride {ride_id} is {old_status}, cannot become {new_status}")
+        ride.update(fields)
+        seq = self.seq_of[ride_id]
+
+        old_index = self.by_status[old_status]
+        del old_index[bisect_left(old_index, seq)]
+        insort(self.by_status.setdefault(new_status, []), seq)
+
+        driver_id = ride["driver_id"]
+        if new_status in ACTIVE_STATUSES:
+            self.active_by_driver.setdefault(driver_id, set()).add(ride_id)
+        elif old_status in ACTIVE_STATUSES:
+            active = self.active_by_driver[driver_id]
+            active.discard(ride_id)
+            if not active:
+                del self.active_by_driver[driver_id]
+
+        self.stats.transition(ride, new_status)
+        return ride
+
+    async def flush(self):
+        """Changes are durable once this returns; in memory there is nothing to wait for"""
+
+    async def close(self):
+        pass
+
+    def store_stats(self):
+        return {"store": "memory"}
+
+    def active_ride(self, driver_id):
+        """The driver's pending or accepted ride (the newest, should there be several), or None"""
+        active = self.active_by_driver.get(driver_id)
+        if not active:
+            return None
+        return self.rides[max(active, key=self.seq_of.__getitem__)]
+
+    def query(self, user_id=None, driver_id=None, status=None, cursor=None, limit=20):
+        """Newest-first page of rides matching every given filter
+
+        cursor is the next_cursor of the previous page. Returns
+        (rides, next_cursor); next_cursor is None on the last page.
+        """
+        candidates = []
+        if user_id is not None:
+            candidates.append(self.by_user.get(user_id, []))
+        if driver_id is not None:
+            candidates.append(self.by_driver.get(driver_id, []))
+        if status is not None:
+            candidates.append(self.by_status.get(status, []))
+        # Walk the most selective index and check the other filters per ride
+        seqs = min(candidates, key=len) if candidates else range(len(self.ids_by_seq))
+
+        end = len(seqs) if cursor is None else bisect_left(seqs, cursor)
+        page = []
+        for i in range(end - 1, -1, -1):
+            ride = self.rides[self.ids_by_seq[seqs[i]]]
+            if ((user_id is None or ride["user_id"] == user_id)
+                    and (driver_id is None or ride["driver_id"] == driver_id)
+                    and (status is None or ride["status"] == status)):
+                if len(page) == limit:
+                    return page, self.seq_of[page[-1]["ride_id"]]
+                page.append(ride)
+        return page, None
+
+    def verify(self):
+        """Rebuild every index and the stats from the rides; raise AssertionError on drift"""
+        expected = RideRepository()
+        for ride_id in self.ids_by_seq:
+            ride = dict(self.rides[ride_id])
+            expected.add(ride)
+        for name in ("by_user", "by_driver", "active_by_driver"):
+            if getattr(self, name) != getattr(expected, name):
+                raise AssertionError(f"Ride index {name} out of sync")
+        nonempty = {status: seqs for status, seqs in self.by_status.items() if seqs}
+        if nonempty != expected.by_status:
+            raise AssertionError("Ride index by_status out of sync")
+        self.stats.verify(self.rides.values())
@@ -0,0 +1,75 @@
+import math
+from collections import Counter
+
+
+class RideStats:
+    """Running ride aggregates, updated on every ride status transition
+
+    Keeps counts by status and fare/distance sums over completed rides, so
+    /admin/stats answers in constant time instead of scanning every ride.
+    verify() recomputes everything from the rides themselves.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.by_status = Counter()
+        self.completed_fare = 0.0
+        self.completed_distance = 0.0
+
+    @classmethod
+    def from_rides(cls, rides):
+        """Aggregates computed from scratch over ride dicts"""
+        stats = cls()
+        for ride in rides:
+            stats.add(ride)
+        return stats
+
+    def add(self, ride):
+        """Count a newly created ride"""
+        self.total += 1
+        self._apply(ride, ride["status"], 1)
+
+    def transition(self, ride, new_status):
+        """Move a ride to new_status, setting ride["status"]"""
+        self._apply(ride, ride["status"], -1)
+        ride["status"] = new_status
+        self._apply(ride, new_status, 1)
+
+    def _apply(self, ride, status, sign):
+        self.by_status[status] += sign
+        if status == "completed":
+            self.completed_fare += sign * ride["fare"]
+            self.completed_distance += sign * ride["distance"]
+
+    def snapshot(self):
+        completed = self.by_status["completed"]
+        return {
+            "total_rides": self.total,
+            "completed_rides": completed,
+            "pending_rides": self.total - completed,
+            "average_fare": round(self.completed_fare / completed, 2) if completed else 0,
+            "average_distance": round(self.completed_distance / completed, 2) if completed else 0,
+            "rides_by_status": {status: n for status, n in self.by_status.items() if n}
+        }
+
+    def verify(self, rides, rel_tol=1e-9):
+        """Assert these aggregates match a full recomputation over rides
+
+        Sums are compared with a tolerance since they accumulate in a
+        different order.
+        """
+        expected = RideStats.from_rides(rides)
+        problems = []
+        if self.total != expected.total:
+            problems.append(f"total {self.total} != {expected.total}")
+        for status in set(self.by_status) | set(expected.by_status):
+            if self.by_status[status] != expected.by_status[status]:
+                problems.append(
+                    f"{status} {self.by_status[status]} != {expected.by_status[status]}"
+                )
+        for name in ("completed_fare", "completed_distance"):
+            actual, wanted = getattr(self, name), getattr(expected, name)
+            if not math.isclose(actual, wanted, rel_tol=rel_tol, abs_tol=1e-6):
+                problems.append(f"{name} {actual} != {wanted}")
+        if problems:
+            raise AssertionError("Ride stats out of sync: " + "; ".join(problems))
@@ -0,0 +1,194 @@
+import math
+import threading
+from collections import Counter
+
+import numpy as np
+
+from distance_engine import EARTH_RADIUS_KM
+
+
+# Same sphere as distance_engine.haversine_km, so ring bounds never exceed its distances
+KM_PER_DEG_LAT = math.radians(1) * EARTH_RADIUS_KM
+# Kept off ring bounds: a driver a little north or south of a pickup at high
+# latitude sits slightly closer than the east-west width at the pickup's own
+RING_MARGIN = 0.999
+
+
+class DriverSpatialIndex:
+    """Uniform lat/lon grid over available drivers, partitioned by vehicle type
+
+    Updates come from the event loop while searches run on executor
+    threads, so both take self.lock; searches copy the driver ids they need
+    under it and score them after releasing it.
+    """
+
+    def __init__(self, cell_deg=0.01):
+        self.cell_deg = cell_deg  # ~1.1 km per cell in latitude
+        self.lock = threading.Lock()
+        self.cells = {}           # vehicle_type -> {(row, col): set(driver_id)}
+        self.entries = {}         # driver_id -> (vehicle_type, (row, col))
+        self.type_counts = Counter()  # vehicle_type -> indexed drivers
+
+    def cell_of(self, lat, lon):
+        """Grid cell containing a coordinate"""
+        return (math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg))
+
+    def cells_of(self, lats, lons):
+        """Grid cell rows and columns for arrays of coordinates, matching cell_of"""
+        return (np.floor(np.asarray(lats) / self.cell_deg).astype(np.int64),
+                np.floor(np.asarray(lons) / self.cell_deg).astype(np.int64))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, driver_id):
+        return driver_id in self.entries
+
+    def update(self, driver_id, lat, lon, vehicle_type, available=True):
+        """Insert, move or drop a driver; only available drivers are indexed"""
+        if not available:
+            self.remove(driver_id)
+            return
+
+        cell = self.cell_of(lat, lon)
+        with self.lock:
+            current = self.entries.get(driver_id)
+            if current == (vehicle_type, cell):
+                return  # Moved within the same cell
+
+            if current is not None:
+                self._discard(driver_id, *current)
+
+            self.cells.setdefault(vehicle_type, {}).setdefault(cell, set()).add(driver_id)
+            self.entries[driver_id] = (vehicle_type, cell)
+            self.type_counts[vehicle_type] += 1
+
+    def remove(self, driver_id):
+        """Remove a driver from the index"""
+        with self.lock:
+            current = self.entries.pop(driver_id, None)
+            if current is not None:
+                self._discard(driver_id, *current)
+
+    def _discard(self, driver_id, vehicle_type, cell):
+        partition = self.cells[vehicle_type]
+        members = partition[cell]
+        members.discard(driver_id)
+        if not members:
+            del partition[cell]
+        self.type_counts[vehicle_type] -= 1
+
+    def rings(self, lat, lon, vehicle_type=None, max_rings=50):
+        """Yield (min_km, driver_ids) for each square ring of cells around a point
+
+        min_km is a lower bound on the distance from (lat, lon) to any driver
+        in that ring, so callers can stop expanding once it exceeds their best
+        candidate.
+        """
+        row, col = self.cell_of(lat, lon)
+        cell_km = self.ring_km(lat)
+
+        for ring in range(max_rings + 1):
+            ids = []
+            with self.lock:
+                if vehicle_type is None:
+                    partitions = list(self.cells.values())
+                else:
+                    partitions = [self.cells.get(vehicle_type, {})]
+                for cell in self._ring_cells(row, col, ring):
+                    for partition in partitions:
+                        members = partition.get(cell)
+                        if members:
+                            ids.extend(members)
+            yield max(0, ring - 1) * cell_km, ids
+
+    def ring_km(self, lat):
+        """Lower bound on the width of one ring of cells at this latitude, in haversine km"""
+        return RING_MARGIN * self.cell_deg * KM_PER_DEG_LAT * min(1.0, math.cos(math.radians(lat)))
+
+    def beyond(self, lat, lon, rings, vehicle_type=None):
+        """Driver ids outside the first `rings` rings around a point, copied under the lock"""
+        row, col = self.cell_of(lat, lon)
+        with self.lock:
+            return [driver_id for driver_id, (vtype, (r, c)) in self.entries.items()
+                    if (vehicle_type is None or vtype == vehicle_type)
+                    and max(abs(r - row), abs(c - col)) >= rings]
+
+    def _ring_cells(self, row, col, ring):
+        if ring == 0:
+            yield (row, col)
+            return
+        for c in range(col - ring, col + ring + 1):
+            yield (row - ring, c)
+            yield (row + ring, c)
+        for r in range(row - ring + 1, row + ring):
+            yield (r, col - ring)
+            yield (r, col + ring)
+
+    def count(self, vehicle_type=None):
+        """Number of indexed drivers, optionally for one vehicle type"""
+        if vehicle_type is None:
+            return len(self.entries)
+        return self.type_counts[vehicle_type]
+
+    def counts(self):
+        """Indexed drivers per vehicle type"""
+        return {vtype: n for vtype, n in self.type_counts.items() if n}
+
+    def nearest(self, lat, lon, k, distance_fn, vehicle_type=None, max_rings=50):
+        """Return up to k (distance_km, driver_id) pairs ordered by distance
+
+        distance_fn(driver_ids) returns the distances for a batch of drivers.
+        Drivers past max_rings are checked in one batch when the rings have
+        not already settled the answer, so the result is exact either way.
+        """
+        found = []
+        remaining = self.count(vehicle_type)
+        for min_km, ids in self.rings(lat, lon, vehicle_type, max_rings):
+            if remaining == 0 or (len(found) >= k and found[k - 1][0] <= min_km):
+                break
+            if ids:
+                found.extend(zip(np.asarray(distance_fn(ids), dtype=np.float64).tolist(), ids))
+                found.sort()
+            remaining -= len(ids)
+        else:
+            if remaining > 0 and (len(found) < k
+                                  or found[k - 1][0] > max_rings * self.ring_km(lat)):
+                ids = self.beyond(lat, lon, max_rings + 1, vehicle_type)
+                if ids:
+                    found.extend(zip(np.asarray(distance_fn(ids), dtype=np.float64).tolist(), ids))
+                    found.sort()
+        return found[:k]
+
+    def best(self, lat, lon, score_fn, vehicle_type=None, max_rings=50):
+        """Return (score, driver_id) with the lowest score near a point
+
+        score_fn(driver_ids) scores a batch of drivers at once and returns a
+        sequence of scores, each never less than that driver's distance in
+        km (use inf to skip a driver). Rings stop expanding once no farther
+        driver can beat the best score. If max_rings runs out first, every
+        driver beyond them that could still beat it is scored in one batch,
+        so the result is exact.
+        """
+        best_score, best_id = float('inf'), None
+        remaining = self.count(vehicle_type)
+        for min_km, ids in self.rings(lat, lon, vehicle_type, max_rings):
+            if remaining == 0 or min_km >= best_score:
+                break
+            if ids:
+                best_score, best_id = self._pick(ids, score_fn, best_score, best_id)
+                remaining -= len(ids)
+        else:
+            if remaining > 0 and max_rings * self.ring_km(lat) < best_score:
+                ids = self.beyond(lat, lon, max_rings + 1, vehicle_type)
+                if ids:
+                    best_score, best_id = self._pick(ids, score_fn, best_score, best_id)
+
+        return best_score, best_id
+
+    def _pick(self, ids, score_fn, best_score, best_id):
+        scores = np.asarray(score_fn(ids), dtype=np.float64)
+        i = int(np.argmin(scores))
+        if scores[i] < best_score:
+            return float(scores[i]), ids[i]
+        return best_score, best_id
@@ -0,0 +1,47 @@
+import time
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    """Wall-clock breakdown of server startup phases
+
+    lap(name) records the time since the previous lap, for phases that run
+    back to back at import; phase(name) times a block, for phases that run
+    in the background after the server is already accepting connections.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.last_lap = self.started
+        self.phases = {}  # name -> ms
+        self.ready_after_ms = None
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.phases[name] = round((now - self.last_lap) * 1000, 2)
+        self.last_lap = now
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((time.perf_counter() - started) * 1000, 2)
+
+    def mark_ready(self):
+        self.ready_after_ms = round((time.perf_counter() - self.started) * 1000, 2)
+
+    @property
+    def ready(self):
+        return self.ready_after_ms is not None
+
+    def summary(self):
+        return {"phases_ms": dict(self.phases), "ready_after_ms": self.ready_after_ms}
+
+    def report(self):
+        print("Startup timing:")
+        for name, ms in self.phases.items():
+            print(f"  {name:<16s} {ms:9.1f} ms")
+        if self.ready:
+            print(f"  {'ready after':<16s} {self.ready_after_ms:9.1f} ms")
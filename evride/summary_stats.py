@@ -0,0 +1,248 @@
+import numpy as np
+import pandas as pd
+
+
+# describe() rows produced by DatasetSummary.describe()
+DESCRIBE_QUANTILES = (0.25, 0.5, 0.75)
+
+# DatasetSummary keeps every value of a column, and exact quantiles, up to this many
+EXACT_QUANTILE_ROWS = 100_000
+
+
+class QuantileSketch:
+    """KLL quantile sketch: bounded memory, mergeable, approximate ranks
+
+    Level h holds sorted-then-halved survivors that each stand for 2**h
+    values. A level over its capacity is sorted and every other item (from
+    a random offset) moves up a level, so each compaction shifts any rank
+    by at most that level's weight. Capacities shrink by 2/3 per level
+    below the top, which keeps the sketch near 3k items however many values
+    it has seen. With the default k=200 quantiles land within about 1% of
+    their true rank (see benchmark.py summary-stats). Until the first
+    compaction every value is kept and quantiles are exact; `exact` holds
+    that off until more than that many values have been seen.
+    """
+
+    def __init__(self, k=200, seed=None, exact=0):
+        self.k = k
+        self.exact = exact
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    def _capacity(self, h):
+        depth = len(self.levels) - h - 1
+        return max(8, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values):
+            self.n += len(values)
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+
+    def merge(self, other):
+        for h, items in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def _compress(self):
+        if len(self.levels) == 1 and self.n <= self.exact:
+            return
+        compacted = True
+        while compacted:
+            compacted = False
+            for h in range(len(self.levels)):
+                level = self.levels[h]
+                if len(level) <= self._capacity(h):
+                    continue
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                level = np.sort(level)
+                odd = len(level) % 2
+                promoted = level[odd:][self.rng.integers(2)::2]
+                self.levels[h] = level[:odd]  # An odd item out stays behind
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+                compacted = True
+
+    def quantiles(self, qs):
+        """Values at quantiles qs; linear interpolation like pandas while still exact"""
+        if self.n == 0:
+            return np.full(len(qs), np.nan)
+        if len(self.levels) == 1:
+            return np.quantile(self.levels[0], qs)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h)
+                                  for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        ranks = np.asarray(qs) * (cumulative[-1] - 1)
+        return items[np.minimum(np.searchsorted(cumulative, ranks, side='right'),
+                                len(items) - 1)]
+
+
+class NumericSummary:
+    """count, mean, variance (Welford/Chan), min, max, sum and a quantile sketch of one column"""
+
+    def __init__(self, k=200, seed=None, exact=0):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared deviations from the mean
+        self.sum = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.sketch = QuantileSketch(k, seed, exact)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        total = values.sum()
+        mean = total / len(values)
+        self._combine(len(values), mean, ((values - mean) ** 2).sum(),
+                      values.min(), values.max(), total)
+        self.sketch.update(values)
+
+    def merge(self, other):
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.min, other.max, other.sum)
+            self.sketch.merge(other.sketch)
+        return self
+
+    def _combine(self, count, mean, m2, low, high, block_sum):
+        """Chan et al. pairwise update: fold another block's moments into these"""
+        n = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / n
+        self.m2 += m2 + delta ** 2 * self.count * count / n
+        self.count = n
+        self.sum += block_sum
+        self.min = min(self.min, low)
+        self.max = max(self.max, high)
+
+    @property
+    def std(self):
+        """Sample standard deviation (ddof=1), as pandas reports it"""
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+    def quantiles(self, qs):
+        return self.sketch.quantiles(qs)
+
+
+class TopK:
+    """Frequent values by Misra-Gries counting: exact until more than `capacity` distinct values
+
+    Past that, every count is an underestimate by at most n / (capacity + 1),
+    and merging two summaries keeps the same bound.
+    """
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.n = 0
+        self.counts = {}
+
+    def update(self, values):
+        counts = pd.Series(values).value_counts(dropna=True)
+        self.n += int(counts.sum())
+        self._add(counts[counts > 0].items())
+
+    def merge(self, other):
+        self.n += other.n
+        self._add(other.counts.items())
+        return self
+
+    def _add(self, items):
+        for value, count in items:
+            self.counts[value] = self.counts.get(value, 0) + int(count)
+        if len(self.counts) > self.capacity:
+            cut = sorted(self.counts.values(), reverse=True)[self.capacity]
+            self.counts = {value: count - cut for value, count in self.counts.items()
+                           if count > cut}
+
+    def most_common(self, k):
+        return sorted(self.counts.items(), key=lambda item: -item[1])[:k]
+
+
+class DatasetSummary:
+    """One-pass, mergeable summary of a dataset fed to it chunk by chunk
+
+    Numeric columns get a NumericSummary, the named categorical columns a
+    TopK. Each worker can summarize its own chunks and merge() the results.
+    Quantiles match df.describe() exactly while a column has at most
+    `exact` values and are approximate (KLL) beyond that.
+    """
+
+    def __init__(self, categorical=None, k=200, seed=0, exact=EXACT_QUANTILE_ROWS):
+        self.categorical = categorical
+        self.k = k
+        self.exact = exact
+        self.seed = seed
+        self.rows = 0
+        self.first_index = None  # Smallest and largest index label seen
+        self.last_index = None
+        self.numeric = {}
+        self.top = {}
+
+    def update(self, chunk):
+        if len(chunk) == 0:
+            return
+        self._span(chunk.index.min(), chunk.index.max())
+        self.rows += len(chunk)
+        for name in chunk.columns:
+            values = chunk[name]
+            if self.categorical is not None and name in self.categorical:
+                self.top.setdefault(name, TopK()).update(values)
+            elif pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+                if name not in self.numeric:
+                    self.numeric[name] = NumericSummary(
+                        self.k, self.seed + len(self.numeric), self.exact)
+                self.numeric[name].update(values.to_numpy())
+            elif self.categorical is None:
+                self.top.setdefault(name, TopK()).update(values)
+
+    def _span(self, low, high):
+        """Widen the index range seen so far"""
+        self.first_index = low if self.first_index is None else min(self.first_index, low)
+        self.last_index = high if self.last_index is None else max(self.last_index, high)
+
+    def merge(self, other):
+        """Fold in a summary of other rows of the same dataset"""
+        if other.rows:
+            self._span(other.first_index, other.last_index)
+        self.rows += other.rows
+        for name, summary in other.numeric.items():
+            if name in self.numeric:
+                self.numeric[name].merge(summary)
+            else:
+                self.numeric[name] = summary
+        for name, top in other.top.items():
+            if name in self.top:
+                self.top[name].merge(top)
+            else:
+                self.top[name] = top
+        return self
+
+    def describe(self):
+        """DataFrame shaped like df.describe() for the numeric columns"""
+        index = (['count', 'mean', 'std', 'min']
+                 + [f'{q * 100:g}%' for q in DESCRIBE_QUANTILES] + ['max'])
+        data = {}
+        for name, s in self.numeric.items():
+            data[name] = ([s.count, s.mean if s.count else np.nan, s.std,
+                           s.min if s.count else np.nan]
+                          + list(s.quantiles(DESCRIBE_QUANTILES))
+                          + [s.max if s.count else np.nan])
+        return pd.DataFrame(data, index=index, dtype=np.float64)
+
+
+def summarize_frame(df, chunk_rows=100_000, categorical=None, k=200):
+    """DatasetSummary of an in-memory frame, read in row chunks"""
+    summary = DatasetSummary(categorical, k)
+    for start in range(0, len(df), chunk_rows):
+        summary.update(df.iloc[start:start + chunk_rows])
+    return summary
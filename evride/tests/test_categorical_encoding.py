@@ -0,0 +1,81 @@
+import sys
+import threading
+
+import categorical_encoding
+from categorical_encoding import MAX_TRACKED_UNSEEN, CompiledEncoders
+
+CLASSES = {
+    "vehicle_type": ["compact", "sedan", "suv"],
+    "time_of_day": ["Day_Time", "Evening_Peak", "Morning_Peak", "Night"],
+}
+
+
+def test_spelling_variants_and_aliases_resolve_to_dataset_codes():
+    encoders = CompiledEncoders.from_classes(CLASSES)
+    assert [encoders.encode(v, "vehicle_type") for v in ["sedan", " SEDAN ", "Sedan"]] == [1, 1, 1]
+    assert encoders.encode("hatchback", "vehicle_type") == 0
+    assert encoders.encode("evening", "time_of_day") == 1
+    assert encoders.stats()["unseen_total"] == {}
+
+
+def test_unseen_category_falls_back_and_is_counted():
+    encoders = CompiledEncoders.from_classes(CLASSES, fallback_code=2)
+    assert encoders.encode("hovercraft", "vehicle_type") == 2
+    codes = encoders.encode_many(["suv", "hovercraft", "tuk-tuk", "hovercraft"], "vehicle_type")
+    assert codes.tolist() == [2, 2, 2, 2]
+    assert encoders.encode_many(["sedan", "blimp"], "vehicle_type").tolist() == [1, 2]
+
+    stats = encoders.stats()
+    assert stats["unseen_total"] == {"vehicle_type": 5}
+    assert stats["unseen_values"]["vehicle_type"] == {"hovercraft": 3, "tuk-tuk": 1, "blimp": 1}
+
+
+def test_unknown_category_is_fallback_but_not_counted():
+    encoders = CompiledEncoders.from_classes(CLASSES, fallback_code=0)
+    assert encoders.encode("anything", "weather_condition") == 0
+    assert encoders.encode_many(["a", "b"], "weather_condition").tolist() == [0, 0]
+    assert encoders.stats()["unseen_total"] == {}
+
+
+def test_distinct_unseen_values_are_capped_but_totals_are_not():
+    encoders = CompiledEncoders.from_classes(CLASSES)
+    encoders.encode_many([f"v{i}" for i in range(MAX_TRACKED_UNSEEN + 50)], "vehicle_type")
+    assert encoders.stats()["unseen_total"] == {"vehicle_type": MAX_TRACKED_UNSEEN + 50}
+    assert len(encoders.unseen_values["vehicle_type"]) == MAX_TRACKED_UNSEEN
+
+
+def test_stats_while_encoding_on_other_threads(monkeypatch):
+    # Keep the tracked-values dict growing so an unlocked stats() iterates it mid-insert
+    monkeypatch.setattr(categorical_encoding, "MAX_TRACKED_UNSEEN", 10**9)
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    encoders = CompiledEncoders.from_classes(CLASSES)
+    stop = threading.Event()
+    errors = []
+
+    def encode(worker):
+        i = 0
+        while not stop.is_set():
+            encoders.encode_many([f"w{worker}-{i + j}" for j in range(20)], "vehicle_type")
+            i += 20
+
+    def read():
+        try:
+            for _ in range(50):
+                encoders.stats()
+        except RuntimeError as e:  # "dictionary changed size during iteration"
+            errors.append(e)
+
+    writers = [threading.Thread(target=encode, args=(w,)) for w in range(4)]
+    for t in writers:
+        t.start()
+    try:
+        read()
+    finally:
+        stop.set()
+        for t in writers:
+            t.join()
+        sys.setswitchinterval(switch_interval)
+    assert errors == []
+    assert encoders.stats()["unseen_total"]["vehicle_type"] == len(
+        encoders.unseen_values["vehicle_type"])
@@ -0,0 +1,122 @@
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+import main_integrated
+from driver_reservation import DriverReservations
+from fleet_store import FleetStore
+from spatial_index import DriverSpatialIndex
+
+
+@pytest.fixture(autouse=True)
+def fast_thread_switching():
+    # Switch threads every few microseconds so claims actually interleave
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def make_fleet(n, stripes=8, seed=0):
+    rng = np.random.default_rng(seed)
+    fleet, index = FleetStore(), DriverSpatialIndex()
+    reservations = DriverReservations(fleet, stripes)
+    for i in range(n):
+        driver_id = f"D{i}"
+        lat, lon = 28.6 + rng.random() * 0.03, 77.2 + rng.random() * 0.03
+        fleet.upsert(driver_id, name=driver_id, lat=lat, lon=lon, battery=90.0,
+                     vehicle_type="sedan", rating=4.5)
+        index.update(driver_id, lat, lon, "sedan")
+        reservations.place(driver_id, index.cell_of(lat, lon))
+    return fleet, index, reservations
+
+
+def race(n_threads, work):
+    start = threading.Barrier(n_threads)
+    errors = []
+
+    def run(i):
+        start.wait()
+        try:
+            work(i)
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_one_winner_per_driver_when_all_threads_want_the_same_drivers():
+    fleet, _, reservations = make_fleet(50)
+    won = [[] for _ in range(16)]
+
+    def claim_all(i):
+        for d in range(50):
+            if reservations.claim(f"D{d}"):
+                won[i].append(f"D{d}")
+
+    race(16, claim_all)
+    winners = [driver for drivers in won for driver in drivers]
+    assert sorted(winners) == sorted(f"D{d}" for d in range(50))
+    assert not fleet.available[:len(fleet)].any()
+    assert sum(reservations.claimed) == 50
+    assert sum(reservations.conflicts) == 15 * 50
+
+
+def test_nearest_driver_claims_never_double_assign():
+    fleet, index, reservations = make_fleet(200)
+    manager = main_integrated.EnhancedModelManager()
+    rng = np.random.default_rng(1)
+    pickups = 28.6 + rng.random((400, 2)) * 0.03 + [0, 48.6]
+    assigned = []
+    lock = threading.Lock()
+
+    def request(i):
+        for n, (lat, lon) in enumerate(pickups[i::16]):
+            row, _ = manager.claim_nearest_driver(lat, lon, index, fleet, reservations)
+            if row is None:
+                continue
+            driver_id = fleet.driver_ids[row]
+            if n % 2:
+                # Half stay indexed, so claimed drivers are also skipped by score alone
+                index.remove(driver_id)
+            with lock:
+                assigned.append(driver_id)
+
+    race(16, request)
+    assert len(assigned) == len(set(assigned))
+    assert len(assigned) == 200  # More requests than drivers: every driver taken once
+
+
+def test_claims_stay_exclusive_while_drivers_move_and_are_released():
+    fleet, index, reservations = make_fleet(20, stripes=4)
+    owner = {}
+    doubles = []
+    lock = threading.Lock()
+    rng_cells = [(2860 + c, 7720 + c) for c in range(10)]
+
+    def work(i):
+        rng = np.random.default_rng(i)
+        for step in range(2000):
+            driver_id = f"D{rng.integers(20)}"
+            if i % 4 == 0:
+                # Movers: shift drivers between cells, and so between lock stripes
+                reservations.place(driver_id, rng_cells[step % len(rng_cells)])
+            elif reservations.claim(driver_id):
+                with lock:
+                    if driver_id in owner:
+                        doubles.append(driver_id)
+                    owner[driver_id] = i
+                with lock:
+                    del owner[driver_id]
+                reservations.release(driver_id)
+
+    race(12, work)
+    assert doubles == []
+    assert fleet.available[:len(fleet)].all()
@@ -0,0 +1,99 @@
+import json
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from categorical_encoding import CompiledEncoders
+from feature_assembly import RIDE_FEATURES, FeatureAssembler
+
+
+CLASSES = os.path.join(os.path.dirname(__file__), '..', 'models', 'label_encoders.json')
+
+CONTEXT = {"demand_factor": 1.7, "day_of_week": 4, "surge_multiplier": 1.25,
+           "is_holiday": True, "traffic_level": 63}
+
+REQUESTS = [
+    SimpleNamespace(city="Delhi", vehicle_type="sedan", time_of_day=None, user_type="regular"),
+    SimpleNamespace(city=" MUMBAI ", vehicle_type="hatchback", time_of_day="evening",
+                    user_type="Premium"),
+    SimpleNamespace(city="Atlantis", vehicle_type="hovercraft", time_of_day="Night",
+                    user_type="vip"),
+]
+
+
+@pytest.fixture(scope='module')
+def encoders():
+    with open(CLASSES) as f:
+        return CompiledEncoders.from_classes(json.load(f))
+
+
+def legacy_features(request, context, distance, duration, battery, rating, encoders,
+                    default_time_of_day):
+    """The per-request feature dict the API built before FeatureAssembler"""
+    encode = encoders.encode
+    return {
+        'distance_km': distance,
+        'duration_minutes': duration,
+        'demand_factor': context["demand_factor"],
+        'battery_health_percent': battery,
+        'energy_consumption_kwh': distance * 0.25,
+        'route_difficulty': 3,
+        'day_of_week': context["day_of_week"],
+        'temperature_celsius': 28,
+        'humidity_percent': 65,
+        'driver_rating': rating,
+        'surge_multiplier': context["surge_multiplier"],
+        'historical_pricing_factor': 1.0,
+        'is_holiday': int(context["is_holiday"]),
+        'charging_stations_nearby': 3,
+        'city_encoded': encode(request.city, 'city'),
+        'traffic_level_encoded': encode(context["traffic_level"], 'traffic_level'),
+        'vehicle_type_encoded': encode(request.vehicle_type, 'vehicle_type'),
+        'time_of_day_encoded': encode(request.time_of_day or default_time_of_day, 'time_of_day'),
+        'weather_condition_encoded': encode('clear', 'weather_condition'),
+        'user_type_encoded': encode(request.user_type, 'user_type'),
+    }
+
+
+def legacy_matrix(rows, feature_columns):
+    # Columns the dict lacks were filled with 0, as features_matrix did
+    return pd.DataFrame(rows).reindex(columns=feature_columns, fill_value=0).to_numpy(np.float64)
+
+
+FEATURE_COLUMNS = [
+    RIDE_FEATURES,
+    list(reversed(RIDE_FEATURES)),
+    RIDE_FEATURES[:10] + ['wind_speed_kmh'] + RIDE_FEATURES[10:],
+    [c for c in RIDE_FEATURES if c not in ('distance_km', 'surge_multiplier')],
+]
+
+
+@pytest.mark.parametrize("feature_columns", FEATURE_COLUMNS)
+def test_single_matches_the_feature_dict(encoders, feature_columns):
+    assembler = FeatureAssembler(feature_columns, encoders)
+    for request, distance in zip(REQUESTS, (0.0, 7.3, 41.85)):
+        row = assembler.single(request, CONTEXT, distance, distance * 2.4, 88.0, 4.6, "night")
+        expected = legacy_matrix([legacy_features(request, CONTEXT, distance, distance * 2.4,
+                                                  88.0, 4.6, encoders, "night")],
+                                 feature_columns)
+        np.testing.assert_array_equal(assembler.model_input(row), expected)
+
+
+@pytest.mark.parametrize("feature_columns", FEATURE_COLUMNS)
+def test_batch_matches_the_feature_dicts(encoders, feature_columns):
+    assembler = FeatureAssembler(feature_columns, encoders)
+    distances = [0.0, 7.3, 41.85]
+    durations = [d * 2.4 for d in distances]
+    X = assembler.batch(REQUESTS, CONTEXT, distances, durations, 85.0, 4.5, "morning")
+    expected = legacy_matrix([
+        legacy_features(request, CONTEXT, distance, duration, 85.0, 4.5, encoders, "morning")
+        for request, distance, duration in zip(REQUESTS, distances, durations)
+    ], feature_columns)
+    np.testing.assert_array_equal(assembler.model_input(X), expected)
+    # One ride through batch() and single() gives the same row
+    single = assembler.single(REQUESTS[1], CONTEXT, distances[1], durations[1], 85.0, 4.5,
+                              "morning")
+    np.testing.assert_array_equal(single, X[1:2])
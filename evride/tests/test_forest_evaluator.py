@@ -0,0 +1,88 @@
+import contextlib
+import io
+import os
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+
+from dataset_integration import EnhancedFarePredictor, EVRideDatasetLoader
+from forest_evaluator import FlatForest, float32_split_boundary
+
+
+DATASET = os.path.join(os.path.dirname(__file__), '..', 'your_ride_data.csv')
+
+
+@pytest.fixture(scope='module')
+def ride_features():
+    loader = EVRideDatasetLoader(DATASET)
+    with contextlib.redirect_stdout(io.StringIO()):
+        loader.load_data()
+        loader.preprocess_data()
+        loader.encode_categorical()
+        X, y = EnhancedFarePredictor().prepare_features(loader.df)
+    return X.to_numpy(dtype=np.float64), y.to_numpy(dtype=np.float64)
+
+
+@pytest.fixture(scope='module')
+def fitted(ride_features):
+    X, y = ride_features
+    scaler = StandardScaler().fit(X)
+    model = RandomForestRegressor(n_estimators=10, max_depth=12, random_state=0)
+    model.fit(scaler.transform(X), y)
+    return model, scaler
+
+
+def boundary_rows(forest, X, n_splits=1000, seed=0):
+    """Dataset rows with one feature set to a split threshold and its neighbouring floats"""
+    rng = np.random.default_rng(seed)
+    splits = rng.choice(np.flatnonzero(np.isfinite(forest.threshold)), n_splits)
+    rows = []
+    for node in splits:
+        threshold = forest.threshold[node]
+        for value in (np.nextafter(threshold, -np.inf), threshold, np.nextafter(threshold, np.inf)):
+            row = X[rng.integers(len(X))].copy()
+            row[forest.feature[node]] = value
+            rows.append(row)
+    return np.array(rows)
+
+
+def test_matches_sklearn_on_dataset(ride_features, fitted):
+    X, _ = ride_features
+    model, scaler = fitted
+    forest = FlatForest.from_sklearn(model, scaler)
+    np.testing.assert_allclose(forest.predict(X), model.predict(scaler.transform(X)),
+                               rtol=1e-9, atol=1e-6)
+
+
+def test_matches_sklearn_at_scaler_folded_split_boundaries(ride_features, fitted):
+    X, _ = ride_features
+    model, scaler = fitted
+    forest = FlatForest.from_sklearn(model, scaler)
+    B = boundary_rows(forest, X)
+    np.testing.assert_allclose(forest.predict(B), model.predict(scaler.transform(B)),
+                               rtol=1e-9, atol=1e-6)
+
+
+def test_matches_sklearn_at_float32_boundaries_without_scaler(ride_features):
+    X, y = ride_features
+    model = RandomForestRegressor(n_estimators=10, max_depth=12, random_state=0).fit(X, y)
+    forest = FlatForest.from_sklearn(model)
+    B = boundary_rows(forest, X)
+    np.testing.assert_allclose(forest.predict(B), model.predict(B), rtol=1e-9, atol=1e-6)
+
+
+def test_float32_split_boundary_is_last_value_cast_below_threshold():
+    thresholds = np.random.default_rng(1).normal(0, 100, 1000)
+    boundary = float32_split_boundary(thresholds)
+    assert np.all(boundary.astype(np.float32) <= thresholds)
+    assert np.all(np.nextafter(boundary, np.inf).astype(np.float32) > thresholds)
+
+
+def test_bundle_round_trip(tmp_path, ride_features, fitted):
+    X, _ = ride_features
+    forest = FlatForest.from_sklearn(*fitted)
+    forest.save(str(tmp_path / 'model.flat'))
+    loaded, _ = FlatForest.load(str(tmp_path / 'model.flat'))
+    np.testing.assert_allclose(loaded.predict(X), forest.predict(X), rtol=1e-6)
@@ -0,0 +1,126 @@
+import os
+
+import numpy as np
+import pytest
+
+from dataset_integration import EnhancedFarePredictor
+from incremental_training import TrainingStore, bundle_path, candidate_path, grow_forest, retrain
+
+
+def completed(ride_id, final_fare=None):
+    ride = {"ride_id": ride_id, "fare": 250.0, "status": "completed",
+            "completed_at": f"2026-01-01T09:{ride_id[1:]:0>2}"}
+    if final_fare is not None:
+        ride["final_fare"] = final_fare
+    return ride
+
+
+def test_only_rides_with_a_final_fare_become_rows(tmp_path):
+    store = TrainingStore(str(tmp_path))
+    for n in range(4):
+        store.price(f"R{n}", [float(n), 1.0])
+    store.discard("R3")
+
+    assert store.add(completed("R0", final_fare=300.0))
+    assert not store.add(completed("R1"))  # Quote only, never a label
+    assert not store.add(completed("R3", final_fare=200.0))  # Discarded
+    assert not store.add(completed("R9", final_fare=200.0))  # Never priced
+    stats = store.stats()
+    assert stats["buffered_rows"] == 1 and stats["skipped_rides"] == 3
+    assert stats["open_rides"] == 1  # R2 is still open
+
+    assert store.flush() == 0
+    X, y, through = store.untrained()
+    assert X.tolist() == [[0.0, 1.0]] and y.tolist() == [300.0] and through == 0
+    store.mark_trained(through)
+    assert TrainingStore(str(tmp_path)).untrained()[1].size == 0
+
+
+def test_open_rides_are_bounded(tmp_path):
+    store = TrainingStore(str(tmp_path), max_open=2)
+    for n in range(3):
+        store.price(f"R{n}", [float(n)])
+    assert list(store.open) == ["R1", "R2"]
+    assert not store.add(completed("R0", final_fare=100.0))
+
+
+def synthetic_rows(n, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.random((n, 4)) * [40.0, 90.0, 3.0, 1.0]
+    return X, 30.0 + X @ [12.0, 1.5, 40.0, 10.0]
+
+
+def fitted_predictor(n_trees=5):
+    predictor = EnhancedFarePredictor({'n_estimators': n_trees, 'max_depth': 8})
+    predictor.model.set_params(n_jobs=1)
+    X, y = synthetic_rows(400)
+    predictor.feature_columns = ['distance_km', 'duration_minutes', 'demand_factor', 'rating']
+    predictor.model.fit(predictor.scaler.fit_transform(X), y)
+    predictor.is_fitted = True
+    return predictor
+
+
+def store_with(tmp_path, X, y):
+    store = TrainingStore(str(tmp_path / 'training'))
+    for n, (row, fare) in enumerate(zip(X.tolist(), y.tolist())):
+        store.price(f"R{n}", row)
+        store.add(completed(f"R{n}", final_fare=fare))
+    return store
+
+
+def test_grow_forest_appends_and_ages_out_the_oldest_trees():
+    predictor = fitted_predictor(n_trees=5)
+    original = list(predictor.model.estimators_)
+    X, y = synthetic_rows(100, seed=1)
+
+    assert grow_forest(predictor.model, predictor.scaler, X, y, new_trees=3) == 0
+    assert predictor.model.estimators_[:5] == original and len(predictor.model.estimators_) == 8
+    grown = list(predictor.model.estimators_)
+
+    dropped = grow_forest(predictor.model, predictor.scaler, X, y, new_trees=2, max_trees=6)
+    assert dropped == 4
+    assert predictor.model.estimators_[:4] == grown[4:]  # Oldest out, order kept
+    assert len(predictor.model.estimators_) == predictor.model.n_estimators == 6
+
+
+def test_retrain_is_a_noop_below_min_rows(tmp_path):
+    model_path = str(tmp_path / 'fare.pkl')
+    fitted_predictor().save_model(model_path)
+    store = store_with(tmp_path, *synthetic_rows(10))
+    assert retrain(store, model_path, min_rows=50) is None
+    assert store.state['trained_through'] == -1
+    assert sorted(os.listdir(tmp_path)) == ['fare.flat', 'fare.pkl', 'training']
+
+
+def test_retrain_rejects_rows_of_another_width(tmp_path):
+    model_path = str(tmp_path / 'fare.pkl')
+    fitted_predictor().save_model(model_path)
+    X, y = synthetic_rows(20)
+    store = store_with(tmp_path, X[:, :3], y)
+    with pytest.raises(ValueError, match="3 features"):
+        retrain(store, model_path, min_rows=1)
+
+
+@pytest.mark.parametrize("shift_fit, shift_holdout, accepted", [
+    (500.0, 500.0, True),  # Fares moved and the holdout agrees: the grown forest is better
+    (5000.0, 0.0, False),  # Fit rows disagree with the holdout: the grown forest is worse
+])
+def test_retrain_saves_only_an_improving_candidate(tmp_path, shift_fit, shift_holdout, accepted):
+    model_path = str(tmp_path / 'fare.pkl')
+    fitted_predictor().save_model(model_path)
+    served = open(model_path, 'rb').read()
+    X, y = synthetic_rows(200, seed=2)
+    y = y + np.where(np.arange(len(y)) < 160, shift_fit, shift_holdout)
+    store = store_with(tmp_path, X, y)
+
+    report = retrain(store, model_path, new_trees=5, min_rows=1, holdout=0.2)
+    assert report['accepted'] is accepted and report['holdout_rows'] == 40
+    assert (report['mae_after'] < report['mae_before']) is accepted
+    assert open(model_path, 'rb').read() == served  # Served files are the caller's to replace
+    assert store.state['trained_through'] == -1
+    if accepted:
+        assert report['candidate'] == candidate_path(model_path, report['through_segment'])
+        assert os.path.exists(report['candidate'])
+        assert os.path.exists(os.path.join(bundle_path(report['candidate']), 'meta.json'))
+    else:
+        assert report['candidate'] is None
@@ -0,0 +1,49 @@
+import asyncio
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+from forest_evaluator import FlatForest
+from inference_executor import InferenceExecutor
+
+
+def flat_forest(y_offset, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.random((300, 4))
+    y = X @ [100.0, 50.0, 20.0, 5.0] + y_offset
+    model = RandomForestRegressor(n_estimators=5, max_depth=6, random_state=seed).fit(X, y)
+    return FlatForest.from_sklearn(model, None)
+
+
+def test_workers_serve_the_pool_version_after_files_are_rewritten(tmp_path):
+    bundle_dir = str(tmp_path / 'fare_model.flat')
+    flat_forest(0.0).save(bundle_dir)
+    served, _ = FlatForest.load(bundle_dir, mmap=True)
+    X = np.random.default_rng(1).random((50, 4))
+    expected = served.predict(X)
+
+    executor = InferenceExecutor(mode="process", workers=2)
+    executor.start("v1", served)
+    try:
+        # A retrain or rejected artifact lands before any worker has spawned
+        flat_forest(1000.0, seed=1).save(bundle_dir)
+        predicted = asyncio.run(executor.predict(None, X, version="v1"))
+    finally:
+        executor.shutdown()
+    np.testing.assert_array_equal(predicted, expected)
+
+
+def test_other_versions_run_on_the_thread_pool():
+    forest = flat_forest(0.0)
+    executor = InferenceExecutor(mode="process", workers=1)
+    executor.start()
+    try:
+        assert executor.process_pool is None
+        executor.restart_workers("v1", forest)
+        assert executor.process_pool is not None and executor.pool_version == "v1"
+        X = np.random.default_rng(2).random((5, 4))
+        other = flat_forest(500.0, seed=3)
+        predicted = asyncio.run(executor.predict(other, X, version="v2"))
+    finally:
+        executor.shutdown()
+    np.testing.assert_array_equal(predicted, other.predict(X))
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from inference_scheduler import MicroBatchScheduler
+
+
+def run_concurrently(scheduler, submissions):
+    async def run():
+        return await asyncio.gather(*(scheduler.submit(row, context) for row, context in submissions))
+    return asyncio.run(run())
+
+
+def test_window_coalesces_concurrent_rows_into_one_call():
+    calls = []
+
+    def predict_batch(rows, context):
+        calls.append(list(rows))
+        return [row * 10 for row in rows]
+
+    scheduler = MicroBatchScheduler(predict_batch, window_ms=5.0, max_batch=64)
+    results = run_concurrently(scheduler, [(i, None) for i in range(10)])
+
+    assert results == [i * 10 for i in range(10)]
+    assert calls == [list(range(10))]
+    snapshot = scheduler.metrics.snapshot()
+    assert snapshot["batches"] == 1 and snapshot["rows"] == 10
+
+
+def test_max_batch_flushes_without_waiting_for_the_window():
+    calls = []
+
+    async def predict_batch(rows, context):
+        calls.append(len(rows))
+        return rows
+
+    scheduler = MicroBatchScheduler(predict_batch, window_ms=60_000.0, max_batch=4)
+    results = run_concurrently(scheduler, [(i, None) for i in range(8)])
+
+    assert results == list(range(8))
+    assert calls == [4, 4]
+
+
+def test_rows_are_grouped_by_context():
+    old, new = object(), object()
+    calls = []
+
+    def predict_batch(rows, context):
+        calls.append((context, list(rows)))
+        return [(context, row) for row in rows]
+
+    scheduler = MicroBatchScheduler(predict_batch, window_ms=5.0)
+    submissions = [(0, old), (1, new), (2, old), (3, new), (4, old)]
+    results = run_concurrently(scheduler, submissions)
+
+    assert results == [(context, row) for row, context in submissions]
+    assert sorted((id(c), rows) for c, rows in calls) == sorted(
+        [(id(old), [0, 2, 4]), (id(new), [1, 3])])
+
+
+def test_batch_error_reaches_every_caller_in_the_batch():
+    def predict_batch(rows, context):
+        raise ValueError("bad bundle")
+
+    scheduler = MicroBatchScheduler(predict_batch, window_ms=1.0)
+
+    async def run():
+        return await asyncio.gather(*(scheduler.submit(i) for i in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results)
+    with pytest.raises(ValueError):
+        run_concurrently(scheduler, [(0, None)])
@@ -0,0 +1,87 @@
+import asyncio
+import json
+
+from location_hub import LocationHub, moved_m
+from distance_engine import haversine_km
+
+
+def test_moved_m_matches_haversine_at_city_scale():
+    for lat, lon, dlat, dlon in [(28.6, 77.2, 0.0003, 0.0004), (59.9, 10.7, -0.002, 0.003)]:
+        exact = 1000 * float(haversine_km(lat, lon, lat + dlat, lon + dlon))
+        assert abs(moved_m(lat, lon, lat + dlat, lon + dlon) - exact) < 1e-3
+
+
+def test_sub_threshold_move_is_suppressed():
+    hub = LocationHub(min_move_m=10.0)
+    subscription = hub.subscribe("D1", 28.6, 77.2)
+    subscription.pending = None
+
+    assert not hub.publish("D1", 28.60005, 77.2)  # ~5.6 m
+    assert subscription.pending is None
+    assert hub.publish("D1", 28.6002, 77.2)       # ~22 m
+    assert json.loads(subscription.pending) == {"latitude": 28.6002, "longitude": 77.2}
+    # The threshold is measured from the last published position, not the last seen one
+    assert not hub.publish("D1", 28.60025, 77.2)
+    assert hub.stats()["suppressed"] == 2
+    assert hub.stats()["published"] == 1
+
+
+def test_latest_position_wins_while_a_send_is_in_flight():
+    async def run():
+        hub = LocationHub(min_move_m=0.0)
+        subscription = hub.subscribe("D1", 28.6, 77.2)
+        sent, release, closed = [], asyncio.Event(), asyncio.Event()
+
+        async def send(text):
+            sent.append(json.loads(text))
+            await release.wait()
+            release.clear()
+
+        stream = asyncio.ensure_future(hub.stream(subscription, send, closed.wait))
+        while not sent:  # the primed position is now in flight
+            await asyncio.sleep(0)
+        for i in range(1, 6):
+            hub.publish("D1", 28.6 + i * 0.001, 77.2)
+        release.set()
+        await asyncio.sleep(0.01)
+        release.set()
+        await asyncio.sleep(0.01)
+        closed.set()
+        dropped = await stream
+        return hub, sent, dropped
+
+    hub, sent, dropped = asyncio.run(run())
+    assert not dropped
+    assert [m["latitude"] for m in sent] == [28.6, 28.605]
+    assert hub.stats()["coalesced"] == 4
+    assert hub.stats()["subscribers"] == 0
+
+
+def test_watchdog_drops_stale_subscriber():
+    async def run():
+        hub = LocationHub(min_move_m=0.0, send_timeout=0.05)
+        stuck = hub.subscribe("D1", 28.6, 77.2)
+        healthy = hub.subscribe("D1", 28.6, 77.2)
+        never = asyncio.Event()
+        healthy_sent = []
+
+        async def blocking_send(text):
+            await never.wait()
+
+        async def send(text):
+            healthy_sent.append(text)
+
+        healthy_closed = asyncio.Event()
+        healthy_stream = asyncio.ensure_future(hub.stream(healthy, send, healthy_closed.wait))
+        dropped = await asyncio.wait_for(hub.stream(stuck, blocking_send, never.wait), 1.0)
+        hub.publish("D1", 28.61, 77.2)
+        await asyncio.sleep(0.01)
+        healthy_closed.set()
+        return hub, dropped, await healthy_stream, healthy_sent
+
+    hub, dropped, healthy_dropped, healthy_sent = asyncio.run(run())
+    assert dropped
+    assert not healthy_dropped
+    assert len(healthy_sent) == 2
+    assert hub.stats()["dropped_slow"] == 1
+    assert hub.subscribers == {}
@@ -0,0 +1,51 @@
+import main_integrated
+import quote_cache
+from model_bundle import ModelBundle
+from quote_cache import QuoteCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(quote_cache.time, "monotonic", clock)
+    cache = QuoteCache(maxsize=10, ttl=300.0)
+    key = cache.key(("row",), 8, "v1")
+    cache.put(key, 120.0)
+
+    clock.now += 299.0
+    assert cache.get(key) == 120.0
+    clock.now += 2.0
+    assert cache.get(key) is None
+    assert len(cache) == 0
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = QuoteCache(maxsize=2, ttl=300.0)
+    cache.put("a", 1.0)
+    cache.put("b", 2.0)
+    assert cache.get("a") == 1.0
+    cache.put("c", 3.0)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1.0 and cache.get("c") == 3.0
+    assert cache.stats()["evictions"] == 1
+
+
+def test_version_swap_clears_cached_quotes():
+    manager = main_integrated.EnhancedModelManager()
+    cache = manager.quote_cache
+    key = cache.key(("row",), 8, manager.bundle.version)
+    cache.put(key, 120.0)
+    assert cache.get(key) == 120.0
+
+    manager.swap_bundle(ModelBundle.empty()._replace(version="v2"))
+
+    assert len(cache) == 0
+    assert cache.get(key) is None
@@ -0,0 +1,176 @@
+import asyncio
+import random
+
+import pytest
+
+from ride_log import open_ride_repository
+from ride_repository import InvalidTransition, RideRepository
+
+
+def ride(n, user, driver, fare=100.0, distance=5.0):
+    return {"ride_id": f"R{n}", "user_id": user, "driver_id": driver, "fare": fare,
+            "distance": distance, "status": "pending", "created_at": f"2026-01-01T08:{n % 60:02d}"}
+
+
+def simulate(rides, n=500, seed=0):
+    """Random mix of new rides, accepts, completions and cancellations"""
+    rng = random.Random(seed)
+    open_rides = []
+    for i in range(n):
+        if open_rides and rng.random() < 0.6:
+            ride_id, status = open_rides.pop(rng.randrange(len(open_rides)))
+            if status == "pending" and rng.random() < 0.7:
+                rides.transition(ride_id, "accepted", accepted_at="2026-01-01T09:00")
+                open_rides.append((ride_id, "accepted"))
+            elif rng.random() < 0.8:
+                rides.transition(ride_id, "completed", completed_at="2026-01-01T09:30")
+            else:
+                rides.transition(ride_id, "cancelled")
+        else:
+            rides.add(ride(i, f"U{rng.randrange(20)}", f"D{rng.randrange(10)}",
+                           fare=rng.uniform(50, 900), distance=rng.uniform(1, 40)))
+            open_rides.append((f"R{i}", "pending"))
+
+
+def test_indexes_and_stats_stay_consistent():
+    rides = RideRepository()
+    simulate(rides)
+    rides.verify()
+    snapshot = rides.stats.snapshot()
+    assert snapshot["total_rides"] == len(rides)
+    assert sum(snapshot["rides_by_status"].values()) == len(rides)
+
+
+def test_active_ride_and_queries_after_transitions():
+    rides = RideRepository()
+    rides.add(ride(1, "U1", "D1"))
+    rides.add(ride(2, "U1", "D1"))
+    rides.transition("R2", "accepted")
+    assert rides.active_ride("D1")["ride_id"] == "R2"
+    rides.transition("R2", "completed")
+    assert rides.active_ride("D1")["ride_id"] == "R1"
+    rides.transition("R1", "cancelled")
+    assert rides.active_ride("D1") is None
+    page, cursor = rides.query(user_id="U1", status="completed")
+    assert [r["ride_id"] for r in page] == ["R2"] and cursor is None
+    rides.verify()
+
+
+@pytest.mark.parametrize("start, move", [
+    ("completed", "completed"),
+    ("completed", "cancelled"),
+    ("cancelled", "accepted"),
+    ("accepted", "accepted"),
+])
+def test_invalid_transition_leaves_ride_untouched(start, move):
+    rides = RideRepository()
+    rides.add(ride(1, "U1", "D1"))
+    rides.transition("R1", start, stamp="first")
+    before = dict(rides["R1"])
+    with pytest.raises(InvalidTransition):
+        rides.transition("R1", move, stamp="second")
+    assert rides["R1"] == before
+    rides.verify()
+
+
+def test_log_replay_skips_repeated_completion(tmp_path):
+    async def run():
+        rides = open_ride_repository("log", str(tmp_path))
+        rides.add(ride(1, "U1", "D1"))
+        rides.transition("R1", "completed", completed_at="2026-01-01T09:30")
+        # What a double completion wrote before transition() refused it
+        rides.log.append({"op": "transition", "ride_id": "R1", "status": "completed",
+                          "fields": {"completed_at": "2026-01-01T10:00"}})
+        await rides.flush()
+        await rides.close()
+        recovered = open_ride_repository("log", str(tmp_path))
+        await recovered.close()
+        return recovered
+
+    recovered = asyncio.run(run())
+    assert recovered["R1"]["completed_at"] == "2026-01-01T09:30"
+    recovered.verify()
+
+
+def test_log_replay_rebuilds_consistent_indexes(tmp_path):
+    async def run():
+        rides = open_ride_repository("log", str(tmp_path), snapshot_every=50)
+        simulate(rides, n=300)
+        await rides.flush()
+        await rides.close()
+        recovered = open_ride_repository("log", str(tmp_path), snapshot_every=50)
+        await recovered.close()
+        return rides, recovered
+
+    rides, recovered = asyncio.run(run())
+    recovered.verify()
+    assert recovered.stats.snapshot() == rides.stats.snapshot()
+
+
+@pytest.mark.parametrize("corrupt", [
+    lambda rides: rides.by_user["U1"].pop(),
+    lambda rides: rides.by_status["pending"].append(99),
+    lambda rides: rides.active_by_driver.pop("D1"),
+    lambda rides: setattr(rides.stats, "completed_fare", rides.stats.completed_fare + 1),
+])
+def test_verify_detects_corruption(corrupt):
+    rides = RideRepository()
+    rides.add(ride(1, "U1", "D1"))
+    rides.add(ride(2, "U1", "D2"))
+    rides.transition("R2", "completed")
+    rides.verify()
+    corrupt(rides)
+    with pytest.raises(AssertionError):
+        rides.verify()
+
+
+def test_log_recovers_after_a_failed_write(tmp_path, monkeypatch):
+    async def run():
+        rides = open_ride_repository("log", str(tmp_path))
+        write = rides.log._write
+        failures = []
+
+        def torn_write(lines):
+            if not failures:
+                failures.append(lines)
+                rides.log.torn = True
+                rides.log.segment.write(lines[0][:20])  # Half a line, then the disk fills up
+                rides.log.segment.flush()
+                raise OSError("No space left on device")
+            return write(lines)
+
+        monkeypatch.setattr(rides.log, "_write", torn_write)
+        rides.add(ride(1, "U1", "D1"))
+        with pytest.raises(OSError):
+            await rides.flush()
+        rides.transition("R1", "cancelled")  # What request_ride does when its flush fails
+        rides.add(ride(2, "U2", "D2"))
+        await rides.flush()  # The next batch is written and acknowledged
+        stats = rides.store_stats()
+        await rides.close()
+        recovered = open_ride_repository("log", str(tmp_path))
+        await recovered.close()
+        return stats, recovered
+
+    stats, recovered = asyncio.run(run())
+    assert stats["failed_batches"] == 1 and stats["pending"] == 0
+    assert "R1" not in recovered and recovered["R2"]["status"] == "pending"
+    recovered.verify()
+
+
+def test_enhanced_request_ride_frees_the_driver_when_the_log_fails(monkeypatch):
+    import main_enhanced
+    from fastapi.testclient import TestClient
+
+    async def failing_flush():
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(main_enhanced.rides_db, "flush", failing_flush)
+    client = TestClient(main_enhanced.app, raise_server_exceptions=False)
+    available = {d: driver.available for d, driver in main_enhanced.drivers_db.items()}
+    response = client.post("/ride/request", json={
+        "user_id": "U1", "pickup": {"latitude": 28.61, "longitude": 77.2},
+        "dropoff": {"latitude": 28.5, "longitude": 77.1}})
+    assert response.status_code == 500
+    assert {d: driver.available for d, driver in main_enhanced.drivers_db.items()} == available
+    assert all(r["status"] == "cancelled" for r in main_enhanced.rides_db.values())
@@ -0,0 +1,89 @@
+import threading
+
+import numpy as np
+
+from distance_engine import haversine_km
+from spatial_index import DriverSpatialIndex
+
+
+def make_index(n, seed=0, spread=1.0):
+    rng = np.random.default_rng(seed)
+    lats = 28.6 + (rng.random(n) - 0.5) * spread
+    lons = 77.2 + (rng.random(n) - 0.5) * spread
+    index = DriverSpatialIndex()
+    for i in range(n):
+        index.update(f"D{i}", lats[i], lons[i], "sedan" if i % 2 else "suv")
+    return index, lats, lons
+
+
+def distances(lats, lons, lat, lon):
+    return lambda ids: haversine_km(lat, lon, lats[[int(d[1:]) for d in ids]],
+                                    lons[[int(d[1:]) for d in ids]])
+
+
+def test_best_and_nearest_match_brute_force_past_max_rings():
+    # A few rings only, with drivers up to ~50 km out, so answers often lie past max_rings
+    index, lats, lons = make_index(300, spread=1.0)
+    rng = np.random.default_rng(1)
+    for lat, lon in zip(28.6 + rng.random(50) - 0.5, 77.2 + rng.random(50) - 0.5):
+        all_km = haversine_km(lat, lon, lats, lons)
+        # Penalize even drivers so a far one can beat a near one
+        penalty = np.where(np.arange(len(lats)) % 2 == 0, 40.0, 0.0)
+        distance = distances(lats, lons, lat, lon)
+
+        def score(ids):
+            return distance(ids) + penalty[[int(d[1:]) for d in ids]]
+
+        best_score, best_id = index.best(lat, lon, score, max_rings=3)
+        assert best_score == min(all_km + penalty)
+        assert best_id == f"D{int(np.argmin(all_km + penalty))}"
+
+        found = index.nearest(lat, lon, 5, distance, max_rings=3)
+        np.testing.assert_allclose([km for km, _ in found], np.sort(all_km)[:5])
+
+        sedan_km = np.where(np.arange(len(lats)) % 2 == 1, all_km, np.inf)
+        assert index.best(lat, lon, distance, "sedan", max_rings=3)[0] == sedan_km.min()
+
+
+def test_searches_survive_concurrent_updates():
+    index, lats, lons = make_index(2000, spread=0.2)
+    errors = []
+    stop = threading.Event()
+
+    def search():
+        try:
+            while not stop.is_set():
+                index.best(28.6, 77.2, distances(lats, lons, 28.6, 77.2), max_rings=2)
+                index.nearest(28.6, 77.2, 3, distances(lats, lons, 28.6, 77.2), max_rings=2)
+        except Exception as e:  # pragma: no cover - the failure being tested for
+            errors.append(e)
+
+    threads = [threading.Thread(target=search) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    rng = np.random.default_rng(2)
+    for i in range(20000):
+        driver = int(rng.integers(len(lats)))
+        if i % 3 == 0:
+            index.remove(f"D{driver}")
+        else:
+            index.update(f"D{driver}", lats[driver], lons[driver], "sedan")
+    stop.set()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_ring_bound_never_prunes_a_nearer_driver_across_a_cell_edge():
+    # B is one cell east and A due north, both ~0.977 km away with B nearer by 60 m;
+    # a ring width above haversine's km per degree would end the search at A
+    lat, lon = 28.605, 77.20999
+    lats = np.array([lat + 0.977264 / 111.19508, 28.605])
+    lons = np.array([lon, 77.22 + 1e-9])
+    index = DriverSpatialIndex()
+    index.update("D0", lats[0], lons[0], "sedan")
+    index.update("D1", lats[1], lons[1], "sedan")
+    distance = distances(lats, lons, lat, lon)
+    assert haversine_km(lat, lon, lats, lons)[1] < haversine_km(lat, lon, lats, lons)[0]
+    assert index.best(lat, lon, distance)[1] == "D1"
+    assert [driver_id for _, driver_id in index.nearest(lat, lon, 1, distance)] == ["D1"]
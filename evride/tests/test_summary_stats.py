@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from summary_stats import DatasetSummary, QuantileSketch, summarize_frame
+
+
+def frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "fare": rng.gamma(2.0, 150.0, rows),
+        "user_type_encoded": rng.choice([0, 1, 1, 2], rows),  # Ties straddle the median
+        "vehicle_type": rng.choice(["sedan", "suv", "auto"], rows),
+    })
+
+
+def test_describe_matches_pandas_below_exact_limit():
+    df = frame(5000)
+    expected = df.describe()
+    one_pass = summarize_frame(df, 700, ["vehicle_type"]).describe()
+    merged = summarize_frame(df.iloc[:2000], 700, ["vehicle_type"]).merge(
+        summarize_frame(df.iloc[2000:], 700, ["vehicle_type"]))
+    for described in (one_pass, merged.describe()):
+        pd.testing.assert_frame_equal(described[expected.columns], expected)
+
+
+def test_sketch_compacts_past_exact_limit():
+    values = frame(20_000)["fare"].to_numpy()
+    sketch = QuantileSketch(k=200, seed=0, exact=5000)
+    for start in range(0, len(values), 1000):
+        sketch.update(values[start:start + 1000])
+    assert len(sketch.levels) > 1 and sum(map(len, sketch.levels)) < 2000
+    median = sketch.quantiles([0.5])[0]
+    assert abs((values < median).mean() - 0.5) < 0.02
+
+
+def test_summary_without_exact_limit_is_approximate():
+    df = frame(5000)
+    summary = DatasetSummary(exact=0)
+    summary.update(df)
+    assert len(summary.numeric["fare"].sketch.levels) > 1
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import main_integrated
+from fleet_store import FleetStore
+
+BAD_RECORDS = [
+    '{"driver_id": "D001", "lat": NaN, "lon": 77.2, "ts": 4e9}',
+    '{"driver_id": "D001", "lat": 28.6, "lon": 1e308, "ts": 4e9}',
+    '{"driver_id": "D001", "lat": 91.0, "lon": 77.2, "ts": 4e9}',
+    '{"driver_id": "D001", "lat": 28.6, "lon": 77.2, "ts": Infinity}',
+]
+
+
+@pytest.fixture
+def client():
+    return TestClient(main_integrated.app)
+
+
+def position(driver_id):
+    fleet = main_integrated.fleet
+    row = fleet.row_of(driver_id)
+    return fleet.lat[row], fleet.lon[row], fleet.ts[row]
+
+
+def test_apply_telemetry_drops_invalid_rows_before_writing():
+    fleet = FleetStore()
+    fleet.upsert("D1", name="D1", lat=28.6, lon=77.2, battery=90.0,
+                 vehicle_type="sedan", rating=4.5)
+    applied = fleet.apply_telemetry(
+        ["D1", "D1", "D1", "D1"],
+        [np.nan, 28.7, 95.0, 28.8],
+        [77.3, np.inf, 77.3, 77.4],
+        [np.nan] * 4,
+        [4.0, 5.0, 6.0, np.nan]
+    )
+    assert applied.invalid == 4 and len(applied.rows) == 0
+    assert (fleet.lat[0], fleet.lon[0]) == (28.6, 77.2)
+
+    applied = fleet.apply_telemetry(["D1", "D1"], [np.nan, 28.7], [77.3, 77.3],
+                                    [np.nan] * 2, [9.0, 8.0])
+    assert applied.invalid == 1 and applied.stale == 0
+    assert (fleet.lat[0], fleet.ts[0]) == (28.7, 8.0)  # The valid, older record still lands
+
+
+@pytest.mark.parametrize("record", BAD_RECORDS)
+def test_bulk_endpoint_rejects_bad_positions(client, record):
+    before = position("D001")
+    response = client.post("/drivers/telemetry/bulk", content=f'{{"records": [{record}]}}',
+                           headers={"content-type": "application/json"})
+    assert response.status_code == 422
+    assert position("D001") == before
+
+
+def test_stream_rejects_bad_positions_and_stays_open(client):
+    before = position("D001")
+    with client.websocket_connect("/ws/drivers/telemetry") as ws:
+        for record in BAD_RECORDS:
+            ws.send_text(f'{{"records": [{record}]}}')
+            assert "error" in ws.receive_json()
+        assert position("D001") == before
+        ws.send_json({"records": [{"driver_id": "D001", "lat": 28.62, "lon": 77.21,
+                                   "ts": before[2] + 1}]})
+        assert ws.receive_json()["applied"] == 1
+    assert position("D001")[:2] == (28.62, 77.21)